@@ -0,0 +1,324 @@
+"""Load test for the whole API, in-process over ASGI (no network).
+
+    python benchmarks/bench_api.py --posts 1000 --users 200 --output results.json
+    python benchmarks/bench_api.py --posts 1000 --users 200 --output new.json --baseline results.json
+
+The app is seeded with synthetic posts, users and favorites, then each
+scenario runs ``--concurrency`` closed-loop clients for ``--duration``
+seconds, picking operations by weight. Throughput, p50/p95/p99 latency and
+errors are reported per scenario and per operation and written as JSON.
+With ``--baseline`` every scenario is compared with the saved results;
+throughput drops or p95/p99 increases above ``--threshold`` are flagged
+and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from harness import asgi_client, scratch_app
+from synthetic import VOCABULARY, make_posts, percentile
+
+# Demo kullanıcısının hash'i ("secret"); her kullanıcı için bcrypt çalıştırmamak için paylaşılır
+SHARED_PASSWORD = "secret"
+
+# Senaryo -> [(ağırlık, işlem adı)]
+SCENARIOS = {
+    "browse": [
+        (40, "list_summary"),
+        (10, "list_page"),
+        (20, "get_post"),
+        (5, "related"),
+        (5, "trending"),
+        (10, "categories"),
+        (10, "stats"),
+    ],
+    "search": [
+        (80, "search"),
+        (20, "search_page"),
+    ],
+    "favorites": [
+        (30, "favorites_list"),
+        (30, "favorites_status"),
+        (30, "favorite_toggle"),
+        (10, "me"),
+    ],
+    "write": [
+        (40, "comment"),
+        (10, "comments_page"),
+        (30, "subscribe"),
+        (20, "favorite_toggle"),
+    ],
+    "auth": [
+        (20, "login"),
+        (80, "me"),
+    ],
+    "mixed": [
+        (30, "list_summary"),
+        (20, "get_post"),
+        (10, "search"),
+        (10, "favorites_status"),
+        (5, "favorites_list"),
+        (5, "favorite_toggle"),
+        (5, "comment"),
+        (5, "subscribe"),
+        (5, "stats"),
+        (4, "me"),
+        (1, "login"),
+    ],
+}
+
+# Hata sayılmayan cevaplar (400: zaten abone); 503 (bcrypt havuzu dolu) hatadır
+EXPECTED_STATUSES = {200, 304, 400}
+
+# Karşılaştırmada bakılan ölçüler: (alan, büyük değer daha mı iyi)
+COMPARED_METRICS = (("throughput_rps", True), ("p95_ms", False), ("p99_ms", False))
+
+
+class Context:
+    """Seeded data and per-client state the operations draw from."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.posts = []
+        self.emails = []
+        self.tokens = {}
+        self.cursors = []
+        self.subscriber_seq = 0
+
+    def token_headers(self):
+        email = self.rng.choice(self.emails)
+        return {"Authorization": f"Bearer {self.tokens[email]}"}
+
+    def random_post(self):
+        return self.rng.choice(self.posts)
+
+
+def build_request(op: str, ctx: Context):
+    """Return ``(method, url, kwargs)`` for one operation."""
+    rng = ctx.rng
+    if op == "list_summary":
+        return "GET", "/api/posts?fields=summary&limit=20", {}
+    if op == "list_page":
+        after = f"&after={rng.choice(ctx.cursors)}" if ctx.cursors else ""
+        return "GET", f"/api/posts?fields=summary&limit=20{after}", {}
+    if op == "get_post":
+        return "GET", f"/api/posts/{ctx.random_post()['slug']}", {}
+    if op == "related":
+        return "GET", f"/api/posts/{ctx.random_post()['slug']}/related", {}
+    if op == "trending":
+        return "GET", "/api/posts/trending?limit=5", {}
+    if op == "categories":
+        return "GET", "/api/categories", {}
+    if op == "stats":
+        return "GET", "/api/stats", {}
+    if op == "search":
+        # Zipf dağılımlı sözlükten: sık ve nadir terimler karışık
+        return "GET", f"/api/posts?search={rng.choice(VOCABULARY[:2000])}&fields=summary", {}
+    if op == "search_page":
+        return "GET", f"/api/posts?search={rng.choice(VOCABULARY[:200])}&fields=summary&limit=10", {}
+    if op == "favorites_list":
+        return "GET", "/api/favorites?fields=summary&limit=20", {"headers": ctx.token_headers()}
+    if op == "favorites_status":
+        ids = "&".join(f"ids={ctx.random_post()['id']}" for _ in range(20))
+        return "GET", f"/api/favorites/status?{ids}", {"headers": ctx.token_headers()}
+    if op == "favorite_toggle":
+        return "POST", "/api/favorites/toggle", {
+            "json": {"post_id": ctx.random_post()["id"]}, "headers": ctx.token_headers(),
+        }
+    if op == "me":
+        return "GET", "/api/auth/me", {"headers": ctx.token_headers()}
+    if op == "login":
+        return "POST", "/api/auth/login", {"json": {"email": rng.choice(ctx.emails), "password": SHARED_PASSWORD}}
+    if op == "comment":
+        return "POST", f"/api/posts/{ctx.random_post()['id']}/comments", {
+            "json": {"author": "Bench", "content": " ".join(rng.choices(VOCABULARY[:500], k=12))},
+        }
+    if op == "comments_page":
+        return "GET", f"/api/posts/{ctx.random_post()['id']}/comments?limit=20", {}
+    if op == "subscribe":
+        ctx.subscriber_seq += 1
+        return "POST", "/api/newsletter", {"json": {"email": f"bench{ctx.subscriber_seq}@example.com"}}
+    raise ValueError(f"Unknown operation {op!r}")
+
+
+async def seed(app_module, client, args, rng: random.Random) -> Context:
+    ctx = Context(rng)
+    repository = app_module.post_repository
+    next_id = max((post["id"] for post in repository), default=0) + 1
+    for offset, post in enumerate(make_posts(args.posts, seed=args.seed)):
+        post["id"] = next_id + offset
+        post["slug"] = f"bench-post-{post['id']}"
+        repository.insert(post)
+    ctx.posts = repository.all()
+    # İlgili yazı listeleri ölçümden önce hazır olsun (büyük setlerde build arka planda sürerdi)
+    app_module.related_posts.rebuild()
+
+    demo = await app_module.user_repository.get("demo@blogx.com")
+    for i in range(args.users):
+        email = f"bench{i}@example.com"
+        await app_module.user_repository.add({
+            "email": email,
+            "firstName": "Bench",
+            "lastName": f"User{i}",
+            "hashed_password": demo["hashed_password"],
+            "phone": None,
+            "avatar": None,
+            "joinDate": datetime.now().isoformat(),
+            "isActive": True,
+        })
+        for post in rng.sample(ctx.posts, min(args.favorites, len(ctx.posts))):
+            await app_module.favorite_repository.add(email, post["id"])
+        ctx.emails.append(email)
+        ctx.tokens[email] = app_module.create_access_token({"sub": email}, expires_delta=timedelta(hours=1))
+
+    # list_page için gerçek cursor'lar
+    after = None
+    while len(ctx.cursors) < 50:
+        response = await client.get("/api/posts?fields=summary&limit=20" + (f"&after={after}" if after else ""))
+        after = response.headers.get("x-next-cursor")
+        if not after:
+            break
+        ctx.cursors.append(after)
+    return ctx
+
+
+def summarize(latencies, statuses, elapsed):
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status not in EXPECTED_STATUSES),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 95) if latencies else 0.0,
+        "p99_ms": percentile(latencies, 99) if latencies else 0.0,
+    }
+
+
+async def run_scenario(client, ctx: Context, mix, concurrency: int, duration: float):
+    operations = [op for _, op in mix]
+    weights = [weight for weight, _ in mix]
+    latencies = {op: [] for op in operations}
+    statuses = {op: {} for op in operations}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            op = ctx.rng.choices(operations, weights)[0]
+            method, url, kwargs = build_request(op, ctx)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies[op].append((time.perf_counter() - start) * 1000)
+            statuses[op][response.status_code] = statuses[op].get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    all_statuses = {}
+    for counts in statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    result = summarize(all_latencies, all_statuses, elapsed)
+    result["operations"] = {op: summarize(latencies[op], statuses[op], elapsed) for op in operations if latencies[op]}
+    return result
+
+
+async def run(app_module, args):
+    rng = random.Random(args.seed)
+    async with asgi_client(app_module.app) as client:
+        ctx = await seed(app_module, client, args, rng)
+        results = {}
+        for name in args.scenarios:
+            # Isınma: önbellekler ve indeksler ölçümden önce dolsun
+            await run_scenario(client, ctx, SCENARIOS[name], args.concurrency, args.warmup)
+            results[name] = await run_scenario(client, ctx, SCENARIOS[name], args.concurrency, args.duration)
+            report_line(name, results[name])
+    return results
+
+
+def report_line(name, result):
+    print(
+        f"{name:>10} {result['requests']:>8} {result['throughput_rps']:>10.1f} "
+        f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>7}"
+    )
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every compared metric; returns the regressions found."""
+    regressions = []
+    print(f"\n{'scenario':>10} {'metric':>15} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = before[metric], result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append({"scenario": name, "metric": metric, "baseline": old, "current": new, "change": change})
+            print(f"{name:>10} {metric:>15} {old:>10.2f} {new:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--favorites", type=int, default=10, help="favorites per user")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    print(f"{'scenario':>10} {'requests':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    with scratch_app() as app_module:
+        results = asyncio.run(run(app_module, args))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage_backend": app_module.STORAGE_BACKEND,
+            "dataset": {"posts": args.posts, "users": args.users, "favorites_per_user": args.favorites},
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("dataset") != report["meta"]["dataset"]:
+            print("\nwarning: baseline was recorded with a different dataset", file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "regressions": regressions}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
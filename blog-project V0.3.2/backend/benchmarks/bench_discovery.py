@@ -0,0 +1,87 @@
+"""Related and trending posts: precomputed top K vs. scanning every post.
+
+    python benchmarks/bench_discovery.py --sizes 1000 10000 50000
+
+`build` is the full NumPy pass (vectors and every post's top K), `refresh`
+applies one edited post. `related` and `trending` are per-request costs
+(p50) of the precomputed lists; `scan` is what a request would cost
+without them: scoring one post against all (related) and sorting every
+post by views (trending, like the old `Blog.jsx` sidebar).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from related import RelatedPosts  # noqa: E402
+from repository import PostRepository  # noqa: E402
+from synthetic import make_posts, percentile  # noqa: E402
+from trending import TrendingPosts  # noqa: E402
+
+
+def timed(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--views", type=int, default=100000, help="view events fed to the trending heap")
+    args = parser.parse_args()
+
+    print(f"{'posts':>7} {'build s':>8} {'refresh':>8} {'related':>8} {'scan':>8} {'record':>8} {'trending':>8} {'scan':>8}  (ms, p50)")
+    for size in args.sizes:
+        rng = random.Random(size)
+        repository = PostRepository(make_posts(size, content_words=100))
+        related = RelatedPosts(repository)
+        repository.on_change(related.post_changed)
+        start = time.perf_counter()
+        related.rebuild()
+        build = time.perf_counter() - start
+
+        def edit():
+            post = rng.choice(repository.all())
+            repository.update(post["id"], {"tags": rng.sample(post["tags"] + ["ai", "web"], 3)})
+            related.refresh()
+
+        refresh = timed(edit, max(1, args.rounds // 10))
+        related_ms = timed(lambda: related.related(rng.randint(1, size), args.limit), args.rounds)
+
+        def related_scan():
+            # Tek yazının skorları her istekte bütün yazılara karşı hesaplanırsa
+            row = related._rows[rng.randint(1, size)]
+            scores = related._matrix @ related._matrix[row]
+            np.argpartition(-scores, args.limit)[:args.limit + 1]
+
+        related_scan_ms = timed(related_scan, args.rounds)
+
+        trending = TrendingPosts(size=50)
+        trending.attach(repository)
+        ids = [rng.randint(1, size) for _ in range(args.views)]
+        start = time.perf_counter()
+        for post_id in ids:
+            trending.record(post_id)
+        record = (time.perf_counter() - start) * 1000 / args.views
+        trending_ms = timed(lambda: trending.top(args.limit), args.rounds)
+        trending_scan_ms = timed(lambda: sorted(repository.all(), key=lambda p: -p["views"])[:args.limit], args.rounds)
+
+        print(
+            f"{size:>7} {build:>8.2f} {refresh:>8.2f} {related_ms:>8.3f} {related_scan_ms:>8.3f} "
+            f"{record:>8.4f} {trending_ms:>8.3f} {trending_scan_ms:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""flatted `stringify` / `parse`: vendored module vs. the list-scanning original.
+
+    python benchmarks/bench_flatted.py --sizes 1000 10000 100000 1000000
+    python benchmarks/bench_flatted.py --sizes 100000 --memory --deep 100000
+
+The graph is a circular state dump: `n` dict nodes in a random tree, each
+with a `parent` back-reference, a `children` list and a label drawn from a
+small set of repeated strings. `flatted_legacy.py` is the module as it was
+before lookups were keyed by identity; it is quadratic (about 150 s to
+stringify 5,000 nodes), so it only runs up to `--baseline-max` nodes. It
+also merges containers that are merely equal (every empty `children` list
+becomes one shared list), so its output is a little smaller.
+
+The second table streams the graph with `dump` to a temporary file and
+reads it back with `load` from an mmap. `--memory` adds the traced peak of
+`parse` on the file's text vs. `load` (tracemalloc slows both down).
+`--deep` round-trips a chain of that many nested dicts, which the legacy
+recursive parser cannot do. Before the tables, `load` is checked against
+`parse` at chunk sizes of 1-8 characters, so numbers, literals and strings
+split across chunk boundaries are covered.
+"""
+import argparse
+import gc
+import importlib.util
+import io
+import mmap
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VENDORED = os.path.join(HERE, "..", "..", "..", "blog-project V0.2.3", "node_modules", "flatted", "python", "flatted.py")
+
+
+def load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_graph(n, seed=42):
+    rng = random.Random(seed)
+    labels = [f"node-{i}" for i in range(64)]
+    root = {"id": 0, "label": labels[0], "parent": None, "children": []}
+    nodes = [root]
+    for i in range(1, n):
+        parent = nodes[rng.randrange(len(nodes))]
+        node = {"id": i, "label": labels[i % len(labels)], "parent": parent, "children": []}
+        parent["children"].append(node)
+        nodes.append(node)
+    return root
+
+
+def timed(fn, *args):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def make_chain(depth):
+    root = node = {"depth": 0}
+    for i in range(1, depth + 1):
+        node["child"] = {"depth": i, "parent": node}
+        node = node["child"]
+    return root
+
+
+def peak_mib(fn, *args):
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        return result, tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def load_mmap(flatted, path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return flatted.load(buffer)
+
+
+def parse_file(flatted, path):
+    with open(path, encoding="utf-8") as f:
+        return flatted.parse(f.read())
+
+
+def dump_file(flatted, graph, path):
+    with open(path, "w", encoding="utf-8") as f:
+        flatted.dump(graph, f)
+
+
+def stream(flatted, sizes, memory):
+    print(f"\n{'nodes':>9} {'dump':>10} {'load':>10} {'parse MiB':>10} {'load MiB':>10}  (s)")
+    with tempfile.TemporaryDirectory(prefix="blogx-flatted-") as workdir:
+        path = os.path.join(workdir, "graph.json")
+        for n in sizes:
+            graph = make_graph(n)
+            _, dump_s = timed(dump_file, flatted, graph, path)
+            loaded, load_s = timed(load_mmap, flatted, path)
+            assert flatted.stringify(loaded) == flatted.stringify(graph), "dump/load round trip differs"
+            del loaded
+            parse_peak = load_peak = float("nan")
+            if memory:
+                _, parse_peak = peak_mib(parse_file, flatted, path)
+                _, load_peak = peak_mib(load_mmap, flatted, path)
+            print(f"{n:>9} {dump_s:>10.3f} {load_s:>10.3f} {parse_peak:>10.1f} {load_peak:>10.1f}")
+
+
+# Kesirli/üslü sayılar, negatifler, sabitler ve kaçışlı metinler; hepsi chunk sınırına bölünür
+SMALL_CHUNK_CASES = [
+    "[1.5]",
+    "[2e3]",
+    "[-12.5E-1]",
+    "[0]",
+    "[true]",
+    "[null]",
+    '["a\\"b"]',
+    '[{"x":"1","y":"2"},1.25,-7e+2,"q"]',
+    '[ [ "1" , "2" ] , 3.0 , 4 ]',
+]
+
+
+def small_chunks(flatted):
+    for text in SMALL_CHUNK_CASES:
+        expected = flatted.stringify(flatted.parse(text))
+        for chunk_size in range(1, 9):
+            for source in (io.StringIO(text), io.BytesIO(text.encode("utf-8"))):
+                loaded = flatted.load(source, chunk_size=chunk_size)
+                assert flatted.stringify(loaded) == expected, f"load({text!r}, chunk_size={chunk_size}) differs"
+    print(f"load at chunk sizes 1-8: {len(SMALL_CHUNK_CASES)} cases ok")
+
+
+def deep(flatted, legacy, depth):
+    text = flatted.stringify(make_chain(depth))
+    for name, module in (("vendored", flatted), ("legacy", legacy)):
+        try:
+            parsed, parse_s = timed(module.parse, text)
+        except RecursionError:
+            print(f"deep chain of {depth}: {name} RecursionError")
+            continue
+        assert parsed["child"]["parent"] is parsed
+        print(f"deep chain of {depth}: {name} parsed in {parse_s:.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--baseline-max", type=int, default=1000)
+    parser.add_argument("--memory", action="store_true", help="measure peak memory of parse vs. load")
+    parser.add_argument("--deep", type=int, default=0, help="also round-trip a chain this deep")
+    parser.add_argument("--flatted", default=VENDORED, help="path of the flatted.py to measure")
+    args = parser.parse_args()
+
+    flatted = load("flatted", args.flatted)
+    legacy = load("flatted_legacy", os.path.join(HERE, "flatted_legacy.py"))
+
+    small_chunks(flatted)
+    print(f"{'nodes':>9} {'impl':>8} {'stringify':>10} {'parse':>10} {'bytes':>12}  (s)")
+    for n in args.sizes:
+        graph = make_graph(n)
+        impls = [("vendored", flatted)] + ([("legacy", legacy)] if n <= args.baseline_max else [])
+        for name, module in impls:
+            text, stringify_s = timed(module.stringify, graph)
+            parsed, parse_s = timed(module.parse, text)
+            # Parse edilen graf aynı metni vermeli
+            assert module.stringify(parsed) == text, f"{name} round trip differs"
+            print(f"{n:>9} {name:>8} {stringify_s:>10.3f} {parse_s:>10.3f} {len(text):>12}")
+        if n > args.baseline_max:
+            print(f"{n:>9} {'legacy':>8} {'skipped (> --baseline-max)':>23}")
+
+    stream(flatted, args.sizes, args.memory)
+    if args.deep:
+        deep(flatted, legacy, args.deep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Read latency of `GET /api/posts` while a burst of logins is running.
+
+    python benchmarks/bench_login_storm.py --logins 32 --mode both
+
+`inline` reproduces the old behaviour (bcrypt on the event loop), `pool`
+uses the process pool from `hashing.py`.
+"""
+import argparse
+import asyncio
+import time
+
+from harness import asgi_client, scratch_app
+from synthetic import percentile
+
+import hashing
+
+
+class InlineHasher:
+    """Eski davranış: bcrypt doğrudan event loop üzerinde."""
+
+    async def hash(self, password):
+        return hashing.hash_password(password)
+
+    async def verify(self, password, hashed_password):
+        return hashing.verify_password(password, hashed_password)
+
+    def start(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+async def run(main, logins, readers):
+    async with asgi_client(main.app) as client:
+        storm_done = asyncio.Event()
+        read_latencies = []
+        statuses = {}
+
+        async def login():
+            response = await client.post("/api/auth/login", json={"email": "demo@blogx.com", "password": "secret"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def reader():
+            # Sabit hızda okuma; gecikme planlanan başlangıçtan ölçülür, böylece
+            # event loop bloklandığında kaçırılan istekler de sayılır
+            interval = 0.01
+            intended = time.perf_counter()
+            while True:
+                await client.get("/api/posts")
+                read_latencies.append((time.perf_counter() - intended) * 1000)
+                if storm_done.is_set():
+                    break
+                intended += interval
+                await asyncio.sleep(max(0.0, intended - time.perf_counter()))
+
+        reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        storm_done.set()
+        await asyncio.gather(*reader_tasks)
+
+    return {
+        "storm_seconds": elapsed,
+        "logins": statuses,
+        "reads": len(read_latencies),
+        "read_p50": percentile(read_latencies, 50),
+        "read_p99": percentile(read_latencies, 99),
+        "read_max": max(read_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        with scratch_app() as app_module:
+            if mode == "inline":
+                app_module.password_hasher = InlineHasher()
+            result = asyncio.run(run(app_module, args.logins, args.readers))
+        print(
+            f"{mode:>6}: storm {result['storm_seconds']:.2f}s, logins {result['logins']}, "
+            f"{result['reads']} reads, p50 {result['read_p50']:.1f}ms, "
+            f"p99 {result['read_p99']:.1f}ms, max {result['read_max']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare `GET /api/posts?search=` scan vs. the inverted index.
+
+    python benchmarks/bench_search.py --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import build_index  # noqa: E402
+from synthetic import VOCABULARY, make_posts, percentile  # noqa: E402
+
+# Sık, orta ve nadir terimler; çok terimli ve önek (search-as-you-type) sorgular
+QUERIES = [
+    "s",
+    "gü",
+    "güvenlik",
+    VOCABULARY[100],
+    VOCABULARY[1000],
+    VOCABULARY[5000],
+    f"{VOCABULARY[60]} {VOCABULARY[400]}",
+    f"python {VOCABULARY[2500][:3]}",
+]
+
+
+def linear_scan(posts, search, category=None):
+    # main.get_posts içindeki eski tarama
+    if category and category != "All":
+        posts = [post for post in posts if post["category"] == category]
+    return [post for post in posts if
+            search.lower() in post["title"].lower() or
+            search.lower() in post["excerpt"].lower()]
+
+
+def measure(fn, rounds):
+    # İlk tur ayrı: indeks bir terimin sıralı listesini ilk sorguda kurar
+    first = []
+    samples = []
+    for round_no in range(rounds + 1):
+        for query in QUERIES:
+            start = time.perf_counter()
+            fn(query)
+            (first if round_no == 0 else samples).append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99), max(first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'posts':>8} {'scan p50':>10} {'scan p99':>10} {'index p50':>10} {'index p99':>10} {'index 1st':>10}  (ms)")
+    for size in args.sizes:
+        posts = make_posts(size)
+        index = build_index(posts)
+        scan = measure(lambda q: linear_scan(posts, q), args.rounds)
+        indexed = measure(lambda q: index.search(q, limit=20), args.rounds)
+        print(f"{size:>8} {scan[0]:>10.3f} {scan[1]:>10.3f} {indexed[0]:>10.3f} {indexed[1]:>10.3f} {indexed[2]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
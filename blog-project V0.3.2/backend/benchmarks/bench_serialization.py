@@ -0,0 +1,87 @@
+"""CPU per `GET /api/posts` body: response_model serialization vs. `PostEncoder`.
+
+    python benchmarks/bench_serialization.py --sizes 10 1000 10000
+
+`response_model` is what FastAPI does for a returned list of dicts
+(validate, `jsonable_encoder`, `json.dumps`), `adapter` is a single
+pydantic `TypeAdapter` validate + `dump_json`, `encoder` splices the
+cached per-post bytes. `encoder cold` re-encodes every post (all posts
+changed since the last request), `encoder 1%` re-encodes one post in a
+hundred, like view count updates between two requests.
+"""
+import argparse
+import asyncio
+import time
+from typing import List, Union
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from harness import scratch_app
+from synthetic import make_posts, percentile
+
+from post_encoder import PostEncoder
+from repository import post_summary
+
+
+def measure(fn, rounds):
+    # process_time: isteğin harcadığı CPU (duvar saati değil)
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return percentile(samples, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    with scratch_app() as app_module:
+        model = List[Union[app_module.BlogPost, app_module.PostSummary]]
+        field = create_response_field(name="Response_Get_Posts", type_=model)
+        adapter = TypeAdapter(model)
+
+        print(f"{'posts':>7} {'fields':>8} {'resp_model':>10} {'adapter':>10} {'encoder':>10} {'cold':>10} {'1%':>10}  (ms CPU, p50)")
+        for size in args.sizes:
+            posts = make_posts(size)
+            for fields in ("full", "summary"):
+                data = posts if fields == "full" else [post_summary(post) for post in posts]
+
+                def fastapi_path():
+                    content = loop.run_until_complete(serialize_response(field=field, response_content=data, is_coroutine=True))
+                    JSONResponse(content)
+
+                encoder = PostEncoder(app_module.BlogPost, app_module.PostSummary)
+                encoder.encode_list(posts, fields)
+                step = max(1, size // 100)
+
+                def cold():
+                    for post in posts:
+                        encoder.invalidate(post["id"])
+                    encoder.encode_list(posts, fields)
+
+                def one_percent():
+                    for post in posts[::step]:
+                        encoder.invalidate(post["id"])
+                    encoder.encode_list(posts, fields)
+
+                results = (
+                    measure(fastapi_path, args.rounds),
+                    measure(lambda: adapter.dump_json(adapter.validate_python(data)), args.rounds),
+                    measure(lambda: encoder.encode_list(posts, fields), args.rounds),
+                    measure(cold, args.rounds),
+                    measure(one_percent, args.rounds),
+                )
+                print(f"{size:>7} {fields:>8} " + " ".join(f"{value:>10.3f}" for value in results))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Worker cold start with the JSON backend: JSON files vs. binary snapshots.
+
+    python benchmarks/bench_startup.py --users 10000 100000 1000000
+
+For each size a scratch directory gets `users.json` / `favorites.json`
+(one user in ten has favorites) and every measurement runs in a fresh
+process, like a new worker:
+
+- `json load`: what opening the stores used to cost, `json.load` of both
+  files plus journal replay (`storage.load_records`);
+- `convert`: the first start of the app, which imports the JSON files
+  into `users.snapshot` / `favorites.snapshot` once;
+- `start`: `import main` plus the lifespan startup, with the snapshots in
+  place; `lookup` is the first `user_repository.get` after it.
+
+Peak RSS of each process is in MiB.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from synthetic import make_users
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ru_maxrss exec'ten önceki (büyük) üst process'i de sayabilir; VmHWM exec ile sıfırlanır
+PEAK_RSS = """
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+"""
+
+LOAD_JSON = PEAK_RSS + """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+from storage import load_records
+start = time.perf_counter()
+users = load_records("users.json")
+favorites = load_records("favorites.json")
+print(json.dumps({{"seconds": time.perf_counter() - start, "rss": peak_rss()}}))
+"""
+
+START_APP = PEAK_RSS + """
+import asyncio, json, sys, time
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import main
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        user = await main.user_repository.get({email!r})
+        assert user is not None
+        return ready, time.perf_counter()
+
+ready, looked_up = asyncio.run(run())
+print(json.dumps({{"seconds": ready - start, "lookup": looked_up - ready, "rss": peak_rss()}}))
+"""
+
+
+def run(script, workdir):
+    env = dict(os.environ, STORAGE_BACKEND="json", LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def prepare(workdir, n):
+    users = make_users(n)
+    emails = list(users)
+    with open(os.path.join(workdir, "users.json"), "w", encoding="utf-8") as f:
+        # Eski JournaledStore'un yazdığı biçim
+        json.dump(users, f, ensure_ascii=False, indent=2)
+    favorites = {email: [1, 2, 3, 4, 5] for email in emails[::10]}
+    with open(os.path.join(workdir, "favorites.json"), "w", encoding="utf-8") as f:
+        json.dump(favorites, f, ensure_ascii=False, indent=2)
+    return emails[len(emails) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'users':>9} {'json load':>10} {'rss':>7} {'convert':>9} {'start':>8} {'lookup ms':>10} {'rss':>7}  (s, MiB)")
+    for n in args.users:
+        with tempfile.TemporaryDirectory(prefix="blogx-startup-") as workdir:
+            email = prepare(workdir, n)
+            legacy = run(LOAD_JSON.format(backend=BACKEND_DIR), workdir)
+            start_app = START_APP.format(backend=BACKEND_DIR, email=email)
+            first = run(start_app, workdir)
+            warm = run(start_app, workdir)
+        print(
+            f"{n:>9} {legacy['seconds']:>10.2f} {legacy['rss']:>7.0f} {first['seconds']:>9.2f} "
+            f"{warm['seconds']:>8.2f} {warm['lookup'] * 1000:>10.2f} {warm['rss']:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
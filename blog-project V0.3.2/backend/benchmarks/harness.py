@@ -0,0 +1,38 @@
+"""Helpers to drive the FastAPI app in-process for benchmarks.
+
+The app reads and writes its snapshots, journals and databases relative
+to the working directory, so benchmarks import it from a scratch directory.
+"""
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@contextlib.contextmanager
+def scratch_app():
+    """Import ``main`` inside a temporary working directory."""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="blogx-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            sys.modules.pop("main", None)
+            yield importlib.import_module("main")
+        finally:
+            os.chdir(previous)
+
+
+@contextlib.asynccontextmanager
+async def asgi_client(app):
+    """httpx client wired to the app over ASGI, inside its lifespan."""
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
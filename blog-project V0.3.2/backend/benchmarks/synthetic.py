@@ -0,0 +1,83 @@
+"""Synthetic datasets for the backend benchmarks."""
+import itertools
+import random
+
+WORDS = (
+    "ai yapay zeka development future web performance security react python "
+    "fastapi database cache index search görüntü işleme güvenlik ağ bulut "
+    "kubernetes docker deploy test api frontend backend tasarım oyun grafik "
+    "öğrenme model veri analiz mobil uygulama tarayıcı sunucu istemci hız"
+).split()
+SYLLABLES = "ka le mi no ru sa te yo zu ba de fi go hu ja ke lo mu ne pa".split()
+CATEGORIES = ["Technology", "Web Development", "3D Graphics", "Cybersecurity", "AI & Machine Learning"]
+
+
+def make_vocabulary(size, seed=7):
+    """Real words first, then pseudo-words; sampled with a Zipf-like skew."""
+    rng = random.Random(seed)
+    vocab = list(WORDS)
+    seen = set(vocab)
+    while len(vocab) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocab.append(word)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    return vocab, cum_weights
+
+
+VOCABULARY, _CUM_WEIGHTS = make_vocabulary(20000)
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=n))
+
+
+def make_posts(n, seed=42, content_words=200):
+    """Build `n` post dicts shaped like the ones in `main.blog_posts`."""
+    rng = random.Random(seed)
+    posts = []
+    for i in range(1, n + 1):
+        title = _sentence(rng, 6).title()
+        posts.append({
+            "id": i,
+            "title": title,
+            "slug": f"post-{i}",
+            "excerpt": _sentence(rng, 20),
+            "content": f"# {title}\n\n" + _sentence(rng, content_words),
+            "author": "Bench Author",
+            "publishedAt": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "readTime": "5 min read",
+            "category": rng.choice(CATEGORIES),
+            "tags": rng.sample(WORDS, 3),
+            "image": "https://example.com/image.jpg",
+            "views": rng.randint(0, 10000),
+            "commentCount": 0,
+        })
+    return posts
+
+
+def make_users(n, seed=42, hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW"):
+    """Build `n` user records keyed by email, shaped like the ones in `users.json`."""
+    rng = random.Random(seed)
+    users = {}
+    for i in range(1, n + 1):
+        email = f"user{i}@example.com"
+        users[email] = {
+            "id": i,
+            "email": email,
+            "firstName": "".join(rng.choice(SYLLABLES) for _ in range(3)).title(),
+            "lastName": "".join(rng.choice(SYLLABLES) for _ in range(3)).title(),
+            "hashed_password": hashed_password,
+            "phone": None,
+            "avatar": None,
+            "joinDate": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00",
+            "isActive": True,
+        }
+    return users
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
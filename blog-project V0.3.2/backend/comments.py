@@ -0,0 +1,226 @@
+"""Post comments stored apart from the posts, paged per post.
+
+Comments are rows in their own SQLite table (WAL mode, shared by all
+workers) instead of a list inside each post dict, so post responses only
+carry a count. Ids come from ``AUTOINCREMENT``: increasing across workers
+and never reused, even after a delete. An index on ``(post_id,
+created_at)`` serves keyset pages of one post's comments, and a trigger
+keeps a count per post. The counts are written onto the post dicts as
+``commentCount``, the way view totals are, and re-read periodically so
+comments added by other workers show up too.
+"""
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS comments_post_created ON comments (post_id, created_at);
+CREATE TABLE IF NOT EXISTS comment_counts (
+    post_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS comments_count_insert AFTER INSERT ON comments BEGIN
+    INSERT INTO comment_counts (post_id, count) VALUES (NEW.post_id, 1)
+    ON CONFLICT(post_id) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS comments_count_delete AFTER DELETE ON comments BEGIN
+    UPDATE comment_counts SET count = count - 1 WHERE post_id = OLD.post_id;
+END;
+"""
+_INSERT = "INSERT INTO comments (post_id, author, content, created_at) VALUES (?, ?, ?, ?)"
+_SELECT_COUNT = "SELECT count FROM comment_counts WHERE post_id = ?"
+_SELECT_COUNTS = "SELECT post_id, count FROM comment_counts"
+# Index (post_id, created_at) sırasıyla okunur; rowid (id) index'in son kolonu, eşit zamanları ayırır
+_SELECT_PAGE = (
+    "SELECT id, author, content, created_at FROM comments WHERE post_id = ? "
+    "ORDER BY created_at, id LIMIT ?"
+)
+_SELECT_PAGE_AFTER = (
+    "SELECT id, author, content, created_at FROM comments WHERE post_id = ? AND (created_at, id) > (?, ?) "
+    "ORDER BY created_at, id LIMIT ?"
+)
+
+# Sayfa cursor'ı: son görülen yorumun (created_at, id) çifti
+CommentKey = Tuple[str, int]
+
+
+def encode_key(key: CommentKey) -> str:
+    return f"{key[0]}|{key[1]}"
+
+
+def decode_key(value: str) -> CommentKey:
+    """Inverse of :func:`encode_key`; raises ValueError on anything else."""
+    created_at, separator, comment_id = value.rpartition("|")
+    if not separator or not created_at:
+        raise ValueError(value)
+    return created_at, int(comment_id)
+
+
+def _row_to_comment(row) -> dict:
+    comment_id, author, content, created_at = row
+    return {
+        "id": comment_id,
+        "author": author,
+        "content": content,
+        "publishedAt": created_at[:10],
+        "createdAt": created_at,
+    }
+
+
+class CommentStore:
+    """Comments in ``db_path`` plus the comment count of every post.
+
+    Counts are read when the store is attached and kept up to date by the
+    comments added here. Counts changed by other workers are picked up
+    every ``sync_interval`` seconds, or earlier when a page of that post's
+    comments is read.
+    """
+
+    def __init__(self, db_path: str = "comments.db", sync_interval: float = 1.0):
+        self.db_path = db_path
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counts: Dict[int, int] = {}
+        self._repository = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.added_total = 0
+        self.pages_total = 0
+        self.syncs_total = 0
+
+    def open(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def attach(self, repository):
+        """Write the stored counts onto the repository's posts."""
+        self._repository = repository
+        counts = self._read_counts()
+        for post in repository:
+            self._apply(post["id"], counts.get(post["id"], 0))
+
+    def _read_counts(self) -> Dict[int, int]:
+        with self._lock:
+            return dict(self._conn.execute(_SELECT_COUNTS).fetchall())
+
+    def start(self, repository):
+        """Attach to ``repository`` and start following other workers' counts."""
+        self.attach(repository)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def sync(self):
+        """Apply the counts changed in the database since the last read."""
+        loop = asyncio.get_running_loop()
+        counts = await loop.run_in_executor(None, self._read_counts)
+        # Sadece sayısı değişen yazılar dokunulur
+        for post_id, count in counts.items():
+            if self._counts.get(post_id) != count:
+                self._apply(post_id, count)
+        self.syncs_total += 1
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sync_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break
+            try:
+                await self.sync()
+            except sqlite3.Error:
+                pass
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+    def count(self, post_id: int) -> int:
+        return self._counts.get(post_id, 0)
+
+    def _apply(self, post_id: int, count: int):
+        # Sadece sayısı değişen yazı için dinleyicilere haber verilir
+        self._counts[post_id] = count
+        post = self._repository.get(post_id) if self._repository is not None else None
+        if post is not None and post.get("commentCount") != count:
+            post["commentCount"] = count
+            self._repository.touch(post_id)
+
+    def _insert(self, post_id: int, author: str, content: str) -> Tuple[dict, int]:
+        created_at = datetime.now().isoformat(timespec="microseconds")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                comment_id = self._conn.execute(_INSERT, (post_id, author, content, created_at)).lastrowid
+                count = self._conn.execute(_SELECT_COUNT, (post_id,)).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return _row_to_comment((comment_id, author, content, created_at)), count
+
+    def _select(self, post_id: int, limit: int, after: Optional[CommentKey]) -> Tuple[List[tuple], int]:
+        with self._lock:
+            if after is None:
+                rows = self._conn.execute(_SELECT_PAGE, (post_id, limit)).fetchall()
+            else:
+                rows = self._conn.execute(_SELECT_PAGE_AFTER, (post_id, after[0], after[1], limit)).fetchall()
+            row = self._conn.execute(_SELECT_COUNT, (post_id,)).fetchone()
+        return rows, row[0] if row else 0
+
+    async def add(self, post_id: int, author: str, content: str) -> dict:
+        """Store a comment and return it with its id and timestamps."""
+        loop = asyncio.get_running_loop()
+        comment, count = await loop.run_in_executor(None, self._insert, post_id, author, content)
+        self.added_total += 1
+        self._apply(post_id, count)
+        return comment
+
+    async def page(self, post_id: int, limit: int, after: Optional[CommentKey] = None) -> Tuple[List[dict], Optional[CommentKey]]:
+        """Oldest first, up to ``limit`` comments after the ``after`` key.
+
+        Returns the page and the key to continue after, or None on the last page.
+        """
+        loop = asyncio.get_running_loop()
+        # Bir fazla satır: sonraki sayfa olup olmadığını ayrı sorgu olmadan anlamak için
+        rows, count = await loop.run_in_executor(None, self._select, post_id, limit + 1, after)
+        self.pages_total += 1
+        self._apply(post_id, count)
+        comments = [_row_to_comment(row) for row in rows[:limit]]
+        next_after = (comments[-1]["createdAt"], comments[-1]["id"]) if len(rows) > limit else None
+        return comments, next_after
+
+    def metrics(self) -> dict:
+        return {
+            "tracked_posts": len(self._counts),
+            "added_total": self.added_total,
+            "pages_total": self.pages_total,
+            "syncs_total": self.syncs_total,
+        }
@@ -0,0 +1,306 @@
+"""Sitemap, RSS and Atom feeds built from the post repository.
+
+Each post's ``<url>``, ``<item>`` and ``<entry>`` fragments are rendered
+once and kept until a field that appears in them changes; view count and
+comment updates mark the post dirty but leave its fragments (and ETags)
+alone. Documents are streamed from the cached fragments, so a request only
+writes bytes and never rebuilds the XML. Above ``shard_size`` URLs
+``/sitemap.xml`` becomes a sitemap index pointing at ``/sitemap-<n>.xml``
+shards (the sitemaps.org limit is 50,000 URLs per file).
+"""
+import hashlib
+import heapq
+from bisect import bisect_left, insort
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from response_cache import CachePolicy, etag_matches
+
+SITEMAP_LIMIT = 50000
+# Bir yanıt parçasında gönderilen fragment sayısı
+CHUNK_FRAGMENTS = 500
+
+# Yazının feed/sitemap çıktısına giren alanları; views/comments değişimi yeniden render etmez
+FEED_FIELDS = ("slug", "title", "excerpt", "author", "publishedAt", "category")
+
+# Frontend'de sabit sayfalar (robots.txt ve eski statik sitemap ile aynı)
+STATIC_PAGES = (
+    ("/", "daily", "1.0"),
+    ("/blog", "daily", "0.9"),
+    ("/tools", "weekly", "0.8"),
+    ("/products", "weekly", "0.8"),
+    ("/contact", "monthly", "0.7"),
+)
+
+MEDIA_TYPES = {"sitemap": "application/xml", "rss": "application/rss+xml", "atom": "application/atom+xml"}
+
+
+def published_at(post: dict) -> datetime:
+    try:
+        day = date.fromisoformat(post["publishedAt"][:10])
+    except (KeyError, ValueError):
+        day = date(1970, 1, 1)
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class _Document:
+    """A rendered document: ETag, Last-Modified and the parts to stream."""
+
+    __slots__ = ("etag", "last_modified", "head", "parts", "tail")
+
+    def __init__(self, etag: str, last_modified: datetime, head: bytes, parts: List[bytes], tail: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.head = head
+        self.parts = parts
+        self.tail = tail
+
+
+class FeedBuilder:
+    """Keeps per-post XML fragments in sync with ``PostRepository``.
+
+    Register :meth:`post_changed` with ``PostRepository.on_change``. Changed
+    posts are re-rendered lazily on the next request, and the documents
+    built from them are cached until a fragment actually changes.
+    """
+
+    def __init__(
+        self,
+        repository,
+        site_url: str,
+        title: str,
+        description: str,
+        feed_size: int = 50,
+        shard_size: int = SITEMAP_LIMIT,
+    ):
+        self.repository = repository
+        self.site_url = site_url.rstrip("/")
+        self.title = title
+        self.description = description
+        self.feed_size = feed_size
+        self.shard_size = min(shard_size, SITEMAP_LIMIT)
+
+        # post id -> (alan parmak izi, {"sitemap"|"rss"|"atom": bayt}, özet, yayın tarihi)
+        self._fragments: Dict[int, Tuple[tuple, Dict[str, bytes], bytes, datetime]] = {}
+        self._ids: List[int] = []
+        self._dirty: Set[int] = {post["id"] for post in repository}
+        self._documents: Dict[Tuple[str, int], _Document] = {}
+        self._static = [self._static_fragment(path, changefreq, priority) for path, changefreq, priority in STATIC_PAGES]
+
+        self.renders = 0
+        self.builds = 0
+
+    def post_changed(self, post_id: int):
+        self._dirty.add(post_id)
+
+    # Fragment'lar
+    def _post_url(self, post: dict) -> str:
+        return f"{self.site_url}/blog/{post['slug']}"
+
+    def _static_fragment(self, path: str, changefreq: str, priority: str) -> bytes:
+        return (
+            f"<url><loc>{escape(self.site_url + path)}</loc>"
+            f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n"
+        ).encode()
+
+    def _render(self, post: dict) -> Dict[str, bytes]:
+        url = escape(self._post_url(post))
+        published = published_at(post)
+        title = escape(post["title"])
+        summary = escape(post.get("excerpt", ""))
+        author = escape(post.get("author", ""))
+        category = post.get("category", "")
+        sitemap = (
+            f"<url><loc>{url}</loc><lastmod>{published.date().isoformat()}</lastmod>"
+            f"<changefreq>weekly</changefreq><priority>0.8</priority></url>\n"
+        )
+        rss = (
+            f"<item><title>{title}</title><link>{url}</link><guid isPermaLink=\"true\">{url}</guid>"
+            f"<pubDate>{format_datetime(published)}</pubDate><dc:creator>{author}</dc:creator>"
+            f"<category>{escape(category)}</category><description>{summary}</description></item>\n"
+        )
+        atom = (
+            f"<entry><title>{title}</title><link rel=\"alternate\" href={quoteattr(self._post_url(post))}/>"
+            f"<id>{url}</id><published>{published.isoformat()}</published><updated>{published.isoformat()}</updated>"
+            f"<author><name>{author}</name></author><category term={quoteattr(category)}/>"
+            f"<summary>{summary}</summary></entry>\n"
+        )
+        return {"sitemap": sitemap.encode(), "rss": rss.encode(), "atom": atom.encode()}
+
+    def _refresh(self):
+        """Re-render dirty posts; drops cached documents only if a fragment changed."""
+        if not self._dirty:
+            return
+        changed = False
+        for post_id in self._dirty:
+            post = self.repository.get(post_id)
+            if post is None:
+                if self._fragments.pop(post_id, None) is not None:
+                    del self._ids[bisect_left(self._ids, post_id)]
+                    changed = True
+                continue
+            fingerprint = tuple(str(post.get(field)) for field in FEED_FIELDS)
+            current = self._fragments.get(post_id)
+            if current is not None and current[0] == fingerprint:
+                continue
+            fragments = self._render(post)
+            digest = hashlib.blake2b(b"".join(fragments.values()), digest_size=16).digest()
+            if current is None:
+                insort(self._ids, post_id)
+            self._fragments[post_id] = (fingerprint, fragments, digest, published_at(post))
+            self.renders += 1
+            changed = True
+        self._dirty.clear()
+        if changed:
+            self._documents.clear()
+
+    # Belgeler
+    def sitemap_shards(self) -> int:
+        """Number of ``/sitemap-<n>.xml`` files; 0 means ``/sitemap.xml`` is a plain urlset."""
+        self._refresh()
+        total = len(self._static) + len(self._ids)
+        return 0 if total <= self.shard_size else -(-total // self.shard_size)
+
+    def document(self, kind: str, shard: int = 0) -> Optional[_Document]:
+        """``kind`` is ``sitemap``, ``rss``, ``atom`` or ``sitemap-index``; None for a missing shard."""
+        self._refresh()
+        key = (kind, shard)
+        document = self._documents.get(key)
+        if document is None:
+            document = self._build(kind, shard)
+            if document is None:
+                return None
+            self._documents[key] = document
+            self.builds += 1
+        return document
+
+    def _build(self, kind: str, shard: int) -> Optional[_Document]:
+        if kind == "sitemap-index":
+            return self._build_index()
+        if kind == "sitemap":
+            return self._build_sitemap(shard)
+        # Feed'ler: en yeni feed_size yazı, yayın tarihine göre
+        ids = heapq.nlargest(self.feed_size, self._ids, key=lambda post_id: (self._fragments[post_id][3], post_id))
+        updated = self._updated(ids)
+        parts = [self._fragments[post_id][1][kind] for post_id in ids]
+        etag = self._etag(kind, ids)
+        self_url = f"{self.site_url}/{kind}.xml"
+        if kind == "rss":
+            head = (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+                f"<channel><title>{escape(self.title)}</title><link>{escape(self.site_url)}/</link>"
+                f"<description>{escape(self.description)}</description>"
+                f"<lastBuildDate>{format_datetime(updated)}</lastBuildDate>"
+                f'<atom:link href={quoteattr(self_url)} rel="self" type="application/rss+xml"/>\n'
+            )
+            tail = "</channel>\n</rss>\n"
+        else:
+            head = (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+                f"<title>{escape(self.title)}</title><subtitle>{escape(self.description)}</subtitle>"
+                f"<id>{escape(self.site_url)}/</id><updated>{updated.isoformat()}</updated>"
+                f'<link rel="self" href={quoteattr(self_url)}/><link rel="alternate" href={quoteattr(self.site_url + "/")}/>\n'
+            )
+            tail = "</feed>\n"
+        return _Document(etag, updated, head.encode(), parts, tail.encode())
+
+    def _build_sitemap(self, shard: int) -> Optional[_Document]:
+        shards = self.sitemap_shards()
+        if (shards == 0 and shard != 0) or (shards and not 1 <= shard <= shards):
+            return None
+        # Sabit sayfalar ilk parçada, ardından yazılar id sırasıyla
+        start, stop = ((shard - 1) * self.shard_size, shard * self.shard_size) if shard else (0, None)
+        static = self._static[start:stop]
+        post_start = max(start - len(self._static), 0)
+        post_stop = None if stop is None else max(stop - len(self._static), 0)
+        ids = self._ids[post_start:post_stop]
+        parts = static + [self._fragments[post_id][1]["sitemap"] for post_id in ids]
+        updated = self._updated(ids)
+        head = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        return _Document(self._etag(f"sitemap-{shard}", ids), updated, head.encode(), parts, b"</urlset>\n")
+
+    def _build_index(self) -> Optional[_Document]:
+        shards = self.sitemap_shards()
+        if shards == 0:
+            return None
+        parts = []
+        updated = _EPOCH
+        for shard in range(1, shards + 1):
+            document = self.document("sitemap", shard)
+            updated = max(updated, document.last_modified)
+            # Sadece sabit sayfaları içeren parçanın tarihi yok
+            lastmod = "" if document.last_modified == _EPOCH else f"<lastmod>{document.last_modified.date().isoformat()}</lastmod>"
+            parts.append(f"<sitemap><loc>{escape(self.site_url)}/sitemap-{shard}.xml</loc>{lastmod}</sitemap>\n".encode())
+        head = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        return _Document(self._etag("index", self._ids), updated, head.encode(), parts, b"</sitemapindex>\n")
+
+    def _updated(self, ids: List[int]) -> datetime:
+        return max((self._fragments[post_id][3] for post_id in ids), default=_EPOCH)
+
+    def _etag(self, kind: str, ids: List[int]) -> str:
+        # Fragment özetleri üzerinden: aynı içerik her worker'da aynı ETag'i verir
+        digest = hashlib.blake2b(f"{kind}:{self.site_url}".encode(), digest_size=16)
+        for post_id in ids:
+            digest.update(self._fragments[post_id][2])
+        return '"' + digest.hexdigest() + '"'
+
+    def metrics(self) -> dict:
+        return {
+            "posts": len(self._ids),
+            "dirty": len(self._dirty),
+            "documents": len(self._documents),
+            "renders_total": self.renders,
+            "builds_total": self.builds,
+        }
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _not_modified(request: Request, document: _Document) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, document.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return document.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def serve_document(request: Request, document: _Document, kind: str, policy: CachePolicy) -> Response:
+    """Conditional response that streams ``document`` in chunks."""
+    headers = {
+        "ETag": document.etag,
+        "Last-Modified": format_datetime(document.last_modified, usegmt=True),
+        "Cache-Control": policy.cache_control,
+    }
+    if _not_modified(request, document):
+        return Response(status_code=304, headers=headers)
+    media_type = MEDIA_TYPES[kind] + "; charset=utf-8"
+    if request.method == "HEAD":
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    async def stream():
+        yield document.head
+        parts = document.parts
+        for start in range(0, len(parts), CHUNK_FRAGMENTS):
+            yield b"".join(parts[start:start + CHUNK_FRAGMENTS])
+        yield document.tail
+
+    return StreamingResponse(stream(), headers=headers, media_type=media_type)
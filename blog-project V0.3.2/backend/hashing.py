@@ -0,0 +1,93 @@
+"""Password hashing offloaded to a bounded process pool.
+
+bcrypt is pure CPU work (~250ms at cost 12). Running it inside an async
+handler blocks the event loop, so every other request waits behind a
+login burst. Here hashes run in worker processes, and once all workers
+plus a small queue are busy new requests are rejected immediately.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext  # type: ignore
+
+_pwd_context: Optional[CryptContext] = None
+
+
+def _context() -> CryptContext:
+    # Her worker process kendi CryptContext'ini bir kez oluşturur
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def hash_password(password: str) -> str:
+    return _context().hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return _context().verify(password, hashed_password)
+
+
+class HasherSaturated(Exception):
+    """Raised when every hashing slot is taken."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool with admission control.
+
+    At most ``workers + max_queue`` hash/verify calls are accepted at once;
+    beyond that :class:`HasherSaturated` is raised right away instead of
+    letting requests pile up.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 2 if max_queue is None else max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+        self.completed_total = 0
+        self.rejected_total = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn, *args):
+        if self._in_flight >= self.capacity:
+            self.rejected_total += 1
+            raise HasherSaturated()
+        self.start()
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self.completed_total += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total,
+        }
@@ -0,0 +1,121 @@
+"""Image type detection and resized avatar variants.
+
+Variants are rendered with Pillow in a process pool so decoding and
+resizing never run on the event loop. Pillow is optional: without it
+uploads still work, they just have no variants.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+try:
+    from PIL import Image, ImageOps  # type: ignore
+except ImportError:  # pragma: no cover - Pillow kurulu değilse varyant üretilmez
+    Image = None
+
+AVATAR_SIZES = (64, 128, 256)
+
+# İlk baytlar -> (MIME tipi, dosya uzantısı)
+_SIGNATURES = (
+    (b"\xff\xd8\xff", ("image/jpeg", "jpg")),
+    (b"\x89PNG\r\n\x1a\n", ("image/png", "png")),
+    (b"GIF87a", ("image/gif", "gif")),
+    (b"GIF89a", ("image/gif", "gif")),
+)
+SNIFF_BYTES = 12
+
+
+def sniff_image_type(head: bytes) -> Optional[tuple]:
+    """Return ``(mime, extension)`` from the file's magic bytes, or None."""
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ("image/webp", "webp")
+    return None
+
+
+class InvalidImage(Exception):
+    """Raised when the file cannot be decoded as an image."""
+
+
+def render_variants(source_path: str, target_prefix: str, sizes: Iterable[int]) -> Dict[int, str]:
+    """Write square WebP thumbnails ``<target_prefix>_<size>.webp``; runs in a worker process."""
+    try:
+        with Image.open(source_path) as image:
+            image.load()
+            # Telefon fotoğraflarındaki EXIF yönünü uygula, GIF'lerde ilk kare kullanılır
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+            paths = {}
+            for size in sizes:
+                path = f"{target_prefix}_{size}.webp"
+                # Aynı içerik eşzamanlı yüklenirse yarım dosya görünmesin diye önce geçici ada yazılır
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                ImageOps.fit(image, (size, size), Image.LANCZOS).save(temp_path, "WEBP", quality=82, method=4)
+                os.replace(temp_path, path)
+                paths[size] = path
+            return paths
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        raise InvalidImage(str(exc)) from None
+
+
+class ImagePipeline:
+    """Renders avatar variants in a small process pool."""
+
+    def __init__(self, workers: int = 1, sizes: Iterable[int] = AVATAR_SIZES):
+        self.workers = workers
+        self.sizes = tuple(sizes)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.rendered_total = 0
+        self.failed_total = 0
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def start(self):
+        if self._executor is None and self.available:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def existing(self, target_prefix: str) -> Optional[Dict[int, str]]:
+        """Variant paths if every size is already on disk, else None."""
+        paths = {size: f"{target_prefix}_{size}.webp" for size in self.sizes}
+        return paths if all(os.path.exists(path) for path in paths.values()) else None
+
+    async def variants(self, source_path: str, target_prefix: str) -> Dict[int, str]:
+        """Render every size for ``source_path``; empty if Pillow is missing."""
+        if not self.available:
+            return {}
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            paths = await loop.run_in_executor(self._executor, render_variants, source_path, target_prefix, self.sizes)
+        except InvalidImage:
+            self.failed_total += 1
+            raise
+        self.rendered_total += 1
+        return paths
+
+    def metrics(self) -> dict:
+        return {
+            "available": self.available,
+            "workers": self.workers,
+            "rendered_total": self.rendered_total,
+            "failed_total": self.failed_total,
+        }
+
+
+def remove_files(paths: Iterable[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,66 @@
+"""Non-blocking, sampled, structured logging for the API.
+
+Handlers only put records on a queue; a ``QueueListener`` thread formats
+them as JSON lines and writes them to stderr, so a slow terminal or log
+collector never stalls the event loop. Records below WARNING can be
+sampled to keep hot paths cheap under load.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "blogx"
+
+# LogRecord'un kendi alanları; geri kalanlar extra={...} ile gelen alanlardır
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rate`` of the records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+def setup_logging(level: str = "INFO", sample_rate: float = 1.0) -> QueueListener:
+    """Route the ``blogx`` logger through a queue; returns the (not started) listener.
+
+    Calling it again replaces the previous handler, so re-importing the
+    app does not duplicate output.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [queue_handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter())
+    return QueueListener(log_queue, output, respect_handler_level=True)
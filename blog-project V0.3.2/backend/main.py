@@ -1,24 +1,80 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import uvicorn
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+import base64
+import csv
 import json
 import os
+import secrets
 import shutil
-from passlib.context import CryptContext # type: ignore
 from jose import JWTError, jwt
+from repository import (
+    JsonFavoriteRepository,
+    JsonUserRepository,
+    JsonSubscriberRepository,
+    PostRepository,
+    paginate_ids,
+)
+from sqlite_repository import (
+    SQLiteDatabase,
+    SQLiteFavoriteRepository,
+    SQLiteSubscriberRepository,
+    SQLiteUserRepository,
+    count_favorites,
+    migrate_json,
+    normalize_subscribers,
+)
+from storage import JournaledStore
+from persistence import WriteBehindQueue
+from hashing import HasherSaturated, PasswordHasher
+from token_cache import TokenCache
+from views import ViewCounter
+from comments import CommentStore, decode_key, encode_key
+from related import RelatedPosts
+from trending import TrendingPosts
+from images import ImagePipeline, InvalidImage, sniff_image_type
+from uploads import UploadError, UploadTooLarge, receive_file
+from media import SAFE_NAME as SAFE_UPLOAD_NAME, MediaStore, serve_file
+from metrics import MetricsMiddleware, MetricsRegistry
+from logging_config import LOGGER_NAME, setup_logging
+from response_cache import CachePolicy, ResponseCache
+from post_encoder import PostEncoder
+from feeds import FeedBuilder, serve_document
+from stats import BlogStats
+from newsletter import EXPORT_FORMATS, ImportReport, export_lines, normalize_batch, normalize_email, read_csv_batches
+from decouple import Csv, config
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dosyalar, veritabanları ve havuzlar import sırasında değil, worker ayağa kalkarken açılır
+    await start_services()
+    try:
+        yield
+    finally:
+        await stop_services()
+
+app = FastAPI(title="BlogX API", version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title="BlogX API", version="1.0.0")
+# Loglar kuyruk üzerinden arka plan thread'inde JSON satırı olarak yazılır
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+LOG_SAMPLE_RATE = config("LOG_SAMPLE_RATE", default=1.0, cast=float)  # WARNING altı kayıtların tutulan oranı
+log_listener = setup_logging(LOG_LEVEL, sample_rate=LOG_SAMPLE_RATE)
+logger = logging.getLogger(LOGGER_NAME)
 
-# Create uploads directory if it doesn't exist
-os.makedirs("uploads", exist_ok=True)
+# Yükleme sürerken dosyalar burada tutulur (aynı dosya sisteminde, /uploads dışında)
+UPLOAD_TMP_DIR = config("UPLOAD_TMP_DIR", default="upload_tmp")
 
-# Static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Yüklenen dosyalar içerik hash'iyle saklanır, /uploads/{name} route'undan immutable olarak sunulur
+MEDIA_DB = config("MEDIA_DB", default="media.db")
+media_store = MediaStore("uploads", MEDIA_DB)
 
 # CORS middleware
 app.add_middleware(
@@ -27,8 +83,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Route bazında gecikme histogramları; Prometheus formatında /metrics
+metrics_registry = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 # Security
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
@@ -36,7 +97,44 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 security = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt işlemci havuzunda çalışır; havuz ve kuyruk doluysa 503 döner
+HASH_WORKERS = config("HASH_WORKERS", default=0, cast=int) or None  # 0: çekirdek sayısı
+HASH_MAX_QUEUE = config("HASH_MAX_QUEUE", default=-1, cast=int)  # -1: 2 x worker
+password_hasher = PasswordHasher(workers=HASH_WORKERS, max_queue=None if HASH_MAX_QUEUE < 0 else HASH_MAX_QUEUE)
+
+# Doğrulanmış token -> User; kullanıcı değişince invalidate edilir.
+# invalidate_user sadece bu worker'ı temizler; diğer worker'lardaki değişiklikler
+# kayıt TOKEN_CACHE_RECHECK saniyeden eskiyse kullanıcı veritabanından yeniden okunarak görülür
+TOKEN_CACHE_SIZE = config("TOKEN_CACHE_SIZE", default=10000, cast=int)
+TOKEN_CACHE_TTL = config("TOKEN_CACHE_TTL", default=300, cast=float)
+TOKEN_CACHE_RECHECK = config("TOKEN_CACHE_RECHECK", default=5, cast=float)
+token_cache = TokenCache(max_size=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL, recheck_interval=TOKEN_CACHE_RECHECK)
+
+# Bülten aboneleri: CSV içe/dışa aktarma sadece NEWSLETTER_ADMINS (virgülle ayrılmış email) hesaplarına açık
+NEWSLETTER_ADMINS = config("NEWSLETTER_ADMINS", default="", cast=Csv(post_process=lambda emails: {e.lower() for e in emails}))
+MAX_SUBSCRIBER_IMPORT_SIZE = config("MAX_SUBSCRIBER_IMPORT_SIZE", default=50 * 1024 * 1024, cast=int)
+SUBSCRIBER_BATCH_SIZE = 1000
+
+# Avatar yükleme: en fazla 5MB, varyantlar Pillow ile ayrı process'lerde üretilir
+MAX_AVATAR_SIZE = 5 * 1024 * 1024
+IMAGE_WORKERS = config("IMAGE_WORKERS", default=1, cast=int)
+image_pipeline = ImagePipeline(workers=IMAGE_WORKERS)
+# Gövde elle okunduğu için dokümantasyondaki form alanı burada tanımlanır
+FILE_UPLOAD_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
 
 # Pydantic models
 class BlogPost(BaseModel):
@@ -52,13 +150,37 @@ class BlogPost(BaseModel):
     tags: List[str]
     image: str
     views: int
-    comments: List[dict] = []
+    # Yorumlar ayrı tutulur (comments.py), yazıda sadece sayısı döner
+    commentCount: int = 0
+    # Yazı eklenirken markdown'dan üretilir (rendering.py)
+    contentHtml: str = ""
+    toc: List[dict] = []
+    wordCount: int = 0
+
+class PostSummary(BaseModel):
+    id: int
+    title: str
+    slug: str
+    excerpt: str
+    author: str
+    publishedAt: str
+    readTime: str
+    category: str
+    tags: List[str]
+    image: str
+    views: int
+    commentCount: int = 0
 
 class Comment(BaseModel):
     id: int
     author: str
     content: str
     publishedAt: str
+    createdAt: str
+
+class CommentCreate(BaseModel):
+    author: str
+    content: str
 
 class Newsletter(BaseModel):
     email: str
@@ -70,6 +192,7 @@ class User(BaseModel):
     lastName: str
     phone: Optional[str] = None
     avatar: Optional[str] = None
+    avatarVariants: Optional[Dict[str, str]] = None  # boyut (px) -> WebP URL
     joinDate: str
     isActive: bool = True
 
@@ -118,8 +241,7 @@ blog_posts = [
         "category": "Technology",
         "tags": ["AI", "Development", "Future"],
         "image": "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=400&fit=crop",
-        "views": 1250,
-        "comments": []
+        "views": 1250
     },
     {
         "id": 2,
@@ -133,79 +255,185 @@ blog_posts = [
         "category": "Web Development",
         "tags": ["Best Practices", "Performance", "Security"],
         "image": "https://images.unsplash.com/photo-1461749280684-dccba630e2f6?w=800&h=400&fit=crop",
-        "views": 890,
-        "comments": []
+        "views": 890
     }
 ]
 
-categories = ["All", "Technology", "Web Development", "3D Graphics", "Cybersecurity", "AI & Machine Learning"]
-newsletter_subscribers = []
+# Yazılara id/slug/kategori/etiket ve arama indeksleri üzerinden erişilir; başlangıçta doldurulur
+post_repository = PostRepository()
 
-# Favorites database (in production, use real database)
-favorites_file = "favorites.json"
+# Görüntülenmeler bellekte sayılır, periyodik olarak SQLite'a toplanır
+VIEWS_DB = config("VIEWS_DB", default="views.db")
+VIEWS_FLUSH_INTERVAL = config("VIEWS_FLUSH_INTERVAL", default=1.0, cast=float)
+view_counter = ViewCounter(VIEWS_DB, flush_interval=VIEWS_FLUSH_INTERVAL)
 
-def load_favorites():
-    try:
-        with open(favorites_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+# Yorumlar yazılardan ayrı, kendi SQLite dosyasında; yazıya sadece commentCount yazılır.
+# Diğer worker'ların eklediği yorumların sayısı COMMENTS_SYNC_INTERVAL saniyede bir okunur
+COMMENTS_DB = config("COMMENTS_DB", default="comments.db")
+COMMENTS_SYNC_INTERVAL = config("COMMENTS_SYNC_INTERVAL", default=1.0, cast=float)
+comment_store = CommentStore(COMMENTS_DB, sync_interval=COMMENTS_SYNC_INTERVAL)
 
-def save_favorites(favorites_data):
-    with open(favorites_file, 'w', encoding='utf-8') as f:
-        json.dump(favorites_data, f, ensure_ascii=False, indent=2)
+# İstatistikler her yazımda güncellenen sayaçlardan okunur
+STATS_MAX_DAYS = config("STATS_MAX_DAYS", default=365, cast=int)
+STATS_HISTORY_BUCKET = config("STATS_HISTORY_BUCKET", default=3600, cast=int)  # saniye
+STATS_HISTORY_SIZE = config("STATS_HISTORY_SIZE", default=0, cast=int)  # 0: geçmiş tutulmaz
+blog_stats = BlogStats(max_days=STATS_MAX_DAYS, bucket_seconds=STATS_HISTORY_BUCKET, history_buckets=STATS_HISTORY_SIZE)
 
-user_favorites = load_favorites()
+# Okuma endpoint'lerinin serialize edilmiş cevapları; yazmalar ilgili etiketlerin versiyonunu artırır
+RESPONSE_CACHE_SIZE = config("RESPONSE_CACHE_SIZE", default=1024, cast=int)
+STATS_CACHE_TTL = config("STATS_CACHE_TTL", default=5.0, cast=float)
+# Görüntülenme birleştirmeleri "posts" etiketini artırmaz (her saniye bütün liste önbelleği ve ETag'ler
+# yenilenirdi); listelerdeki views en fazla POSTS_LIST_CACHE_TTL saniye geride kalır
+POSTS_LIST_CACHE_TTL = config("POSTS_LIST_CACHE_TTL", default=60.0, cast=float)
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE)
+post_repository.on_change(lambda post_id: response_cache.bump(f"post:{post_id}"))
+post_repository.on_change(lambda post_id: response_cache.bump("posts"), counters=False)
+# Yazılar bir kez doğrulanıp encode edilir; liste cevapları bu parçalardan birleştirilir
+post_encoder = PostEncoder(BlogPost, PostSummary)
+post_repository.on_change(post_encoder.invalidate)
+# Sitemap/RSS/Atom: yazı başına XML parçaları, sadece feed'e giren alanlar değişince yeniden üretilir
+SITE_URL = config("SITE_URL", default="https://blogx.com")
+FEED_SIZE = config("FEED_SIZE", default=50, cast=int)
+SITEMAP_SHARD_SIZE = config("SITEMAP_SHARD_SIZE", default=50000, cast=int)
+feed_builder = FeedBuilder(
+    post_repository, SITE_URL, "BlogX", "Technology, web development and AI articles",
+    feed_size=FEED_SIZE, shard_size=SITEMAP_SHARD_SIZE,
+)
+post_repository.on_change(feed_builder.post_changed)
+# İlgili yazılar: terim/etiket/kategori benzerliği NumPy ile toplu hesaplanır; değişen yazılar
+# arka planda her RELATED_REFRESH_INTERVAL saniyede bir yeniden hesaplanır, istek sadece hazır listeyi okur
+RELATED_SIZE = config("RELATED_SIZE", default=10, cast=int)
+RELATED_TERM_DIMENSIONS = config("RELATED_TERM_DIMENSIONS", default=256, cast=int)
+RELATED_REFRESH_INTERVAL = config("RELATED_REFRESH_INTERVAL", default=1.0, cast=float)  # değişen yazılar bu aralıkla işlenir
+related_posts = RelatedPosts(
+    post_repository, size=RELATED_SIZE, term_dimensions=RELATED_TERM_DIMENSIONS, refresh_interval=RELATED_REFRESH_INTERVAL,
+)
+post_repository.on_change(related_posts.post_changed)
+# Trend yazılar: görüntülenmeler yarı ömrü TRENDING_HALF_LIFE saniye olan üstel azalmayla sayılır
+TRENDING_SIZE = config("TRENDING_SIZE", default=50, cast=int)
+TRENDING_HALF_LIFE = config("TRENDING_HALF_LIFE", default=6 * 3600, cast=float)
+# Sönmüş skorlar views.db'ye kaydedilir; yeniden başlatmada tüm zamanların görüntülenmesiyle değil, bunlarla devam edilir
+TRENDING_SAVE_INTERVAL = config("TRENDING_SAVE_INTERVAL", default=60, cast=float)
+trending_posts = TrendingPosts(
+    size=TRENDING_SIZE, half_life=TRENDING_HALF_LIFE, db_path=VIEWS_DB, save_interval=TRENDING_SAVE_INTERVAL,
+)
+view_counter.on_views(trending_posts.record)
+# no-cache: tarayıcı her seferinde ETag ile doğrular, değişmediyse 304 alır
+POSTS_CACHE = CachePolicy("no-cache")
+POSTS_LIST_CACHE = CachePolicy("no-cache", ttl=POSTS_LIST_CACHE_TTL)
+CATEGORIES_CACHE = CachePolicy("public, max-age=3600")
+FEEDS_CACHE = CachePolicy("public, max-age=300")
+# Abone sayısı diğer worker'larda da değişebilir, sunucu tarafı kopya en fazla STATS_CACHE_TTL saniye yaşar
+STATS_CACHE = CachePolicy("no-cache", ttl=STATS_CACHE_TTL)
 
-# Sample users database (in production, use real database)
-# JSON dosyasından kullanıcı verilerini yükle
+categories = ["All", "Technology", "Web Development", "3D Graphics", "Cybersecurity", "AI & Machine Learning"]
+
+# Kullanıcı, favori ve abone verileri için depolama:
+#   sqlite: tüm worker'lar aynı veritabanını paylaşır (uvicorn --workers N)
+#   json: users.json / favorites.json + journal, tek worker için
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="sqlite")
+DATABASE_PATH = config("DATABASE_PATH", default="blogx.db")
+DATABASE_POOL_SIZE = config("DATABASE_POOL_SIZE", default=4, cast=int)
+
+# Write-behind: handler'lar sadece kaydı kirli işaretler, disk yazımı arka planda
+PERSIST_FLUSH_INTERVAL = config("PERSIST_FLUSH_INTERVAL", default=0.2, cast=float)
+# Bu kadar kayıt kirlenince aralık beklenmeden yazılır; yazanları bekletmez, kuyruğa üst sınır değildir
+PERSIST_FLUSH_THRESHOLD = config("PERSIST_FLUSH_THRESHOLD", default=1000, cast=int)
+persistence_queue = WriteBehindQueue(flush_interval=PERSIST_FLUSH_INTERVAL, flush_threshold=PERSIST_FLUSH_THRESHOLD)
+
+# /api/metrics/* sayaçları /metrics'te de gauge olarak yayınlanır
+metrics_registry.add_collector("persistence", persistence_queue.metrics)
+metrics_registry.add_collector("hashing", password_hasher.metrics)
+metrics_registry.add_collector("auth_cache", token_cache.metrics)
+metrics_registry.add_collector("views", view_counter.metrics)
+metrics_registry.add_collector("comments", comment_store.metrics)
+metrics_registry.add_collector("response_cache", response_cache.metrics)
+metrics_registry.add_collector("post_encoder", post_encoder.metrics)
+metrics_registry.add_collector("feeds", feed_builder.metrics)
+metrics_registry.add_collector("related", related_posts.metrics)
+metrics_registry.add_collector("trending", trending_posts.metrics)
+metrics_registry.add_collector("stats", blog_stats.summary)
+metrics_registry.add_collector("images", image_pipeline.metrics)
+metrics_registry.add_collector("media", media_store.metrics)
+
+# Eski sürümlerin JSON dosyaları; json depolama ilk açılışta bunları binary snapshot'a çevirir
+favorites_file = "favorites.json"
 users_file = "users.json"
+subscribers_file = "subscribers.json"
+favorites_snapshot = "favorites.snapshot"
+users_snapshot = "users.snapshot"
+subscribers_snapshot = "subscribers.snapshot"
 
-def load_users():
-    try:
-        with open(users_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        # İlk çalıştırmada dosya yoksa demo kullanıcı oluştur
-        initial_users = {
-            "demo@blogx.com": {
-                "id": 1,
-                "email": "demo@blogx.com",
-                "firstName": "Demo",
-                "lastName": "User",
-                "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # secret
-                "phone": "+90 555 123 45 67",
-                "avatar": None,
-                "joinDate": "2024-01-01T00:00:00",
-                "isActive": True
-            }
+def initial_users():
+    # İlk çalıştırmada dosya yoksa demo kullanıcı oluştur
+    return {
+        "demo@blogx.com": {
+            "id": 1,
+            "email": "demo@blogx.com",
+            "firstName": "Demo",
+            "lastName": "User",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # secret
+            "phone": "+90 555 123 45 67",
+            "avatar": None,
+            "joinDate": "2024-01-01T00:00:00",
+            "isActive": True
         }
-        save_users(initial_users)
-        return initial_users
+    }
+
+if STORAGE_BACKEND == "sqlite":
+    database = SQLiteDatabase(DATABASE_PATH, pool_size=DATABASE_POOL_SIZE)
+    user_repository = SQLiteUserRepository(database)
+    favorite_repository = SQLiteFavoriteRepository(database)
+    subscriber_repository = SQLiteSubscriberRepository(database)
+    json_stores = []
+else:
+    database = None
+    # Snapshot mmap ile açılır, kayıtlar ilk erişimde çözülür; değişiklikler
+    # <dosya>.journal dosyasına eklenir, arka planda yeni snapshot'a katlanır
+    json_stores = [
+        JournaledStore(users_snapshot, initial=initial_users, writer=persistence_queue, legacy_path=users_file),
+        JournaledStore(favorites_snapshot, writer=persistence_queue, legacy_path=favorites_file),
+        JournaledStore(subscribers_snapshot, writer=persistence_queue, legacy_path=subscribers_file),
+    ]
+    user_repository = JsonUserRepository(json_stores[0])
+    favorite_repository = JsonFavoriteRepository(json_stores[1])
+    subscriber_repository = JsonSubscriberRepository(json_stores[2])
 
-def save_users(users_data):
-    with open(users_file, 'w', encoding='utf-8') as f:
-        json.dump(users_data, f, ensure_ascii=False, indent=2)
+# Sayfalama: ?limit=&after=<cursor>, sonraki sayfanın cursor'ı X-Next-Cursor header'ında
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
-fake_users_db = load_users()
+def encode_cursor(kind: str, value: Union[int, str]) -> str:
+    # k: son görülen post id (keyset), o: arama sonuçlarında offset, c: son görülen yorum (zaman|id)
+    return base64.urlsafe_b64encode(f"{kind}:{value}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, kind: str, parse=int):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_kind, value = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        if cursor_kind != kind:
+            raise ValueError(cursor_kind)
+        return parse(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # Auth helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
-def get_user(email: str):
-    if email in fake_users_db:
-        user_dict = fake_users_db[email]
+async def get_user(email: str):
+    user_dict = await user_repository.get(email)
+    if user_dict is not None:
         return User(**user_dict)
 
-def authenticate_user(email: str, password: str):
-    user = fake_users_db.get(email)
+async def authenticate_user(email: str, password: str):
+    user = await user_repository.get(email)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password(password, user["hashed_password"]):
         return False
     return user
 
@@ -220,6 +448,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        if not token_cache.needs_recheck(token):
+            return cached_user
+        # Başka bir worker kullanıcıyı değiştirmiş olabilir: tek satırlık okuma, JWT tekrar çözülmez
+        user = await get_user(email=cached_user.email)
+        if user is not None:
+            token_cache.revalidate(token, user)
+            return user
+        # Email başka worker'da değişti; token baştan doğrulanır
+        token_cache.invalidate_user(cached_user.email)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -233,11 +473,82 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(email=token_data.email)
+    user = await get_user(email=token_data.email)
     if user is None:
         raise credentials_exception
+    token_cache.put(token, user, email=user.email, exp=payload.get("exp"))
     return user
 
+async def require_newsletter_admin(current_user: User = Depends(get_current_user)):
+    if current_user.email.lower() not in NEWSLETTER_ADMINS:
+        raise HTTPException(status_code=403, detail="Bu işlem için yetkiniz yok")
+    return current_user
+
+@app.exception_handler(HasherSaturated)
+async def hasher_saturated_handler(request, exc):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Sunucu şu anda çok yoğun, lütfen tekrar deneyin"},
+        headers={"Retry-After": "1"},
+    )
+
+def initialize_database(conn):
+    database.initialize()
+    count_favorites(conn)
+    normalize_subscribers(conn)
+    # json depolamadan geçişte güncel veri snapshot'ta, yoksa eski JSON dosyalarında
+    files = [
+        snapshot if os.path.exists(snapshot) else legacy
+        for snapshot, legacy in ((users_snapshot, users_file), (favorites_snapshot, favorites_file))
+    ]
+    if migrate_json(conn, *files):
+        logger.info("Imported JSON data", extra={"files": files, "database": DATABASE_PATH})
+    # Hiç kullanıcı yoksa demo kullanıcı oluştur
+    if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+        SQLiteUserRepository._add(conn, initial_users()["demo@blogx.com"])
+
+async def start_services():
+    log_listener.start()
+    os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+    media_store.open()
+    comment_store.open()
+    for store in json_stores:
+        store.open()
+    if database is not None:
+        await database.run(initialize_database)
+    # Yazılar indekslenir ve render edilir
+    for post in blog_posts:
+        if post_repository.get(post["id"]) is None:
+            post_repository.insert(post)
+    persistence_queue.start()
+    password_hasher.start()
+    image_pipeline.start()
+    view_counter.start(post_repository)
+    comment_store.start(post_repository)
+    trending_posts.start(post_repository)
+    # Tüm yazı çiftlerinin benzerliği arka planda hesaplanır, açılışı bekletmez
+    related_posts.start()
+    # Kayıtlı görüntülenme ve yorum sayıları uygulandıktan sonra sayaçlar başlar
+    blog_stats.attach(post_repository)
+    blog_stats.set_subscribers(await subscriber_repository.count())
+
+async def stop_services():
+    # Kuyrukta bekleyenleri yaz, sonra journal'ları ve veritabanlarını kapat
+    await view_counter.stop()
+    await trending_posts.stop()
+    await comment_store.stop()
+    await related_posts.stop()
+    await persistence_queue.stop()
+    for store in json_stores:
+        store.close()
+    if database is not None:
+        database.close()
+    media_store.close()
+    comment_store.close()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
+    log_listener.stop()
+
 # API Routes
 @app.get("/")
 async def root():
@@ -247,17 +558,15 @@ async def root():
 @app.post("/api/auth/register", response_model=dict)
 async def register_user(user: UserCreate):
     """Register new user"""
-    if user.email in fake_users_db:
+    if await user_repository.get(user.email) is not None:
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user.password)
-    user_id = len(fake_users_db) + 1
+    hashed_password = await get_password_hash(user.password)
     
     new_user = {
-        "id": user_id,
         "email": user.email,
         "firstName": user.firstName,
         "lastName": user.lastName,
@@ -268,8 +577,13 @@ async def register_user(user: UserCreate):
         "isActive": True
     }
     
-    fake_users_db[user.email] = new_user
-    save_users(fake_users_db)  # JSON dosyasına kaydet
+    new_user = await user_repository.add(new_user)
+    if new_user is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
+    user_id = new_user["id"]
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -295,17 +609,17 @@ async def register_user(user: UserCreate):
 @app.post("/api/auth/login", response_model=dict)
 async def login_user(user: UserLogin):
     """Login user"""
-    print(f"Login attempt for: {user.email}")
-    user_data = authenticate_user(user.email, user.password)
+    logger.debug("Login attempt", extra={"email": user.email})
+    user_data = await authenticate_user(user.email, user.password)
     if not user_data:
-        print(f"Failed login for: {user.email}")
+        logger.warning("Failed login", extra={"email": user.email})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"Successful login for: {user.email}")
+    logger.info("Successful login", extra={"email": user.email})
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -322,6 +636,7 @@ async def login_user(user: UserLogin):
             "lastName": user_data["lastName"],
             "phone": user_data["phone"],
             "avatar": user_data["avatar"],
+            "avatarVariants": user_data.get("avatarVariants"),
             "joinDate": user_data["joinDate"]
         }
     }
@@ -336,40 +651,42 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
         "lastName": current_user.lastName,
         "phone": current_user.phone,
         "avatar": current_user.avatar,
+        "avatarVariants": current_user.avatarVariants,
         "joinDate": current_user.joinDate
     }
 
 @app.put("/api/auth/profile", response_model=dict)
 async def update_profile(user_update: UserUpdate, current_user: User = Depends(get_current_user)):
     """Update user profile"""
-    print(f"Profile update request for: {current_user.email}")
+    logger.debug("Profile update request", extra={"email": current_user.email})
     
     # Email değişirse, mevcut kullanıcı kontrolü
     if user_update.email != current_user.email:
-        if user_update.email in fake_users_db:
+        if await user_repository.get(user_update.email) is not None:
             raise HTTPException(
                 status_code=400,
                 detail="Bu e-posta adresi zaten kullanılıyor"
             )
     
-    # Mevcut kullanıcıyı güncelle
+    # Mevcut kullanıcıyı güncelle; email değiştiyse kayıt yeni email'e taşınır
     old_email = current_user.email
-    fake_users_db[old_email].update({
+    updated = await user_repository.update(old_email, {
         "firstName": user_update.firstName,
         "lastName": user_update.lastName,
         "email": user_update.email,
         "phone": user_update.phone
     })
-    
-    # Email değiştiyse, eski key'i sil ve yeni key ile kaydet
+    if updated is None:
+        # Kontrolden sonra başka bir istek aynı emaili aldı
+        raise HTTPException(
+            status_code=400,
+            detail="Bu e-posta adresi zaten kullanılıyor"
+        )
     if user_update.email != old_email:
-        user_data = fake_users_db.pop(old_email)
-        fake_users_db[user_update.email] = user_data
-    
-    # JSON dosyasını güncelle
-    save_users(fake_users_db)
+        await favorite_repository.rename_user(old_email, user_update.email)
+    token_cache.invalidate_user(old_email)
     
-    print(f"Profile updated successfully for: {user_update.email}")
+    logger.info("Profile updated", extra={"email": user_update.email, "previous_email": old_email})
     
     return {
         "message": "Profil başarıyla güncellendi",
@@ -380,6 +697,7 @@ async def update_profile(user_update: UserUpdate, current_user: User = Depends(g
             "lastName": user_update.lastName,
             "phone": user_update.phone,
             "avatar": current_user.avatar,
+            "avatarVariants": current_user.avatarVariants,
             "joinDate": current_user.joinDate
         }
     }
@@ -387,106 +705,125 @@ async def update_profile(user_update: UserUpdate, current_user: User = Depends(g
 @app.put("/api/auth/change-password", response_model=dict)
 async def change_password(password_change: PasswordChange, current_user: User = Depends(get_current_user)):
     """Change user password"""
-    print(f"Password change request for: {current_user.email}")
+    logger.debug("Password change request", extra={"email": current_user.email})
     
     # Mevcut şifreyi kontrol et
-    if not verify_password(password_change.currentPassword, fake_users_db[current_user.email]["hashed_password"]):
+    user_data = await user_repository.get(current_user.email)
+    if not await verify_password(password_change.currentPassword, user_data["hashed_password"]):
         raise HTTPException(
             status_code=400,
             detail="Mevcut şifre yanlış"
         )
     
     # Yeni şifreyi hashle
-    new_hashed_password = get_password_hash(password_change.newPassword)
+    new_hashed_password = await get_password_hash(password_change.newPassword)
     
     # Şifreyi güncelle
-    fake_users_db[current_user.email]["hashed_password"] = new_hashed_password
+    await user_repository.update(current_user.email, {"hashed_password": new_hashed_password})
+    token_cache.invalidate_user(current_user.email)
     
-    # JSON dosyasını güncelle
-    save_users(fake_users_db)
-    
-    print(f"Password changed successfully for: {current_user.email}")
+    logger.info("Password changed", extra={"email": current_user.email})
     
     return {"message": "Şifre başarıyla değiştirildi"}
 
-@app.post("/api/auth/upload-avatar", response_model=dict)
-async def upload_avatar(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+@app.post("/api/auth/upload-avatar", response_model=dict, openapi_extra=FILE_UPLOAD_SCHEMA)
+async def upload_avatar(request: Request, current_user: User = Depends(get_current_user)):
     """Upload user avatar"""
-    print(f"Avatar upload request for: {current_user.email}")
+    logger.debug("Avatar upload request", extra={"email": current_user.email})
+    
+    # Gövde parça parça geçici dosyaya yazılır, 5MB aşılınca okuma kesilir
+    try:
+        upload = await receive_file(request, "file", MAX_AVATAR_SIZE, UPLOAD_TMP_DIR)
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=413,
+            detail="Dosya boyutu 5MB'dan büyük olamaz"
+        )
+    except UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
     
-    # File type kontrolü
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    # File type kontrolü; istemcinin bildirdiği tipe değil dosyanın ilk baytlarına bakılır
+    image_type = sniff_image_type(upload.head)
+    if image_type is None:
+        await run_in_threadpool(os.remove, upload.path)
         raise HTTPException(
             status_code=400,
             detail="Sadece JPEG, PNG, GIF ve WebP formatları desteklenir"
         )
     
-    # File size kontrolü (5MB max)
-    max_size = 5 * 1024 * 1024  # 5MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
+    # Dosya adı içeriğin SHA-256'sı; aynı dosya ikinci kez yüklenirse mevcut kopya kullanılır
+    _, file_extension = image_type
+    file_name = await run_in_threadpool(media_store.put, upload.path, upload.sha256, file_extension)
+    file_path = media_store.path(file_name)
+    
+    # 64/128/256 px WebP varyantları işlemci havuzunda üretilir (daha önce üretildiyse tekrar üretilmez)
+    variant_prefix = media_store.path(upload.sha256)
+    try:
+        variant_paths = image_pipeline.existing(variant_prefix) or await image_pipeline.variants(file_path, variant_prefix)
+    except InvalidImage:
+        await run_in_threadpool(media_store.release, file_name)
         raise HTTPException(
             status_code=400,
-            detail="Dosya boyutu 5MB'dan büyük olamaz"
+            detail="Görsel dosyası okunamadı"
         )
     
-    # Unique filename oluştur
-    file_extension = file.filename.split('.')[-1]
-    unique_filename = f"avatar_{current_user.id}_{int(datetime.now().timestamp())}.{file_extension}"
-    file_path = f"uploads/{unique_filename}"
-    
-    # Dosyayı kaydet
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
-    
-    # Avatar URL'ini oluştur
-    avatar_url = f"http://localhost:8000/uploads/{unique_filename}"
+    # Avatar URL'lerini oluştur
+    avatar_url = f"http://localhost:8000/uploads/{file_name}"
+    avatar_variants = {
+        str(size): f"http://localhost:8000/uploads/{os.path.basename(path)}" for size, path in variant_paths.items()
+    } or None
     
-    # Kullanıcı veritabanında avatar'ı güncelle
-    fake_users_db[current_user.email]["avatar"] = avatar_url
-    save_users(fake_users_db)
+    # Kullanıcı veritabanında avatar'ı güncelle; değiştirilen değer aynı işlemde okunur
+    # (önbellekteki current_user.avatar eşzamanlı yüklemelerde eskimiş olabilir)
+    try:
+        previous_avatar = await user_repository.replace_avatar(current_user.email, avatar_url, avatar_variants)
+    except Exception:
+        # Yazma geri alındı, yeni dosyanın referansı kimseye yazılmadı; bırakılmazsa dosya hiç silinmez.
+        # İptalde (CancelledError) bırakılmaz: thread'deki yazma yine de tamamlanmış olabilir
+        await run_in_threadpool(media_store.release, file_name)
+        raise
+    token_cache.invalidate_user(current_user.email)
+    if previous_avatar is None:
+        await run_in_threadpool(media_store.release, file_name)
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    # Eski avatarın referansı bırakılır (aynı dosya tekrar yüklendiyse fazladan alınan referans);
+    # başka kullanan yoksa dosya ve varyantları silinir
+    await run_in_threadpool(media_store.release, media_store.name_from_url(previous_avatar))
     
-    print(f"Avatar uploaded successfully for: {current_user.email}")
+    logger.info("Avatar uploaded", extra={"email": current_user.email, "bytes": upload.size, "type": image_type[0]})
     
     return {
         "message": "Avatar başarıyla yüklendi",
-        "avatar_url": avatar_url
+        "avatar_url": avatar_url,
+        "avatar_variants": avatar_variants
     }
 
+@app.api_route("/uploads/{name}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_upload(name: str, request: Request):
+    """Serve an uploaded file with ETag, Range and immutable caching"""
+    if not SAFE_UPLOAD_NAME.match(name):
+        raise HTTPException(status_code=404, detail="File not found")
+    return await serve_file(request, media_store.path(name), name)
+
 @app.post("/api/favorites/toggle", response_model=dict)
 async def toggle_favorite(favorite: FavoriteToggle, current_user: User = Depends(get_current_user)):
     """Toggle favorite status for a blog post"""
     user_email = current_user.email
     post_id = favorite.post_id
     
-    print(f"Toggle favorite request - User: {user_email}, Post ID: {post_id}")
-    print(f"Current user_favorites: {user_favorites}")
-    
-    # Kullanıcının favori listesi yoksa oluştur
-    if user_email not in user_favorites:
-        user_favorites[user_email] = []
-        print(f"Created new favorites list for user: {user_email}")
-    
     # Post zaten favorilerde mi kontrol et
-    if post_id in user_favorites[user_email]:
+    if await favorite_repository.contains(user_email, post_id):
         # Favorilerden çıkar
-        user_favorites[user_email].remove(post_id)
+        await favorite_repository.remove(user_email, post_id)
         is_favorite = False
         message = "Yazı favorilerden çıkarıldı"
-        print(f"Removed post {post_id} from favorites")
+        logger.info("Favorite removed", extra={"email": user_email, "post_id": post_id})
     else:
         # Favorilere ekle
-        user_favorites[user_email].append(post_id)
+        await favorite_repository.add(user_email, post_id)
         is_favorite = True
         message = "Yazı favorilere eklendi"
-        print(f"Added post {post_id} to favorites")
-    
-    print(f"Updated user_favorites: {user_favorites}")
-    
-    # Dosyaya kaydet
-    save_favorites(user_favorites)
-    print("Favorites saved to file")
+        logger.info("Favorite added", extra={"email": user_email, "post_id": post_id})
     
     return {
         "message": message,
@@ -494,113 +831,317 @@ async def toggle_favorite(favorite: FavoriteToggle, current_user: User = Depends
         "post_id": post_id
     }
 
-@app.get("/api/favorites", response_model=List[BlogPost])
-async def get_user_favorites(current_user: User = Depends(get_current_user)):
+@app.get("/api/favorites", response_model=List[Union[BlogPost, PostSummary]])
+async def get_user_favorites(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: str = Query("full", pattern="^(full|summary)$"),
+    current_user: User = Depends(get_current_user),
+):
     """Get user's favorite blog posts"""
-    user_email = current_user.email
+    # Kullanıcının favori post ID'lerini al
+    favorite_post_ids = await favorite_repository.list(current_user.email)
     
-    if user_email not in user_favorites:
-        return []
+    headers = {}
+    if limit is None and after is not None:
+        limit = DEFAULT_PAGE_SIZE
+    if limit is not None:
+        favorite_post_ids, next_after = paginate_ids(
+            sorted(favorite_post_ids), decode_cursor(after, "k") if after else None, limit
+        )
+        if next_after is not None:
+            headers["X-Next-Cursor"] = encode_cursor("k", next_after)
     
-    # Kullanıcının favori post ID'lerini al
-    favorite_post_ids = user_favorites[user_email]
+    # Favori postları id indeksinden al
+    favorite_posts = post_repository.get_many(favorite_post_ids)
     
-    # Favori postları filtrele
-    favorite_posts = [post for post in blog_posts if post["id"] in favorite_post_ids]
+    # Gövde yazı başına önbelleklenmiş JSON'dan birleştirilir; response_model doğrulaması atlanır
+    return Response(
+        content=post_encoder.encode_list(favorite_posts, fields), media_type="application/json", headers=headers
+    )
+
+@app.get("/api/favorites/status", response_model=dict)
+async def get_favorite_statuses(
+    ids: List[int] = Query([], max_length=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+):
+    """Favorite status and favorite count for many posts in one call"""
+    post_ids = list(dict.fromkeys(ids))
+    favorites = await favorite_repository.statuses(current_user.email, post_ids)
+    counts = await favorite_repository.counts(post_ids)
     
-    return favorite_posts
+    return {
+        "statuses": [
+            {"post_id": post_id, "is_favorite": post_id in favorites, "favorite_count": counts[post_id]}
+            for post_id in post_ids
+        ]
+    }
 
 @app.get("/api/favorites/check/{post_id}", response_model=dict)
 async def check_favorite_status(post_id: int, current_user: User = Depends(get_current_user)):
     """Check if a post is in user's favorites"""
     user_email = current_user.email
     
-    print(f"Check favorite status - User: {user_email}, Post ID: {post_id}")
-    print(f"Current user_favorites: {user_favorites}")
-    
-    if user_email not in user_favorites:
-        is_favorite = False
-        print(f"User {user_email} has no favorites list")
-    else:
-        is_favorite = post_id in user_favorites[user_email]
-        print(f"Is post {post_id} favorite for {user_email}: {is_favorite}")
-        print(f"User's favorites: {user_favorites[user_email]}")
+    is_favorite = await favorite_repository.contains(user_email, post_id)
+    logger.debug("Favorite status checked", extra={"email": user_email, "post_id": post_id, "is_favorite": is_favorite})
     
     return {
         "post_id": post_id,
         "is_favorite": is_favorite
     }
 
-@app.get("/api/posts", response_model=List[BlogPost])
-async def get_posts(category: Optional[str] = None, search: Optional[str] = None):
-    """Get all blog posts with optional filtering"""
-    posts = blog_posts.copy()
+@app.get("/api/posts", response_model=List[Union[BlogPost, PostSummary]])
+async def get_posts(
+    request: Request,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: str = Query("full", pattern="^(full|summary)$"),
+):
+    """Get blog posts with optional filtering, pagination and summary projection"""
+    if category == "All":
+        category = None
+    if limit is None and after is not None:
+        limit = DEFAULT_PAGE_SIZE
+    next_cursor = None
     
-    if category and category != "All":
-        posts = [post for post in posts if post["category"] == category]
+    def build():
+        nonlocal next_cursor
+        if search:
+            # Arama sonuçları skora göre sıralı; burada cursor bir offset. Limit verilmese de
+            # en fazla MAX_PAGE_SIZE sonuç döner, indeks sadece offset + limit + 1 sonucu seçer
+            page_size = limit or MAX_PAGE_SIZE
+            offset = decode_cursor(after, "o") if after else 0
+            posts = post_repository.search(search, category=category, limit=offset + page_size + 1)
+            if len(posts) > offset + page_size:
+                next_cursor = encode_cursor("o", offset + page_size)
+            posts = posts[offset:offset + page_size]
+        elif limit is not None:
+            posts, next_after = post_repository.page(
+                limit, after=decode_cursor(after, "k") if after else None, category=category
+            )
+            if next_after is not None:
+                next_cursor = encode_cursor("k", next_after)
+        elif category:
+            posts = post_repository.by_category(category)
+        else:
+            posts = post_repository.all()
+        return post_encoder.encode_list(posts, fields)
     
-    if search:
-        posts = [post for post in posts if 
-                search.lower() in post["title"].lower() or 
-                search.lower() in post["excerpt"].lower()]
+    # Cursor header'ı gövdeyle birlikte cache'lenir
+    return await response_cache.respond(
+        request, ("posts",), build, List[Union[BlogPost, PostSummary]], POSTS_LIST_CACHE,
+        headers=lambda: {"X-Next-Cursor": next_cursor} if next_cursor else {},
+    )
+
+# /api/posts/{slug}'dan önce tanımlanmalı, yoksa "trending" slug sayılır
+@app.get("/api/posts/trending", response_model=List[PostSummary])
+async def get_trending_posts(limit: int = Query(10, ge=1, le=TRENDING_SIZE)):
+    """Get the most viewed posts of the last hours (older views count less)"""
+    # Top K bellekte hazır; gövde yazı başına önbelleklenmiş özetlerden birleştirilir
+    posts = post_repository.get_many(post_id for post_id, _ in trending_posts.top(limit))
+    return Response(content=post_encoder.encode_list(posts, "summary"), media_type="application/json")
+
+@app.get("/api/posts/{slug}/related", response_model=List[PostSummary])
+async def get_related_posts(slug: str, limit: int = Query(5, ge=1, le=RELATED_SIZE)):
+    """Get the posts most similar to a post by terms, tags and category"""
+    post = post_repository.get_by_slug(slug)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
     
-    return posts
+    posts = related_posts.related(post["id"], limit)
+    return Response(content=post_encoder.encode_list(posts, "summary"), media_type="application/json")
 
 @app.get("/api/posts/{slug}", response_model=BlogPost)
-async def get_post(slug: str):
+async def get_post(slug: str, request: Request):
     """Get a specific blog post by slug"""
-    post = next((post for post in blog_posts if post["slug"] == slug), None)
+    post = post_repository.get_by_slug(slug)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Increment views
-    post["views"] += 1
-    return post
+    # Görüntülenme sayacı; toplam arka planda post["views"] alanına yansır
+    view_counter.record(post["id"])
+    return await response_cache.respond(
+        request, (f"post:{post['id']}",), lambda: post_encoder.encode(post), BlogPost, POSTS_CACHE
+    )
 
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all categories"""
-    return {"categories": categories}
+    return await response_cache.respond(request, (), lambda: {"categories": categories}, dict, CATEGORIES_CACHE)
+
+@app.get("/api/posts/{post_id}/comments", response_model=List[Comment])
+async def get_comments(
+    post_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+):
+    """Get a page of a post's comments, oldest first"""
+    if post_repository.get(post_id) is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    
+    # (post_id, created_at) index'i üzerinden keyset sayfalama; sonraki sayfa X-Next-Cursor'da
+    comments, next_after = await comment_store.page(
+        post_id, limit, decode_cursor(after, "c", decode_key) if after else None
+    )
+    headers = {"X-Next-Cursor": encode_cursor("c", encode_key(next_after))} if next_after else {}
+    return JSONResponse(comments, headers=headers)
 
 @app.post("/api/posts/{post_id}/comments")
-async def add_comment(post_id: int, comment: dict):
+async def add_comment(post_id: int, comment: CommentCreate):
     """Add a comment to a blog post"""
-    post = next((post for post in blog_posts if post["id"] == post_id), None)
-    if not post:
+    if post_repository.get(post_id) is None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    new_comment = {
-        "id": len(post["comments"]) + 1,
-        "author": comment["author"],
-        "content": comment["content"],
-        "publishedAt": datetime.now().strftime("%Y-%m-%d")
-    }
-    
-    post["comments"].append(new_comment)
+    # Id veritabanından gelir (AUTOINCREMENT): worker'lar arasında artan, tekrar kullanılmayan
+    new_comment = await comment_store.add(post_id, comment.author, comment.content)
     return {"message": "Comment added successfully", "comment": new_comment}
 
 @app.post("/api/newsletter")
 async def subscribe_newsletter(newsletter: Newsletter):
     """Subscribe to newsletter"""
-    if newsletter.email in newsletter_subscribers:
+    # Büyük/küçük harf ve boşluk farkı aynı abone sayılır
+    email = normalize_email(newsletter.email)
+    if email is None:
+        raise HTTPException(status_code=400, detail="Invalid email address")
+    if not await subscriber_repository.add(email):
         raise HTTPException(status_code=400, detail="Email already subscribed")
+    blog_stats.subscriber_added()
+    response_cache.bump("subscribers")
     
-    newsletter_subscribers.append(newsletter.email)
     return {"message": "Successfully subscribed to newsletter"}
 
+@app.post("/api/newsletter/import", response_model=dict, openapi_extra=FILE_UPLOAD_SCHEMA)
+async def import_newsletter_subscribers(request: Request, current_user: User = Depends(require_newsletter_admin)):
+    """Bulk subscribe the emails of an uploaded CSV file"""
+    try:
+        upload = await receive_file(request, "file", MAX_SUBSCRIBER_IMPORT_SIZE, UPLOAD_TMP_DIR)
+    except UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    
+    # Dosya diskten SUBSCRIBER_BATCH_SIZE satırlık parçalarla okunur, her parça tek yazımla eklenir
+    report = ImportReport()
+    batches = read_csv_batches(upload.path, SUBSCRIBER_BATCH_SIZE)
+    try:
+        while True:
+            batch = await run_in_threadpool(next, batches, None)
+            if batch is None:
+                break
+            emails = normalize_batch(batch, report)
+            added = await subscriber_repository.add_many(emails) if emails else 0
+            report.imported += added
+            report.duplicates += len(emails) - added
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=f"CSV okunamadı: {exc}")
+    finally:
+        batches.close()
+        await run_in_threadpool(os.remove, upload.path)
+        if report.imported:
+            blog_stats.subscriber_added(report.imported)
+            response_cache.bump("subscribers")
+    
+    logger.info("Subscribers imported", extra={
+        "email": current_user.email, "rows": report.rows, "imported": report.imported, "invalid": report.invalid,
+    })
+    return report.to_dict()
+
+@app.get("/api/newsletter/export")
+async def export_newsletter_subscribers(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(require_newsletter_admin),
+):
+    """Stream every subscriber as CSV or NDJSON"""
+    return StreamingResponse(
+        export_lines(subscriber_repository.batches(SUBSCRIBER_BATCH_SIZE), format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="subscribers.{format}"'},
+    )
+
+@app.api_route("/sitemap.xml", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_sitemap(request: Request):
+    """Sitemap of all posts; a sitemap index once there are more URLs than fit in one file"""
+    if feed_builder.sitemap_shards():
+        return serve_document(request, feed_builder.document("sitemap-index"), "sitemap", FEEDS_CACHE)
+    return serve_document(request, feed_builder.document("sitemap"), "sitemap", FEEDS_CACHE)
+
+@app.api_route("/sitemap-{shard:int}.xml", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_sitemap_shard(shard: int, request: Request):
+    """One shard of a sharded sitemap"""
+    document = feed_builder.document("sitemap", shard)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return serve_document(request, document, "sitemap", FEEDS_CACHE)
+
+@app.api_route("/rss.xml", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_rss_feed(request: Request):
+    """RSS 2.0 feed of the latest posts"""
+    return serve_document(request, feed_builder.document("rss"), "rss", FEEDS_CACHE)
+
+@app.api_route("/atom.xml", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_atom_feed(request: Request):
+    """Atom feed of the latest posts"""
+    return serve_document(request, feed_builder.document("atom"), "atom", FEEDS_CACHE)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_prometheus_metrics():
+    """Prometheus text exposition of request latencies and component metrics"""
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/persistence")
+async def get_persistence_metrics():
+    """Get write-behind queue depth, lag and flush counters"""
+    return persistence_queue.metrics()
+
+@app.get("/api/metrics/hashing")
+async def get_hashing_metrics():
+    """Get password hashing pool usage and rejections"""
+    return password_hasher.metrics()
+
+@app.get("/api/metrics/auth-cache")
+async def get_auth_cache_metrics():
+    """Get verified-token cache hit/miss counters"""
+    return token_cache.metrics()
+
+@app.get("/api/metrics/views")
+async def get_view_metrics():
+    """Get pending and flushed view counts"""
+    return view_counter.metrics()
+
+@app.get("/api/metrics/response-cache")
+async def get_response_cache_metrics():
+    """Get response cache hit/miss and 304 counters"""
+    return response_cache.metrics()
+
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """Get blog statistics"""
-    total_posts = len(blog_posts)
-    total_views = sum(post["views"] for post in blog_posts)
-    total_comments = sum(len(post["comments"]) for post in blog_posts)
+    async def build():
+        await sync_subscriber_count()
+        return blog_stats.summary()
     
-    return {
-        "total_posts": total_posts,
-        "total_views": total_views,
-        "total_comments": total_comments,
-        "newsletter_subscribers": len(newsletter_subscribers)
-    }
+    return await response_cache.respond(request, ("posts", "subscribers"), build, dict, STATS_CACHE)
+
+@app.get("/api/stats/breakdown")
+async def get_stats_breakdown(request: Request, days: Optional[int] = Query(None, ge=1)):
+    """Get per-category and per-day statistics"""
+    return await response_cache.respond(
+        request, ("posts", "subscribers"), lambda: blog_stats.breakdown(days), dict, STATS_CACHE
+    )
+
+@app.get("/api/stats/history")
+async def get_stats_history(request: Request):
+    """Get time-bucketed activity (enabled with STATS_HISTORY_SIZE)"""
+    return await response_cache.respond(
+        request, ("posts", "subscribers"),
+        lambda: {"enabled": blog_stats.history_enabled, "buckets": blog_stats.history_buckets()},
+        dict, STATS_CACHE,
+    )
+
+async def sync_subscriber_count():
+    # Diğer worker'lara gelen aboneler için toplam ara sıra veritabanından tazelenir
+    if blog_stats.subscribers_stale(STATS_CACHE_TTL):
+        blog_stats.set_subscribers(await subscriber_repository.count())
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
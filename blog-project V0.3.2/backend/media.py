@@ -0,0 +1,274 @@
+"""Content-addressed upload storage and immutable file serving.
+
+Uploads are stored as ``<sha256>.<ext>`` with their resized variants next
+to them as ``<sha256>_<size>.webp``. Identical uploads share one file; a
+reference count per hash (SQLite, shared by all workers) decides when a
+replaced avatar can be deleted. Because a name always maps to the same
+bytes, files are served with ``Cache-Control: immutable`` and the name as
+a strong ETag, so browsers never ask for them again.
+"""
+import glob
+import os
+import re
+import sqlite3
+import stat
+import threading
+from email.utils import formatdate
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request, Response
+
+from response_cache import etag_matches
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_refs (
+    sha256 TEXT PRIMARY KEY,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+CONTENT_NAME = re.compile(r"^(?P<hash>[0-9a-f]{64})(?:_\d+)?\.(?:jpg|png|gif|webp)$")
+# Eski (avatar_<id>_<zaman>...) isimler dahil, /uploads altında izin verilen dosya adları
+SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*\.(?:jpe?g|png|gif|webp)$", re.IGNORECASE)
+MEDIA_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+LEGACY_CACHE = "public, max-age=86400"
+
+
+class MediaStore:
+    """Files under ``directory`` keyed by content hash, with reference counts.
+
+    Reference changes and the file moves/deletes they imply run inside one
+    ``BEGIN IMMEDIATE`` transaction, so a concurrent upload of the same
+    bytes cannot race with the garbage collection of the last reference.
+    """
+
+    def __init__(self, directory: str = "uploads", db_path: str = "media.db"):
+        self.directory = directory
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.deduplicated_total = 0
+        self.collected_total = 0
+
+    def open(self):
+        """Create the directory and open the reference database."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def put(self, temp_path: str, sha256: str, extension: str) -> str:
+        """Take a reference on ``temp_path``'s content and return its stored name.
+
+        The temp file is moved into place, or deleted if the content is
+        already stored. Blocking; call from a thread.
+        """
+        name = f"{sha256}.{extension}"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO media_refs (sha256, extension, size, refcount) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(sha256) DO UPDATE SET refcount = refcount + 1",
+                    (sha256, extension, os.path.getsize(temp_path)),
+                )
+                if os.path.exists(self.path(name)):
+                    os.remove(temp_path)
+                    self.deduplicated_total += 1
+                else:
+                    os.replace(temp_path, self.path(name))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return name
+
+    def release(self, name: Optional[str]):
+        """Drop one reference to ``name``; the last one deletes the file and its variants.
+
+        Names from before content addressing are referenced by a single
+        user, so they are deleted right away. Blocking; call from a thread.
+        """
+        if not name or not SAFE_NAME.match(name):
+            return
+        match = CONTENT_NAME.match(name)
+        if match is None:
+            stem, _ = os.path.splitext(name)
+            self._remove(self.path(name), *glob.glob(self.path(glob.escape(stem) + "_*.webp")))
+            return
+        sha256 = match.group("hash")
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE media_refs SET refcount = refcount - 1 WHERE sha256 = ?", (sha256,))
+                row = self._conn.execute("SELECT refcount FROM media_refs WHERE sha256 = ?", (sha256,)).fetchone()
+                if row is not None and row[0] <= 0:
+                    self._conn.execute("DELETE FROM media_refs WHERE sha256 = ?", (sha256,))
+                    self._remove(*glob.glob(self.path(sha256 + ".*")), *glob.glob(self.path(sha256 + "_*.webp")))
+                    self.collected_total += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _remove(*paths: str):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def name_from_url(url: Optional[str]) -> Optional[str]:
+        if not url or "/uploads/" not in url:
+            return None
+        return url.rsplit("/uploads/", 1)[1]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            if self._conn is None:
+                files = total_bytes = 0
+            else:
+                files, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM media_refs").fetchone()
+        return {
+            "files": files,
+            "bytes": total_bytes,
+            "deduplicated_total": self.deduplicated_total,
+            "collected_total": self.collected_total,
+        }
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns None when the header should be ignored (malformed or several
+    ranges; the full file is sent) and raises ValueError when the range
+    cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # bytes=-N: son N bayt
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError(header)
+    return start, end
+
+
+class FileRangeResponse(Response):
+    """Sends ``length`` bytes of a file from ``offset``.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) when
+    the server offers it, otherwise reads 64KB chunks in a worker thread.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, offset: int, length: int, status_code: int, headers: dict, media_type: str, method: str):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.send_header_only = method == "HEAD"
+        self.init_headers({**headers, "Content-Length": str(length)})
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # Dosya gönderim sırasında kısaldı; gövdeyi kapat
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def serve_file(request: Request, path: str, name: str) -> Response:
+    """Conditional, range-aware response for a stored upload."""
+    try:
+        # stat de diske gider; event loop'u bekletmesin
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    size = stat_result.st_size
+    if CONTENT_NAME.match(name):
+        # İsim içeriğin hash'i: aynı isim hep aynı baytlar
+        etag = '"' + os.path.splitext(name)[0] + '"'
+        cache_control = IMMUTABLE
+    else:
+        etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+        cache_control = LEGACY_CACHE
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MEDIA_TYPES.get(name.rsplit(".", 1)[-1].lower(), "application/octet-stream")
+    offset, length, status_code = 0, size, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            offset, length, status_code = start, end - start + 1, 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, offset, length, status_code, headers, media_type, request.method)
@@ -0,0 +1,155 @@
+"""Request latency histograms and the Prometheus ``/metrics`` exposition.
+
+``MetricsMiddleware`` times every HTTP request and labels it with the
+matched route template (``/api/posts/{slug}``, not the raw path), so the
+number of series stays bounded. Component metrics that already exist as
+``metrics()`` dicts (queues, caches, pools) are exported as gauges through
+collectors.
+"""
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# Saniye cinsinden; prometheus_client varsayılanlarıyla aynı
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # label değerleri -> (bucket başına sayılar, toplam süre, adet)
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+    def dec(self, amount: int = 1):
+        self.value -= amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "blogx"):
+        self.namespace = namespace
+        self.request_duration = Histogram(
+            f"{namespace}_http_request_duration_seconds",
+            "HTTP request latency by route template",
+            ("method", "route", "status"),
+        )
+        self.in_flight = Gauge(f"{namespace}_http_requests_in_flight", "HTTP requests currently being served")
+        self._collectors: List[Tuple[str, Callable[[], dict]]] = []
+
+    def add_collector(self, subsystem: str, collect: Callable[[], dict]):
+        """Export the numeric values of ``collect()`` as ``<namespace>_<subsystem>_<key>`` gauges."""
+        self._collectors.append((subsystem, collect))
+
+    def render(self) -> str:
+        lines = self.in_flight.render() + self.request_duration.render()
+        for subsystem, collect in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{self.namespace}_{subsystem}_{key}"
+                kind = "counter" if key.endswith("_total") else "gauge"
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def route_label(scope: dict) -> str:
+    # Router eşleşen route'u scope'a yazar; path parametreli yollar şablonla etiketlenir
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        # Mount (ör. /uploads): eşleşen önek root_path'te
+        return scope.get("root_path") or "/"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed response bodies pass through untouched."""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.in_flight.dec()
+            self.registry.request_duration.observe(
+                (scope["method"], route_label(scope), str(status_code)), time.perf_counter() - start
+            )
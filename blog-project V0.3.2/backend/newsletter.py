@@ -0,0 +1,119 @@
+"""Newsletter subscriber emails: normalization, CSV import and streaming export.
+
+Emails are stored normalized (trimmed, lower case), so the store's primary
+key dedups them in O(1) no matter how they were typed. Imports read the
+uploaded CSV from disk in batches and hand each batch to the repository in
+one write; exports page through the repository and stream one line per
+subscriber, so neither side ever holds the full list.
+"""
+import csv
+import io
+import json
+import re
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+# Pratik kontrol: tek @, boşluk yok, alan adında nokta; RFC 5321 uzunluk sınırları
+_EMAIL_RE = re.compile(r"^[^@\s\"<>,;]+@[^@\s\"<>,;]+\.[^@\s\"<>,;.]+$")
+MAX_EMAIL_LENGTH = 254
+MAX_LOCAL_LENGTH = 64
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def normalize_email(value: str) -> Optional[str]:
+    """Trimmed, lower-cased address, or None if it does not look like an email."""
+    email = value.strip().lower()
+    if len(email) > MAX_EMAIL_LENGTH or not _EMAIL_RE.match(email):
+        return None
+    if len(email.partition("@")[0]) > MAX_LOCAL_LENGTH:
+        return None
+    return email
+
+
+class ImportReport:
+    """Counts for one CSV import; keeps the first few invalid rows as samples."""
+
+    max_samples = 20
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.invalid_samples: List[dict] = []
+
+    def add_invalid(self, line: int, value: str):
+        self.invalid += 1
+        if len(self.invalid_samples) < self.max_samples:
+            self.invalid_samples.append({"line": line, "value": value[:MAX_EMAIL_LENGTH]})
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "invalid_samples": self.invalid_samples,
+        }
+
+
+def read_csv_batches(path: str, batch_size: int = 1000) -> Iterator[List[Tuple[int, str]]]:
+    """Yield ``(line, raw email)`` batches from a CSV file.
+
+    The email column is the one named ``email`` in the header row; without
+    a header the first column is used and the first row is data.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        column = 0
+        first = True
+        batch: List[Tuple[int, str]] = []
+        for row in reader:
+            if not row:
+                continue
+            if first:
+                first = False
+                header = [cell.strip().lower() for cell in row]
+                if "email" in header:
+                    column = header.index("email")
+                    continue
+                if "@" not in row[0]:
+                    # email kolonu olmayan başlık satırı; ilk kolon kullanılır
+                    continue
+            batch.append((reader.line_num, row[column] if column < len(row) else ""))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def normalize_batch(batch: List[Tuple[int, str]], report: ImportReport) -> List[str]:
+    """Valid, normalized emails of ``batch`` without in-batch duplicates."""
+    emails = {}
+    for line, value in batch:
+        report.rows += 1
+        email = normalize_email(value)
+        if email is None:
+            report.add_invalid(line, value)
+        elif email in emails:
+            report.duplicates += 1
+        else:
+            emails[email] = line
+    return list(emails)
+
+
+async def export_lines(batches: AsyncIterator[List[Tuple[str, str]]], fmt: str) -> AsyncIterator[bytes]:
+    """Encode subscriber batches as CSV (with header) or NDJSON, one chunk per batch."""
+    if fmt == "csv":
+        yield b"email,subscribed_at\r\n"
+    async for batch in batches:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            chunk = buffer.getvalue()
+        else:
+            chunk = "".join(
+                json.dumps({"email": email, "subscribed_at": subscribed_at}) + "\n" for email, subscribed_at in batch
+            )
+        yield chunk.encode()
@@ -0,0 +1,159 @@
+"""Write-behind persistence worker.
+
+Request handlers only mark records dirty. A background task collects the
+dirty keys, coalesces repeated writes to the same record and hands each
+batch to a thread, so disk I/O never runs on the event loop.
+"""
+import asyncio
+import copy
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from logging_config import LOGGER_NAME
+from storage import DELETED
+
+logger = logging.getLogger(f"{LOGGER_NAME}.persistence")
+
+
+class WriteBehindQueue:
+    """Coalescing queue of dirty ``(store, key)`` pairs.
+
+    ``flush_interval`` is the longest a change waits before it is written.
+    When ``flush_threshold`` distinct records are dirty the worker flushes
+    right away instead of waiting for the interval. It is not a bound:
+    writers are never blocked and the queue keeps growing while a flush
+    runs (``queue_depth`` shows how far).
+    """
+
+    def __init__(self, flush_interval: float = 0.2, flush_threshold: int = 1000):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        # (id(store), key) -> ilk kirlendiği an; sıra korunur.
+        # Store'lar Mapping olduğu için hash'lenemez, id ile tutulur.
+        self._pending: Dict[Tuple[int, str], float] = {}
+        self._stores: Dict[int, object] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.enqueued_total = 0
+        self.coalesced_total = 0
+        self.flushed_total = 0
+        self.batches_total = 0
+        self.failed_writes_total = 0
+        self.last_flush_seconds = 0.0
+        self.last_batch_lag_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark_dirty(self, store, key: str):
+        """Schedule ``store[key]`` (or its deletion) to be journaled."""
+        if not self.running:
+            # Worker yoksa (ör. script veya test) eşzamanlı yaz
+            store.write_records([(key, self._capture(store, key))])
+            return
+        self.enqueued_total += 1
+        pending_key = (id(store), key)
+        if pending_key in self._pending:
+            self.coalesced_total += 1
+            return
+        self._stores[id(store)] = store
+        self._pending[pending_key] = time.monotonic()
+        if len(self._pending) >= self.flush_threshold:
+            self._wakeup.set()
+
+    @staticmethod
+    def _capture(store, key):
+        # Kayıt handler'lar tarafından yerinde değiştirilebilir; o anki halini kopyala
+        if key in store:
+            return copy.copy(store[key])
+        return DELETED
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def lag(self) -> float:
+        """Age in seconds of the oldest record still waiting to be written."""
+        if not self._pending:
+            return 0.0
+        return time.monotonic() - next(iter(self._pending.values()))
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.depth(),
+            "queue_lag_seconds": round(self.lag(), 6),
+            "enqueued_total": self.enqueued_total,
+            "coalesced_total": self.coalesced_total,
+            "flushed_total": self.flushed_total,
+            "batches_total": self.batches_total,
+            "failed_writes_total": self.failed_writes_total,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+            "last_batch_lag_seconds": round(self.last_batch_lag_seconds, 6),
+            "flush_interval_seconds": self.flush_interval,
+            "flush_threshold": self.flush_threshold,
+        }
+
+    def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write every pending record in one batch per store."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self.last_batch_lag_seconds = time.monotonic() - next(iter(batch.values()))
+
+        # Değerler event loop üzerinde kopyalanır, disk işi thread'de yapılır
+        by_store: Dict[int, list] = {}
+        for store_id, key in batch:
+            record = (key, self._capture(self._stores[store_id], key))
+            by_store.setdefault(store_id, []).append(record)
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        failed: Dict[Tuple[int, str], float] = {}
+        for store_id, records in by_store.items():
+            try:
+                await loop.run_in_executor(None, self._stores[store_id].write_records, records)
+            except Exception:
+                logger.exception("Write-behind flush failed", extra={"store": repr(self._stores[store_id]), "records": len(records)})
+                self.failed_writes_total += len(records)
+                for key, _ in records:
+                    failed[(store_id, key)] = batch[(store_id, key)]
+        if failed:
+            self._requeue(failed)
+        self.last_flush_seconds = time.perf_counter() - started
+        self.flushed_total += len(batch) - len(failed)
+        self.batches_total += 1
+
+    def _requeue(self, failed: Dict[Tuple[int, str], float]):
+        # Yazılamayan kayıtlar ilk kirlendikleri anla kuyruğun başına döner (lag doğru kalsın);
+        # bu arada yeniden kirlenenler tek kayıtta birleşir. Değer sonraki flush'ta yeniden kopyalanır.
+        pending = dict(failed)
+        for pending_key, dirtied_at in self._pending.items():
+            pending.setdefault(pending_key, dirtied_at)
+        self._pending = pending
+
+    async def stop(self):
+        """Stop the worker and flush whatever is still pending."""
+        if self._task is not None:
+            # İptal etmek yerine döngünün bitmesini bekle; yarıda kalan batch kaybolmasın
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
@@ -0,0 +1,53 @@
+"""Per-post JSON encoding cache for the post list responses.
+
+Returning post dicts with ``response_model=List[BlogPost]`` makes FastAPI
+validate and serialize every post (tags, content, table of contents) on every
+request. Posts come from our own store, so each one is validated and
+encoded once, the bytes are kept until the post changes, and list bodies
+are spliced together from the cached parts. The output is byte-for-byte
+what the ``response_model`` path produces.
+"""
+from typing import Any, Dict, Iterable, Tuple
+
+from pydantic import TypeAdapter
+
+from repository import post_summary
+
+
+class PostEncoder:
+    """Encoded ``full`` and ``summary`` forms of each post, dropped on change.
+
+    Register :meth:`invalidate` with ``PostRepository.on_change`` so edits,
+    comments and view count updates re-encode the post on its next read.
+    """
+
+    def __init__(self, full_model: Any, summary_model: Any):
+        self._adapters = {"full": TypeAdapter(full_model), "summary": TypeAdapter(summary_model)}
+        # (post id, görünüm) -> JSON baytları
+        self._encoded: Dict[Tuple[int, str], bytes] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, post_id: int):
+        self._encoded.pop((post_id, "full"), None)
+        self._encoded.pop((post_id, "summary"), None)
+
+    def encode(self, post: dict, fields: str = "full") -> bytes:
+        """JSON for one post; ``post`` is the stored dict, projected here for ``summary``."""
+        key = (post["id"], fields)
+        body = self._encoded.get(key)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        adapter = self._adapters[fields]
+        data = post_summary(post) if fields == "summary" else post
+        body = self._encoded[key] = adapter.dump_json(adapter.validate_python(data))
+        return body
+
+    def encode_list(self, posts: Iterable[dict], fields: str = "full") -> bytes:
+        return b"[" + b",".join([self.encode(post, fields) for post in posts]) + b"]"
+
+    def metrics(self) -> dict:
+        return {"entries": len(self._encoded), "hits": self.hits, "misses": self.misses}
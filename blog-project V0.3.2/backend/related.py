@@ -0,0 +1,381 @@
+"""Related posts from term, tag and category similarity, computed with NumPy.
+
+Every post is one float32 row made of three blocks: hashed TF-IDF of its
+title, excerpt and content, its hashed tags and its category. Each block
+is L2 normalized and scaled by the square root of its weight, so the dot
+product of two rows is the weighted sum of the three cosine similarities.
+The K most similar rows of every row are computed in batches (one matrix
+product and an ``argpartition`` per batch) and kept, so a request only
+reads K ids.
+
+Changed posts are picked up by a background task every
+``refresh_interval`` seconds and applied in a worker thread. Their own
+rows and the rows that listed them are recomputed; every other row only
+merges the changed rows' new scores into its K. Document frequencies stay
+as they were at the last full build, which runs again once
+``rebuild_ratio`` of the posts have changed since. Finished lists are
+published in one assignment, so requests never wait for an update and
+never see a half-applied one. Only the first build of at most
+``SYNC_BUILD_POSTS`` posts runs inline in :meth:`start`; until a larger
+first build is done there are no related posts.
+"""
+import asyncio
+import functools
+import logging
+import math
+import threading
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from logging_config import LOGGER_NAME
+from search import fold, tokenize
+
+logger = logging.getLogger(f"{LOGGER_NAME}.related")
+
+DEFAULT_WEIGHTS = {"terms": 0.5, "tags": 0.35, "category": 0.15}
+# Başlık kelimeleri içerikteki kelimelerden daha belirleyici
+TITLE_REPEAT = 2
+# Bir batch'teki skor matrisi en fazla bu kadar hücre (float32: 16MB)
+BATCH_CELLS = 1 << 22
+# Bu kadar yazıya kadar ilk build birkaç yüz ms: açılışta beklenir
+SYNC_BUILD_POSTS = 2000
+
+# Yayınlanan listeler: (satır -> post id, post id -> satır, en benzer satırlar, skorları)
+Lists = Tuple[np.ndarray, Dict[int, int], np.ndarray, np.ndarray]
+
+
+def _bucket(feature: str, size: int) -> int:
+    # Python'un hash()'i process başına rastgele; sonuçlar her açılışta aynı olsun
+    return zlib.crc32(feature.encode()) % size
+
+
+def _fingerprint(post: dict) -> Tuple:
+    return post["title"], post["excerpt"], post["content"], tuple(post.get("tags", ())), post["category"]
+
+
+class RelatedPosts:
+    """Top ``size`` related posts of every post in ``repository``.
+
+    Register :meth:`post_changed` with ``PostRepository.on_change``; view
+    and comment count updates are recognized and cost nothing. Vectors and
+    working lists belong to the update jobs, which run one at a time;
+    :meth:`related` only reads the published copy.
+    """
+
+    def __init__(
+        self,
+        repository,
+        size: int = 10,
+        term_dimensions: int = 256,
+        tag_dimensions: int = 64,
+        category_dimensions: int = 16,
+        weights: Optional[Dict[str, float]] = None,
+        rebuild_ratio: float = 0.1,
+        refresh_interval: float = 1.0,
+    ):
+        self.repository = repository
+        self.size = size
+        self.term_dimensions = term_dimensions
+        self.tag_dimensions = tag_dimensions
+        self.category_dimensions = category_dimensions
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.rebuild_ratio = rebuild_ratio
+        self.refresh_interval = refresh_interval
+        self.dimensions = term_dimensions + tag_dimensions + category_dimensions
+
+        # Satır -> post id (silinmiş satırlar -1); satırların sırası sabit, silinenler rebuild'de atılır
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+        self._idf = np.ones(term_dimensions, dtype=np.float32)
+        # Satır başına en benzer satırlar (skora göre azalan) ve skorları; boş yerler -1 / -inf
+        self._top = np.empty((0, size), dtype=np.int64)
+        self._scores = np.empty((0, size), dtype=np.float32)
+        self._fingerprints: Dict[int, Tuple] = {}
+        self._dirty: Set[int] = set()
+        # Kelime -> bucket; crc32 her kelime için bir kez hesaplanır
+        self._buckets: Dict[str, int] = {}
+        self._built = False
+        self._changed_since_build = 0
+        # Güncellemeler sırayla: arka plan görevi ve rebuild()/refresh() aynı anda çalışmaz
+        self._job_lock = threading.Lock()
+        self._lists: Lists = (self._ids, {}, self._top, self._scores)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.rebuilds_total = 0
+        self.refreshed_rows_total = 0
+        self.failed_updates_total = 0
+
+    def post_changed(self, post_id: int):
+        self._dirty.add(post_id)
+
+    def _term_counts(self, post: dict) -> Counter:
+        tokens = Counter(tokenize(post["excerpt"]) + tokenize(post["content"]))
+        for token in tokenize(post["title"]):
+            tokens[token] += TITLE_REPEAT
+        counts = Counter()
+        for token, count in tokens.items():
+            bucket = self._buckets.get(token)
+            if bucket is None:
+                bucket = self._buckets[token] = _bucket(token, self.term_dimensions)
+            counts[bucket] += count
+        return counts
+
+    def _vector(self, post: dict, term_counts: Counter, idf: Optional[np.ndarray] = None) -> np.ndarray:
+        idf = self._idf if idf is None else idf
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        terms = vector[:self.term_dimensions]
+        for bucket, count in term_counts.items():
+            terms[bucket] = (1.0 + math.log(count)) * idf[bucket]
+        tags = vector[self.term_dimensions:self.term_dimensions + self.tag_dimensions]
+        for tag in post.get("tags", ()):
+            tags[_bucket(fold(tag), self.tag_dimensions)] += 1.0
+        category = vector[self.term_dimensions + self.tag_dimensions:]
+        category[_bucket(fold(post["category"]), self.category_dimensions)] = 1.0
+
+        for block, name in ((terms, "terms"), (tags, "tags"), (category, "category")):
+            norm = float(np.linalg.norm(block))
+            if norm:
+                block *= math.sqrt(self.weights.get(name, 0.0)) / norm
+        return vector
+
+    def start(self):
+        """Start the background task that builds and updates the lists; call from the event loop."""
+        if len(self.repository) <= SYNC_BUILD_POSTS:
+            self.rebuild()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # İlk build (büyük koleksiyonlarda) hemen başlar, sonra refresh_interval aralıkla
+        waiting = self._built
+        while not self._stopping:
+            if waiting:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.refresh_interval)
+                except asyncio.TimeoutError:
+                    pass
+                if self._stopping:
+                    break
+            waiting = True
+            job = self._prepare()
+            if job is None:
+                continue
+            try:
+                await loop.run_in_executor(None, job)
+            except Exception:
+                logger.exception("Related posts update failed")
+                self.failed_updates_total += 1
+                # Yarım kalan değişiklikler kaybolmasın: bir sonraki turda tam build
+                self._built = False
+
+    async def stop(self):
+        if self._task is not None:
+            # Süren iş thread'de biter, sonucu kullanılmaz
+            self._stopping = True
+            self._task.cancel()
+            self._task = None
+
+    def _snapshot(self) -> List[Tuple[dict, Tuple]]:
+        # Bundan sonra değişen yazılar _dirty'de kalır, build bitince sonraki turda işlenir
+        self._dirty.clear()
+        return [(post, _fingerprint(post)) for post in self.repository]
+
+    def _collect(self) -> List[Tuple[int, Optional[dict], Optional[Tuple]]]:
+        # Eklenen, silinen ya da metni/etiketi/kategorisi değişen yazılar; sayaç değişimleri elenir
+        dirty, self._dirty = self._dirty, set()
+        changes = []
+        for post_id in dirty:
+            post = self.repository.get(post_id)
+            if post is None:
+                if post_id in self._rows:
+                    changes.append((post_id, None, None))
+                continue
+            fingerprint = _fingerprint(post)
+            if self._fingerprints.get(post_id) != fingerprint:
+                changes.append((post_id, post, fingerprint))
+        return changes
+
+    def _prepare(self) -> Optional[Callable[[], None]]:
+        """The pending changes as one job (None if there are none); runs on the event loop between jobs."""
+        if not self._built:
+            return functools.partial(self._build, self._snapshot())
+        changes = self._collect()
+        if not changes:
+            return None
+        if self._changed_since_build + len(changes) > self.rebuild_ratio * len(self._rows):
+            return functools.partial(self._build, self._snapshot())
+        return functools.partial(self._apply, changes)
+
+    def _compute(self, posts: List[Tuple[dict, Tuple]]):
+        """Vectors, document frequencies and top K of ``posts``; touches no shared state but the bucket memo."""
+        term_counts = [self._term_counts(post) for post, _ in posts]
+        document_frequency = np.zeros(self.term_dimensions, dtype=np.float32)
+        for counts in term_counts:
+            document_frequency[list(counts)] += 1
+        idf = (np.log((1 + len(posts)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        matrix = np.zeros((len(posts), self.dimensions), dtype=np.float32)
+        for row, ((post, _), counts) in enumerate(zip(posts, term_counts)):
+            matrix[row] = self._vector(post, counts, idf)
+        top, scores = self._top_k(np.arange(len(posts)), matrix)
+        return idf, matrix, top, scores
+
+    def _install(self, posts, idf, matrix, top, scores):
+        self._idf = idf
+        self._matrix = matrix
+        self._top = top
+        self._scores = scores
+        self._ids = np.array([post["id"] for post, _ in posts], dtype=np.int64)
+        self._rows = {post["id"]: row for row, (post, _) in enumerate(posts)}
+        self._fingerprints = {post["id"]: fingerprint for post, fingerprint in posts}
+        self._built = True
+        self._changed_since_build = 0
+        self.rebuilds_total += 1
+        self._publish()
+
+    def _publish(self):
+        # Tek atama: istekler ya eski ya yeni listeleri görür; çalışma dizileri yerinde değişmeye devam eder
+        self._lists = (self._ids.copy(), dict(self._rows), self._top.copy(), self._scores.copy())
+
+    def _build(self, posts: List[Tuple[dict, Tuple]]):
+        with self._job_lock:
+            self._install(posts, *self._compute(posts))
+
+    def rebuild(self):
+        """Recompute every vector, the document frequencies and every row's top K, in the calling thread."""
+        self._build(self._snapshot())
+
+    def refresh(self):
+        """Apply the pending changes in the calling thread (scripts, benchmarks; the app uses :meth:`start`)."""
+        job = self._prepare()
+        if job is not None:
+            job()
+
+    def _select(self, candidates: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Her satırda en yüksek `size` skor, azalan sırada; eksik kalan yerler -1 / -inf
+        if scores.shape[1] > self.size:
+            part = np.argpartition(scores, -self.size, axis=1)[:, -self.size:]
+            candidates = np.take_along_axis(candidates, part, axis=1)
+            scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        missing = self.size - scores.shape[1]
+        if missing > 0:
+            candidates = np.pad(candidates, ((0, 0), (0, missing)), constant_values=-1)
+            scores = np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf)
+        return candidates, scores
+
+    def _top_k(self, rows: np.ndarray, matrix: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Top K of ``rows`` against every row, ``BATCH_CELLS`` scores at a time."""
+        matrix = self._matrix if matrix is None else matrix
+        count = len(matrix)
+        top = np.full((len(rows), self.size), -1, dtype=np.int64)
+        scores = np.full((len(rows), self.size), -np.inf, dtype=np.float32)
+        batch = max(1, BATCH_CELLS // max(count, 1))
+        for start in range(0, len(rows), batch):
+            block = rows[start:start + batch]
+            block_scores = matrix[block] @ matrix.T
+            # Yazı kendisiyle ilişkili sayılmaz
+            block_scores[np.arange(len(block)), block] = -np.inf
+            candidates = np.broadcast_to(np.arange(count), block_scores.shape)
+            top[start:start + batch], scores[start:start + batch] = self._select(candidates, block_scores)
+        return top, scores
+
+    def _merge(self, rows: np.ndarray, changed: np.ndarray):
+        """Fold the new scores of ``changed`` into the top K of ``rows`` (which do not list them)."""
+        batch = max(1, BATCH_CELLS // max(len(changed), 1))
+        for start in range(0, len(rows), batch):
+            block = rows[start:start + batch]
+            new_scores = self._matrix[block] @ self._matrix[changed].T
+            candidates = np.concatenate([self._top[block], np.broadcast_to(changed, new_scores.shape)], axis=1)
+            scores = np.concatenate([self._scores[block], new_scores], axis=1)
+            self._top[block], self._scores[block] = self._select(candidates, scores)
+
+    def _apply(self, changes: List[Tuple[int, Optional[dict], Optional[Tuple]]]):
+        """Fold changed, new and deleted posts into the lists; runs in a worker thread."""
+        with self._job_lock:
+            self._update(changes)
+            self._publish()
+
+    def _update(self, changes: List[Tuple[int, Optional[dict], Optional[Tuple]]]):
+        changed: List[int] = []
+        new_posts: List[dict] = []
+        for post_id, post, fingerprint in changes:
+            row = self._rows.get(post_id)
+            if post is None:
+                if row is not None:
+                    # Silinen satır sıfırlanır: kimseyle skoru 0, sonuçlara girmez
+                    self._matrix[row] = 0
+                    self._ids[row] = -1
+                    del self._rows[post_id]
+                    del self._fingerprints[post_id]
+                    changed.append(row)
+                continue
+            self._fingerprints[post_id] = fingerprint
+            if row is None:
+                new_posts.append(post)
+            else:
+                self._matrix[row] = self._vector(post, self._term_counts(post))
+                changed.append(row)
+
+        if new_posts:
+            start = len(self._ids)
+            self._ids = np.concatenate([self._ids, [post["id"] for post in new_posts]])
+            self._matrix = np.concatenate(
+                [self._matrix, np.stack([self._vector(post, self._term_counts(post)) for post in new_posts])]
+            )
+            self._top = np.concatenate([self._top, np.full((len(new_posts), self.size), -1, dtype=np.int64)])
+            self._scores = np.concatenate([self._scores, np.full((len(new_posts), self.size), -np.inf, dtype=np.float32)])
+            for row, post in enumerate(new_posts, start):
+                self._rows[post["id"]] = row
+                changed.append(row)
+        if not changed:
+            return
+
+        self._changed_since_build += len(changed)
+        changed_rows = np.array(sorted(changed), dtype=np.int64)
+        # Listesinde değişen bir satır olanların skoru düşmüş olabilir: baştan hesaplanır
+        recompute = np.isin(self._top, changed_rows).any(axis=1)
+        recompute[changed_rows] = True
+        self._merge(np.flatnonzero(~recompute), changed_rows)
+        rows = np.flatnonzero(recompute)
+        self._top[rows], self._scores[rows] = self._top_k(rows)
+        self.refreshed_rows_total += len(rows)
+
+    def related(self, post_id: int, limit: int) -> List[dict]:
+        """Up to ``limit`` (at most ``size``) posts most similar to ``post_id``, best first.
+
+        Reads the published lists only: K ids, no scoring.
+        """
+        ids, rows, top, scores = self._lists
+        row = rows.get(post_id)
+        if row is None:
+            return []
+        posts = []
+        for other, score in zip(top[row].tolist(), scores[row].tolist()):
+            # Azalan sırada: ilk sıfır/boş skordan sonrası ilişkisiz
+            if score <= 0 or len(posts) == limit:
+                break
+            post = self.repository.get(int(ids[other]))
+            if post is not None:
+                posts.append(post)
+        return posts
+
+    def metrics(self) -> dict:
+        return {
+            "posts": len(self._lists[1]),
+            "dimensions": self.dimensions,
+            "pending_changes": len(self._dirty),
+            "rebuilds_total": self.rebuilds_total,
+            "refreshed_rows_total": self.refreshed_rows_total,
+            "failed_updates_total": self.failed_updates_total,
+        }
@@ -0,0 +1,223 @@
+"""Markdown to sanitized HTML, table of contents and read time for posts.
+
+Posts are rendered once when they enter ``PostRepository`` (and again only
+when their content changes), so clients get ready HTML instead of parsing
+markdown on every view. The renderer covers the subset the editor uses:
+headings, paragraphs, lists, block quotes, fenced code, rules, links,
+images, emphasis and inline code. Every piece of text is HTML-escaped and
+only the tags below are produced, so raw HTML in the markdown shows up as
+text. Link and image URLs are limited to http(s), mailto and relative ones.
+"""
+import hashlib
+import html
+import math
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+# Çıktı biçimi değişince artırılır; saklanan hash'ler eşleşmez ve yazılar yeniden render edilir
+RENDERER_VERSION = 1
+WORDS_PER_MINUTE = 200
+
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+-]*)\s*$")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_ORDERED = re.compile(r"^\s*\d{1,9}[.)]\s+(.*)$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_EMPHASIS = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+_SAFE_URL = re.compile(r"^(?:https?://|mailto:|/|#|\./|\.\./)|^[^:/?#]+(?:[/?#]|$)", re.IGNORECASE)
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TURKISH_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+
+def content_hash(content: str) -> str:
+    return hashlib.blake2b(f"{RENDERER_VERSION}\0{content}".encode(), digest_size=16).hexdigest()
+
+
+def slugify(text: str) -> str:
+    ascii_text = unicodedata.normalize("NFKD", text.translate(_TURKISH_ASCII))
+    ascii_text = ascii_text.encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text).strip("-") or "bolum"
+
+
+def _safe_url(url: str) -> Optional[str]:
+    url = html.unescape(url).strip()
+    if any(ord(char) < 32 for char in url):
+        return None
+    return html.escape(url, quote=True) if _SAFE_URL.match(url) else None
+
+
+def _format_text(escaped: str) -> str:
+    def image(match):
+        src = _safe_url(match.group(2))
+        return f'<img src="{src}" alt="{match.group(1)}" loading="lazy">' if src else match.group(1)
+
+    def link(match):
+        href = _safe_url(match.group(2))
+        if href is None:
+            return match.group(1)
+        external = ' rel="noopener noreferrer nofollow"' if href.lower().startswith(("http://", "https://")) else ""
+        return f'<a href="{href}"{external}>{match.group(1)}</a>'
+
+    escaped = _IMAGE.sub(image, escaped)
+    escaped = _LINK.sub(link, escaped)
+    escaped = _STRONG.sub(r"<strong>\2</strong>", escaped)
+    return _EMPHASIS.sub(r"<em>\2</em>", escaped)
+
+
+def render_inline(text: str) -> str:
+    """Escape ``text`` and apply inline markup; code spans are left verbatim."""
+    parts = []
+    position = 0
+    for match in _CODE_SPAN.finditer(text):
+        parts.append(_format_text(html.escape(text[position:match.start()], quote=True)))
+        parts.append(f"<code>{html.escape(match.group(2).strip(), quote=True)}</code>")
+        position = match.end()
+    parts.append(_format_text(html.escape(text[position:], quote=True)))
+    return "".join(parts)
+
+
+def _plain_text(text: str) -> str:
+    # Başlık metni (TOC ve id için): markdown işaretleri olmadan
+    text = _IMAGE.sub(r"\1", text)
+    text = _LINK.sub(r"\1", text)
+    return re.sub(r"[`*_]", "", text).strip()
+
+
+def render_markdown(markdown: str) -> Tuple[str, List[dict]]:
+    """Return ``(html, toc)``; toc has a ``{"level", "text", "id"}`` entry per heading."""
+    out: List[str] = []
+    toc: List[dict] = []
+    used_ids = {}
+    paragraph: List[str] = []
+    list_tag: Optional[str] = None
+    quote: List[str] = []
+
+    def close_paragraph():
+        if paragraph:
+            out.append(f"<p>{render_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    def close_quote():
+        if quote:
+            out.append(f"<blockquote><p>{render_inline(' '.join(quote))}</p></blockquote>")
+            quote.clear()
+
+    def close_all():
+        close_paragraph()
+        close_list()
+        close_quote()
+
+    lines = markdown.replace("\r\n", "\n").split("\n")
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+
+        fence = _FENCE.match(line)
+        if fence:
+            close_all()
+            marker, language = fence.group(1), fence.group(2)
+            code = []
+            while index < len(lines) and not lines[index].strip().startswith(marker):
+                code.append(lines[index])
+                index += 1
+            index += 1  # kapanış satırı (yoksa dosya sonu)
+            css_class = f' class="language-{html.escape(language)}"' if language else ""
+            out.append(f"<pre><code{css_class}>{html.escape(chr(10).join(code))}</code></pre>")
+            continue
+
+        if not line.strip():
+            close_all()
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            close_all()
+            level = len(heading.group(1))
+            text = heading.group(2)
+            anchor = slugify(_plain_text(text))
+            # Aynı başlık tekrar ederse id'ler -2, -3 ... ile ayrılır
+            count = used_ids.get(anchor, 0) + 1
+            used_ids[anchor] = count
+            if count > 1:
+                anchor = f"{anchor}-{count}"
+            toc.append({"level": level, "text": _plain_text(text), "id": anchor})
+            out.append(f'<h{level} id="{anchor}">{render_inline(text)}</h{level}>')
+            continue
+
+        if _RULE.match(line):
+            close_all()
+            out.append("<hr>")
+            continue
+
+        item = _BULLET.match(line)
+        ordered = _ORDERED.match(line) if item is None else None
+        if item or ordered:
+            close_paragraph()
+            close_quote()
+            tag = "ul" if item else "ol"
+            if list_tag != tag:
+                close_list()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{render_inline((item or ordered).group(1))}</li>")
+            continue
+
+        quoted = _QUOTE.match(line)
+        if quoted:
+            close_paragraph()
+            close_list()
+            quote.append(quoted.group(1))
+            continue
+
+        close_list()
+        close_quote()
+        paragraph.append(line.strip())
+
+    close_all()
+    return "\n".join(out), toc
+
+
+def count_words(markdown: str) -> int:
+    # Kod blokları okuma süresine sayılmaz
+    words = 0
+    in_code = False
+    for line in markdown.split("\n"):
+        if _FENCE.match(line):
+            in_code = not in_code
+            continue
+        if not in_code:
+            words += len(_WORD.findall(_plain_text(line)))
+    return words
+
+
+def read_time(words: int) -> str:
+    return f"{max(1, math.ceil(words / WORDS_PER_MINUTE))} min read"
+
+
+def render_post(post: dict) -> bool:
+    """Store ``contentHtml``, ``toc``, ``wordCount`` and ``readTime`` on ``post``.
+
+    Skipped when ``contentHash`` already matches the content, so unchanged
+    posts are never rendered twice. Returns True if it rendered.
+    """
+    digest = content_hash(post["content"])
+    if post.get("contentHash") == digest and "contentHtml" in post:
+        return False
+    content_html, toc = render_markdown(post["content"])
+    words = count_words(post["content"])
+    post.update(contentHtml=content_html, toc=toc, wordCount=words, readTime=read_time(words), contentHash=digest)
+    return True
@@ -0,0 +1,446 @@
+"""Repositories behind the API routes.
+
+``PostRepository`` keeps posts in memory with primary (id, slug) and
+secondary (category, tag) indexes. Users, favorites and newsletter
+subscribers go through the async interfaces below; the JSON implementations
+here wrap ``JournaledStore``, the SQLite ones live in ``sqlite_repository``.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from rendering import render_post
+from search import SearchIndex
+
+# Liste görünümlerinde (BlogCard) kullanılan alanlar; content hariç
+SUMMARY_FIELDS = ("id", "title", "slug", "excerpt", "author", "publishedAt", "readTime", "category", "tags", "image", "views")
+
+
+def post_summary(post: dict) -> dict:
+    summary = {field: post[field] for field in SUMMARY_FIELDS}
+    # Yorum sayısını CommentStore yazar
+    summary["commentCount"] = post.get("commentCount", 0)
+    return summary
+
+
+def paginate_ids(sorted_ids: List[int], after: Optional[int], limit: int) -> Tuple[List[int], Optional[int]]:
+    """Keyset page over ascending ids: up to ``limit`` ids greater than ``after``.
+
+    Returns the page and the id to continue after, or None on the last page.
+    """
+    start = 0 if after is None else bisect_right(sorted_ids, after)
+    page = sorted_ids[start:start + limit]
+    next_after = page[-1] if page and start + limit < len(sorted_ids) else None
+    return page, next_after
+
+
+class PostRepository:
+    """Keeps blog posts addressable in O(1) by id, slug, category and tag.
+
+    Secondary indexes map a key to an insertion-ordered ``{id: post}`` dict,
+    so removing a post from them is O(1) as well. Sorted id lists per
+    category back keyset pagination. The search index is kept in sync with
+    every write, and listeners registered with :meth:`on_change` are told
+    which post changed. Content is rendered to HTML on the way in
+    (``rendering.render_post``), only when its hash changed.
+    """
+
+    def __init__(self, posts: Iterable[dict] = ()):
+        self._by_id: Dict[int, dict] = {}
+        self._by_slug: Dict[str, dict] = {}
+        self._by_category: Dict[str, Dict[int, dict]] = defaultdict(dict)
+        self._by_tag: Dict[str, Dict[int, dict]] = defaultdict(dict)
+        self._sorted_ids: List[int] = []
+        self._sorted_ids_by_category: Dict[str, List[int]] = defaultdict(list)
+        self.search_index = SearchIndex()
+        self._listeners: List[Tuple[Callable[[int], None], bool]] = []
+        for post in posts:
+            self.insert(post)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    # Okuma
+    def all(self) -> List[dict]:
+        return list(self._by_id.values())
+
+    def get(self, post_id: int) -> Optional[dict]:
+        return self._by_id.get(post_id)
+
+    def get_by_slug(self, slug: str) -> Optional[dict]:
+        return self._by_slug.get(slug)
+
+    def get_many(self, post_ids: Iterable[int]) -> List[dict]:
+        """Return the posts for the given ids, skipping unknown ones."""
+        return [self._by_id[post_id] for post_id in post_ids if post_id in self._by_id]
+
+    def by_category(self, category: str) -> List[dict]:
+        return list(self._by_category.get(category, {}).values())
+
+    def by_tag(self, tag: str) -> List[dict]:
+        return list(self._by_tag.get(tag, {}).values())
+
+    def search(self, query: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        return self.search_index.search(query, category=category, limit=limit)
+
+    def page(self, limit: int, after: Optional[int] = None, category: Optional[str] = None) -> Tuple[List[dict], Optional[int]]:
+        """Posts ordered by id, starting after the ``after`` id (keyset)."""
+        ids = self._sorted_ids if category is None else self._sorted_ids_by_category.get(category, [])
+        page, next_after = paginate_ids(ids, after, limit)
+        return [self._by_id[post_id] for post_id in page], next_after
+
+    # Değişiklik bildirimi
+    def on_change(self, listener: Callable[[int], None], counters: bool = True):
+        """Call ``listener(post_id)`` after every write to a post.
+
+        With ``counters=False`` view count merges (``touch(..., counters_only=True)``)
+        are not reported.
+        """
+        self._listeners.append((listener, counters))
+
+    def touch(self, post_id: int, counters_only: bool = False):
+        """Notify listeners of a change made to the post dict directly (e.g. views)."""
+        for listener, counters in self._listeners:
+            if counters or not counters_only:
+                listener(post_id)
+
+    # Yazma
+    def insert(self, post: dict) -> dict:
+        if post["id"] in self._by_id:
+            raise ValueError(f"Post id {post['id']} already exists")
+        if post["slug"] in self._by_slug:
+            raise ValueError(f"Post slug {post['slug']!r} already exists")
+        render_post(post)
+        self._index(post)
+        self.touch(post["id"])
+        return post
+
+    def update(self, post_id: int, changes: dict) -> dict:
+        """Apply ``changes`` to a post and refresh every index it touches."""
+        post = self._by_id[post_id]
+        if "id" in changes and changes["id"] != post_id:
+            raise ValueError("Post id cannot be changed")
+        new_slug = changes.get("slug", post["slug"])
+        if new_slug != post["slug"] and new_slug in self._by_slug:
+            raise ValueError(f"Post slug {new_slug!r} already exists")
+
+        old_slug, old_category = post["slug"], post["category"]
+        old_tags = set(post.get("tags", []))
+        post.update(changes)
+        render_post(post)
+
+        # Birincil sıra (_by_id) korunur, sadece değişen anahtarlar taşınır
+        if post["slug"] != old_slug:
+            del self._by_slug[old_slug]
+            self._by_slug[post["slug"]] = post
+        if post["category"] != old_category:
+            self._discard(self._by_category, old_category, post_id)
+            self._by_category[post["category"]][post_id] = post
+            self._remove_sorted(self._sorted_ids_by_category, old_category, post_id)
+            insort(self._sorted_ids_by_category[post["category"]], post_id)
+        new_tags = set(post.get("tags", []))
+        for tag in old_tags - new_tags:
+            self._discard(self._by_tag, tag, post_id)
+        for tag in new_tags - old_tags:
+            self._by_tag[tag][post_id] = post
+        self.search_index.update(post)
+        self.touch(post_id)
+        return post
+
+    def delete(self, post_id: int) -> Optional[dict]:
+        post = self._by_id.get(post_id)
+        if post is not None:
+            self._unindex(post)
+            self.touch(post_id)
+        return post
+
+    def _index(self, post: dict):
+        self._by_id[post["id"]] = post
+        self._by_slug[post["slug"]] = post
+        self._by_category[post["category"]][post["id"]] = post
+        for tag in post.get("tags", []):
+            self._by_tag[tag][post["id"]] = post
+        insort(self._sorted_ids, post["id"])
+        insort(self._sorted_ids_by_category[post["category"]], post["id"])
+        self.search_index.add(post)
+
+    def _unindex(self, post: dict):
+        post_id = post["id"]
+        del self._by_id[post_id]
+        del self._by_slug[post["slug"]]
+        self._discard(self._by_category, post["category"], post_id)
+        for tag in post.get("tags", []):
+            self._discard(self._by_tag, tag, post_id)
+        del self._sorted_ids[bisect_left(self._sorted_ids, post_id)]
+        self._remove_sorted(self._sorted_ids_by_category, post["category"], post_id)
+        self.search_index.remove(post_id)
+
+    @staticmethod
+    def _remove_sorted(index: Dict[str, List[int]], key: str, post_id: int):
+        ids = index.get(key)
+        if ids is None:
+            return
+        del ids[bisect_left(ids, post_id)]
+        if not ids:
+            del index[key]
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[int, dict]], key: str, post_id: int):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(post_id, None)
+        if not bucket:
+            del index[key]
+
+
+class UserRepository(ABC):
+    """User records keyed by email, in the shape stored in ``users.json``."""
+
+    @abstractmethod
+    async def get(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def add(self, user: dict) -> Optional[dict]:
+        """Store a new user and return it with its allocated ``id``.
+
+        Returns None if the email is already registered.
+        """
+
+    @abstractmethod
+    async def update(self, email: str, changes: dict) -> Optional[dict]:
+        """Apply ``changes``; an ``email`` key renames the user.
+
+        Returns None if there is no such user or the new email is taken.
+        """
+
+    @abstractmethod
+    async def replace_avatar(self, email: str, avatar: str, variants: Optional[Dict[str, str]]) -> Optional[str]:
+        """Set the avatar atomically and return the URL it replaced.
+
+        Returns ``""`` if the user had no avatar and None if there is no such user.
+        """
+
+    @abstractmethod
+    async def count(self) -> int:
+        ...
+
+
+class FavoriteRepository(ABC):
+    """Favorite post ids per user email."""
+
+    @abstractmethod
+    async def list(self, email: str) -> List[int]:
+        ...
+
+    @abstractmethod
+    async def contains(self, email: str, post_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def add(self, email: str, post_id: int):
+        ...
+
+    @abstractmethod
+    async def remove(self, email: str, post_id: int):
+        ...
+
+    @abstractmethod
+    async def rename_user(self, old_email: str, new_email: str):
+        """Move favorites to ``new_email``, merged with any it already has."""
+
+    @abstractmethod
+    async def statuses(self, email: str, post_ids: List[int]) -> Set[int]:
+        """Return the subset of ``post_ids`` that ``email`` has favorited."""
+
+    @abstractmethod
+    async def counts(self, post_ids: List[int]) -> Dict[int, int]:
+        """Number of users that favorited each post (0 if none)."""
+
+
+class SubscriberRepository(ABC):
+    """Newsletter subscriber emails, already normalized by the caller."""
+
+    @abstractmethod
+    async def add(self, email: str) -> bool:
+        """Subscribe ``email``; returns False if it was already subscribed."""
+
+    @abstractmethod
+    async def add_many(self, emails: List[str]) -> int:
+        """Subscribe every address in ``emails`` in one write; returns how many were new."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def batches(self, size: int = 1000) -> AsyncIterator[List[Tuple[str, str]]]:
+        """Iterate ``(email, subscribed_at)`` rows ``size`` at a time."""
+
+
+class JsonUserRepository(UserRepository):
+    def __init__(self, store):
+        self.store = store
+
+    async def get(self, email):
+        return self.store.get(email)
+
+    async def add(self, user):
+        if user["email"] in self.store:
+            return None
+        user = dict(user, id=len(self.store) + 1)
+        self.store[user["email"]] = user
+        return user
+
+    async def update(self, email, changes):
+        user = self.store.get(email)
+        new_email = changes.get("email", email)
+        if user is None or (new_email != email and new_email in self.store):
+            return None
+        user.update(changes)
+        if new_email != email:
+            # Email değiştiyse eski key'i sil ve yeni key ile kaydet
+            del self.store[email]
+            self.store[new_email] = user
+        else:
+            self.store.touch(email)
+        return user
+
+    async def replace_avatar(self, email, avatar, variants):
+        # Okuma ve yazma arasında await yok; tek event loop'ta atomik
+        user = self.store.get(email)
+        if user is None:
+            return None
+        previous = user.get("avatar") or ""
+        user.update({"avatar": avatar, "avatarVariants": variants})
+        self.store.touch(email)
+        return previous
+
+    async def count(self):
+        return len(self.store)
+
+
+class JsonFavoriteRepository(FavoriteRepository):
+    """Favorites persisted as ordered id lists, queried through in-memory sets.
+
+    Membership checks use a set per user and a post -> favorite count index
+    is kept alongside, so neither walks a user's list. Both are built on
+    first use (a user's set when that user is asked about, the counts on
+    the first ``counts`` call), not when the store is opened.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._sets: Dict[str, Set[int]] = {}
+        self._counts: Optional[Counter] = None
+
+    def _favorites(self, email: str) -> Set[int]:
+        favorites = self._sets.get(email)
+        if favorites is None:
+            favorites = self._sets[email] = set(self.store.get(email, ()))
+        return favorites
+
+    def _count(self, post_id: int, delta: int):
+        if self._counts is None:
+            return
+        self._counts[post_id] += delta
+        if not self._counts[post_id]:
+            del self._counts[post_id]
+
+    async def list(self, email):
+        return list(self.store.get(email, []))
+
+    async def contains(self, email, post_id):
+        return post_id in self._favorites(email)
+
+    async def add(self, email, post_id):
+        favorites = self._favorites(email)
+        if post_id in favorites:
+            return
+        favorites.add(post_id)
+        self._count(post_id, 1)
+        if email not in self.store:
+            self.store[email] = [post_id]
+        else:
+            self.store[email].append(post_id)
+            self.store.touch(email)
+
+    async def remove(self, email, post_id):
+        favorites = self._favorites(email)
+        if post_id not in favorites:
+            return
+        favorites.discard(post_id)
+        self._count(post_id, -1)
+        self.store[email].remove(post_id)
+        self.store.touch(email)
+
+    async def rename_user(self, old_email, new_email):
+        if old_email not in self.store:
+            return
+        if new_email in self.store:
+            # İki listede de olan favori bir kez kalır ve bir kez sayılır
+            favorites = self._favorites(new_email)
+            merged = self.store[new_email]
+            for post_id in self.store[old_email]:
+                if post_id in favorites:
+                    self._count(post_id, -1)
+                else:
+                    favorites.add(post_id)
+                    merged.append(post_id)
+            self.store.touch(new_email)
+        else:
+            self.store[new_email] = self.store[old_email]
+            self._sets.pop(new_email, None)
+        del self.store[old_email]
+        self._sets.pop(old_email, None)
+
+    async def statuses(self, email, post_ids):
+        return self._favorites(email).intersection(post_ids)
+
+    async def counts(self, post_ids):
+        if self._counts is None:
+            # Tüm favori listelerini okuyan tek seferlik tarama
+            self._counts = Counter(post_id for email in self.store for post_id in self.store[email])
+        return {post_id: self._counts.get(post_id, 0) for post_id in post_ids}
+
+
+class JsonSubscriberRepository(SubscriberRepository):
+    """Subscribers in a ``JournaledStore`` (email -> subscription time).
+
+    Nobody unsubscribes yet, so an append-only list of emails gives exports
+    a stable order to page through while new subscriptions keep coming in.
+    The list is read from the store on the first export.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._order: Optional[List[str]] = None
+
+    async def add(self, email):
+        if email in self.store:
+            return False
+        self.store[email] = datetime.now().isoformat()
+        if self._order is not None:
+            self._order.append(email)
+        return True
+
+    async def add_many(self, emails):
+        added = 0
+        for email in emails:
+            added += await self.add(email)
+        return added
+
+    async def count(self):
+        return len(self.store)
+
+    async def batches(self, size=1000):
+        if self._order is None:
+            self._order = list(self.store)
+        for start in range(0, len(self._order), size):
+            yield [(email, self.store[email]) for email in self._order[start:start + size]]
@@ -0,0 +1,138 @@
+"""Serialized response cache with strong ETags and version-based invalidation.
+
+Each cached entry holds the encoded JSON body plus the versions of the tags
+it was built from (``"posts"``, ``"post:1"``, ``"subscribers"`` ...). Writes
+bump the version of the tags they touch, so only the entries that depend on
+the changed data are rebuilt. A hit skips pydantic validation and JSON
+encoding entirely; a matching ``If-None-Match`` gets ``304 Not Modified``.
+"""
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+
+class CachePolicy:
+    """How a route is cached: ``Cache-Control`` header and server-side TTL.
+
+    ``ttl`` bounds staleness for data that other worker processes can change
+    (their writes do not bump our versions).
+    """
+
+    def __init__(self, cache_control: str = "no-cache", ttl: Optional[float] = None):
+        self.cache_control = cache_control
+        self.ttl = ttl
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "headers", "versions", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, headers: Dict[str, str], versions: Tuple, expires_at: Optional[float]):
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.versions = versions
+        self.expires_at = expires_at
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match zayıf karşılaştırma kullanır (RFC 9110), W/ önekini yok say
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._adapters: Dict[Any, TypeAdapter] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def bump(self, *tags: str):
+        """Invalidate every entry built from any of ``tags``."""
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def _current_versions(self, tags: Iterable[str]) -> Tuple:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    @staticmethod
+    def cache_key(request: Request) -> str:
+        query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def _encode(self, data: Any, model: Any) -> bytes:
+        if isinstance(data, bytes):
+            # Önceden encode edilmiş gövde (ör. PostEncoder), olduğu gibi kullanılır
+            return data
+        adapter = self._adapters.get(model)
+        if adapter is None:
+            adapter = self._adapters[model] = TypeAdapter(model)
+        return adapter.dump_json(adapter.validate_python(data))
+
+    async def respond(
+        self,
+        request: Request,
+        tags: Tuple[str, ...],
+        build: Callable[[], Any],
+        model: Any,
+        policy: CachePolicy,
+        headers: Optional[Callable[[], Dict[str, str]]] = None,
+    ) -> Response:
+        """Serve ``request`` from cache, or build, encode and cache it.
+
+        ``build`` may be sync or async and is only called on a miss, as is
+        ``headers`` (extra response headers to cache with the body). If it
+        returns ``bytes`` they are taken as the encoded JSON body and
+        ``model`` is not used.
+        """
+        key = self.cache_key(request)
+        versions = self._current_versions(tags)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry.versions == versions and (entry.expires_at is None or entry.expires_at > now):
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            data = build()
+            if inspect.isawaitable(data):
+                data = await data
+            body = self._encode(data, model)
+            expires_at = now + policy.ttl if policy.ttl is not None else None
+            entry = _Entry(body, make_etag(body), headers() if headers else {}, versions, expires_at)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        response_headers = {"ETag": entry.etag, "Cache-Control": policy.cache_control, **entry.headers}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=response_headers)
+        return Response(content=entry.body, media_type="application/json", headers=response_headers)
+
+    def metrics(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,282 @@
+"""In-process inverted index with BM25 ranking for blog post search."""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Türkçe büyük/küçük harf: "I" -> "ı", "İ" -> "i". Aramada ikisini de "i"ye
+# indiriyoruz ki "AI", "ai" ve "aı" aynı terime düşsün.
+_TURKISH_FOLD = str.maketrans({"I": "i", "İ": "i", "ı": "i"})
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Son kelime bundan kısaysa önek olarak genişletilmez ("s" bütün s'li terimleri taramasın)
+MIN_PREFIX_LENGTH = 2
+# Önek en fazla bu kadar terime genişletilir: en çok dokümanda geçenler
+MAX_PREFIX_TERMS = 32
+# idf ve avgdl'nin dayandığı doküman sayısı / ortalama uzunluk bu oranda kayınca
+# yenilenir; arada bir değişiklik sadece kendi terimlerinin sıralı listelerini siler
+STATS_DRIFT = 0.01
+
+DEFAULT_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "excerpt": 1.5,
+    "content": 1.0,
+}
+
+
+def fold(text: str) -> str:
+    """Normalize and case fold text the Turkish-aware way."""
+    return unicodedata.normalize("NFKC", text).translate(_TURKISH_FOLD).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _post_fields(post: dict) -> Dict[str, str]:
+    return {
+        "title": post["title"],
+        "tags": " ".join(post.get("tags", [])),
+        "excerpt": post["excerpt"],
+        "content": post["content"],
+    }
+
+
+class SearchIndex:
+    """BM25F index over title, excerpt, content and tags.
+
+    Postings hold field-weighted term frequencies, so a query only touches
+    the documents that contain its terms. The last query token is matched
+    as a prefix to keep search-as-you-type working: from
+    ``MIN_PREFIX_LENGTH`` characters on, and only against the
+    ``MAX_PREFIX_TERMS`` most common completions.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, field_weights: Optional[Dict[str, float]] = None):
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._docs: Dict[int, dict] = {}
+        self._total_len = 0.0
+        self._sorted_terms: Optional[List[str]] = None
+        self._stats: Optional[Tuple[int, float]] = None
+        # Terim -> (-BM25 katkısı, doc id) artan sırada, _top_k için
+        self._impacts: Dict[str, List[Tuple[float, int]]] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, post: dict):
+        """Index a post, replacing any previous version with the same id."""
+        doc_id = post["id"]
+        if doc_id in self._docs:
+            self.remove(doc_id)
+
+        weighted = Counter()
+        length = 0.0
+        for field, text in _post_fields(post).items():
+            weight = self.field_weights.get(field, 0.0)
+            if not weight or not text:
+                continue
+            tokens = tokenize(text)
+            length += weight * len(tokens)
+            for token in tokens:
+                weighted[token] += weight
+
+        new_terms = False
+        for term, tf in weighted.items():
+            self._impacts.pop(term, None)
+            postings = self._postings[term]
+            if not postings:
+                new_terms = True
+            postings[doc_id] = tf
+        if new_terms:
+            self._sorted_terms = None
+
+        self._doc_terms[doc_id] = list(weighted)
+        self._doc_len[doc_id] = length
+        self._docs[doc_id] = post
+        self._total_len += length
+
+    update = add
+
+    def remove(self, doc_id: int):
+        if doc_id not in self._docs:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            self._impacts.pop(term, None)
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return [prefix] if prefix in self._postings else []
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        matches = []
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            matches.append(terms[i])
+            i += 1
+        if len(matches) > MAX_PREFIX_TERMS:
+            matches = heapq.nlargest(MAX_PREFIX_TERMS, matches, key=lambda term: len(self._postings[term]))
+        return matches
+
+    def _collection_stats(self) -> Tuple[int, float]:
+        # Her eklemede N ve avgdl değişse bütün sıralı listeler geçersiz olurdu
+        n = len(self._docs)
+        avgdl = self._total_len / n or 1.0
+        if self._stats is not None:
+            frozen_n, frozen_avgdl = self._stats
+            if abs(n - frozen_n) <= STATS_DRIFT * frozen_n and abs(avgdl - frozen_avgdl) <= STATS_DRIFT * frozen_avgdl:
+                return self._stats
+        self._stats = (n, avgdl)
+        self._impacts.clear()
+        return self._stats
+
+    def _idf(self, df: int) -> float:
+        n, _ = self._collection_stats()
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self) -> Tuple[float, float, float]:
+        # BM25: normalizasyon a + c * dl
+        _, avgdl = self._collection_stats()
+        return self.k1 * (1 - self.b), self.k1 * self.b / avgdl, self.k1 + 1
+
+    def _impact_list(self, term: str) -> List[Tuple[float, int]]:
+        impacts = self._impacts.get(term)
+        if impacts is None:
+            postings = self._postings[term]
+            idf = self._idf(len(postings))
+            a, c, k1_plus = self._bm25()
+            doc_len = self._doc_len
+            impacts = self._impacts[term] = sorted(
+                (-idf * tf * k1_plus / (tf + a + c * doc_len[doc_id]), doc_id) for doc_id, tf in postings.items()
+            )
+        return impacts
+
+    def _group_impacts(self, group: List[str]) -> List[Tuple[float, int]]:
+        # Önek grubunda bir doküman birden fazla terimde geçebilir: katkılar toplanır
+        if len(group) == 1:
+            return self._impact_list(group[0])
+        contributions: Dict[int, float] = defaultdict(float)
+        for term in group:
+            for negative, doc_id in self._impact_list(term):
+                contributions[doc_id] -= negative
+        return sorted((-score, doc_id) for doc_id, score in contributions.items())
+
+    def _top_k(self, groups: List[List[str]], candidates: set, limit: int) -> List[int]:
+        """Best ``limit`` of ``candidates`` without scoring all of them (threshold algorithm).
+
+        Every query term's postings (a prefix group merged into one list) are
+        walked in decreasing contribution order, one depth at a time, and each
+        candidate met is scored in full. No unseen document can score more
+        than the sum of the contributions at the current depth, so the walk
+        stops once the ``limit``-th best beats
+        that sum, or once every candidate has been scored.
+        """
+        a, c, k1_plus = self._bm25()
+        doc_len = self._doc_len
+        terms = [term for group in groups for term in group]
+        lists = [self._group_impacts(group) for group in groups]
+        idf = {term: self._idf(len(self._postings[term])) for term in terms}
+        seen = set()
+        # (skor, -doc id) min-heap: kökte listenin en kötüsü
+        best: List[Tuple[float, int]] = []
+        depth = 0
+        while len(seen) < len(candidates):
+            bound = 0.0
+            for impacts in lists:
+                if depth >= len(impacts):
+                    continue
+                negative, doc_id = impacts[depth]
+                bound -= negative
+                if doc_id in seen or doc_id not in candidates:
+                    continue
+                seen.add(doc_id)
+                score = 0.0
+                for term in terms:
+                    tf = self._postings[term].get(doc_id)
+                    if tf is not None:
+                        score += idf[term] * tf * k1_plus / (tf + a + c * doc_len[doc_id])
+                item = (score, -doc_id)
+                if len(best) < limit:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+            if len(best) == limit and best[0][0] > bound:
+                break
+            depth += 1
+        best.sort(reverse=True)
+        return [-negative_id for _, negative_id in best]
+
+    def search(self, query: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[dict]:
+        """Return posts matching every query term, best match first.
+
+        With ``limit`` only the best ``limit`` are looked for (:meth:`_top_k`),
+        without scoring or sorting every match.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._docs:
+            return []
+
+        # Her sorgu terimi için (terim, posting) grupları; son terim önek olarak genişletilir
+        groups: List[List[str]] = [[token] for token in tokens[:-1]]
+        groups.append(self._expand_prefix(tokens[-1]))
+        if limit is not None and limit <= 0:
+            return []
+
+        candidates: Optional[set] = None
+        for group in sorted(groups, key=lambda g: sum(len(self._postings.get(t, ())) for t in g)):
+            docs = set()
+            for term in group:
+                docs.update(self._postings.get(term, ()))
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+
+        if category and category != "All":
+            candidates = {doc_id for doc_id in candidates if self._docs[doc_id]["category"] == category}
+        if limit is not None:
+            return [self._docs[doc_id] for doc_id in self._top_k(groups, candidates, limit)]
+
+        # idf her terim için bir kez hesaplanır
+        a, c, k1_plus = self._bm25()
+        doc_len = self._doc_len
+        scores = dict.fromkeys(candidates, 0.0)
+        for group in groups:
+            for term in group:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = self._idf(len(postings))
+                if len(postings) < len(scores):
+                    matched = (doc_id for doc_id in postings if doc_id in scores)
+                else:
+                    matched = (doc_id for doc_id in scores if doc_id in postings)
+                for doc_id in matched:
+                    tf = postings[doc_id]
+                    scores[doc_id] += idf * tf * k1_plus / (tf + a + c * doc_len[doc_id])
+
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [self._docs[doc_id] for doc_id in ranked]
+
+
+def build_index(posts: Iterable[dict]) -> SearchIndex:
+    index = SearchIndex()
+    for post in posts:
+        index.add(post)
+    return index
@@ -0,0 +1,260 @@
+"""Compact binary snapshots of a key/value store, read through mmap.
+
+Layout (little endian)::
+
+    header   magic "BXSNAP01" | record count u64 | slot count u64 | table offset u64
+    records  key length u32 | value length u32 | key (UTF-8) | value (JSON, UTF-8)
+    table    slot count x (key hash u64, record offset u64), linear probing
+
+Opening a snapshot maps the file and reads the 32 byte header whatever the
+file size. A lookup hashes the key and probes the table inside the mapping;
+only the record asked for is decoded. ``SnapshotRecords`` layers the
+records changed since the snapshot was written on top of it.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+MAGIC = b"BXSNAP01"
+_HEADER = struct.Struct("<8sQQQ")
+_RECORD = struct.Struct("<II")
+_SLOT = struct.Struct("<QQ")
+
+
+def key_hash(key: bytes) -> int:
+    # Python'un hash()'i process başına rastgele; dosyada kalıcı bir hash gerekir
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def encode_value(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def is_snapshot(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def write_snapshot(path: str, records: Iterable[Tuple[bytes, bytes]]) -> int:
+    """Write ``(key, encoded value)`` pairs (unique keys) atomically; returns the count."""
+    tmp_path = path + ".tmp"
+    hashes = array("Q")
+    offsets = array("Q")
+    with open(tmp_path, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        offset = _HEADER.size
+        for key, value in records:
+            hashes.append(key_hash(key))
+            offsets.append(offset)
+            f.write(_RECORD.pack(len(key), len(value)))
+            f.write(key)
+            f.write(value)
+            offset += _RECORD.size + len(key) + len(value)
+
+        # Doluluk en fazla %50: ıskalanan aramalar birkaç slotta biter
+        slots = 8
+        while slots < 2 * len(offsets):
+            slots *= 2
+        mask = slots - 1
+        table = bytearray(slots * _SLOT.size)
+        used = bytearray(slots)
+        for digest, record_offset in zip(hashes, offsets):
+            slot = digest & mask
+            while used[slot]:
+                slot = (slot + 1) & mask
+            used[slot] = 1
+            _SLOT.pack_into(table, slot * _SLOT.size, digest, record_offset)
+        f.write(table)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(offsets), slots, offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(offsets)
+
+
+class Snapshot:
+    """Read-only view of a snapshot file; an absent file is an empty snapshot."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        # SnapshotRecords'un okuma sayacı; eski snapshot son okuyucu bitince kapanır
+        self.readers = 0
+        self._count = 0
+        self._mask = 0
+        self._table = 0
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, slots, self._table = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        self._mask = slots - 1
+
+    def __len__(self):
+        return self._count
+
+    def _find(self, key: bytes) -> int:
+        # Kaydın offset'i, yoksa 0 (kayıtlar header'dan sonra başlar)
+        if not self._count:
+            return 0
+        digest = key_hash(key)
+        slot = digest & self._mask
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(self._map, self._table + slot * _SLOT.size)
+            if offset == 0:
+                return 0
+            if slot_hash == digest:
+                key_length, _ = _RECORD.unpack_from(self._map, offset)
+                start = offset + _RECORD.size
+                if self._map[start:start + key_length] == key:
+                    return offset
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key.encode()) != 0
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        offset = self._find(key.encode())
+        if not offset:
+            return None
+        key_length, value_length = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size + key_length
+        return self._map[start:start + value_length]
+
+    def raw_items(self) -> Iterator[Tuple[bytes, bytes]]:
+        """``(key, encoded value)`` pairs in file order."""
+        offset = _HEADER.size
+        while offset < self._table:
+            key_length, value_length = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            yield self._map[start:start + key_length], self._map[start + key_length:start + key_length + value_length]
+            offset = start + key_length + value_length
+
+    def keys(self) -> Iterator[str]:
+        for key, _ in self.raw_items():
+            yield key.decode()
+
+    def close(self):
+        """Unmap the file; the snapshot must not be read afterwards."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class SnapshotRecords(MutableMapping):
+    """A snapshot plus the records loaded or changed since it was written.
+
+    Values are decoded on first access and kept in ``loaded``, so callers
+    that change a record in place keep working on the same object. Keys
+    deleted are remembered in ``deleted`` until the snapshot no longer has
+    them. Every read of the snapshot is counted, so a snapshot replaced by
+    :meth:`replace_snapshot` is unmapped when its last reader is done.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.loaded: Dict[str, Any] = {}
+        self.deleted: Set[str] = set()
+        self._length = len(snapshot)
+        self._readers_lock = threading.Lock()
+
+    @contextmanager
+    def _reading(self) -> Iterator[Snapshot]:
+        with self._readers_lock:
+            snapshot = self.snapshot
+            snapshot.readers += 1
+        try:
+            yield snapshot
+        finally:
+            with self._readers_lock:
+                snapshot.readers -= 1
+                if not snapshot.readers and snapshot is not self.snapshot:
+                    snapshot.close()
+
+    def __getitem__(self, key):
+        try:
+            return self.loaded[key]
+        except KeyError:
+            pass
+        if key in self.deleted:
+            raise KeyError(key)
+        with self._reading() as snapshot:
+            raw = snapshot.get_raw(key)
+        if raw is None:
+            raise KeyError(key)
+        value = self.loaded[key] = json.loads(raw)
+        return value
+
+    def __contains__(self, key):
+        if key in self.loaded:
+            return True
+        if key in self.deleted:
+            return False
+        with self._reading() as snapshot:
+            return key in snapshot
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._length += 1
+        self.loaded[key] = value
+        self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.loaded.pop(key, None)
+        # Snapshot'ta henüz yoksa da işaretlenir: yazılmakta olan snapshot'ta olabilir
+        self.deleted.add(key)
+        self._length -= 1
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        # Önce snapshot sırası, sonra sonradan eklenenler
+        with self._reading() as snapshot:
+            for key in snapshot.keys():
+                if key not in self.deleted:
+                    yield key
+            for key in list(self.loaded):
+                if key not in snapshot:
+                    yield key
+
+    def merged(self, loaded: Dict[str, Any], deleted: Set[str]) -> Iterator[Tuple[bytes, bytes]]:
+        """Records for a new snapshot: untouched ones are copied without decoding."""
+        with self._reading() as snapshot:
+            for key, value in snapshot.raw_items():
+                name = key.decode()
+                if name not in deleted and name not in loaded:
+                    yield key, value
+        for name, value in loaded.items():
+            yield name.encode(), encode_value(value)
+
+    def replace_snapshot(self, snapshot: Snapshot):
+        """Switch to a snapshot written from :meth:`merged`; contents stay the same.
+
+        The previous snapshot is closed now if nobody is reading it, otherwise
+        by its last reader.
+        """
+        with self._readers_lock:
+            previous, self.snapshot = self.snapshot, snapshot
+            if not previous.readers:
+                previous.close()
+        self.deleted = {key for key in self.deleted if key in snapshot}
@@ -0,0 +1,395 @@
+"""SQLite implementations of the user, favorite and subscriber repositories.
+
+All uvicorn workers share one database file in WAL mode, so readers never
+block the writer and every worker sees the same data. Each worker process
+owns a small thread pool; every pool thread keeps its own connection, and
+sqlite3's per-connection statement cache reuses the prepared statements
+for the constant SQL strings below.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from repository import FavoriteRepository, SubscriberRepository, UserRepository
+from storage import load_records
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    hashed_password TEXT NOT NULL,
+    phone TEXT,
+    avatar TEXT,
+    avatar_variants TEXT,
+    join_date TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS favorites (
+    user_email TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    UNIQUE (user_email, post_id)
+);
+CREATE INDEX IF NOT EXISTS favorites_post_id ON favorites (post_id);
+CREATE TABLE IF NOT EXISTS favorite_counts (
+    post_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS favorites_count_insert AFTER INSERT ON favorites BEGIN
+    INSERT INTO favorite_counts (post_id, count) VALUES (NEW.post_id, 1)
+    ON CONFLICT(post_id) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS favorites_count_delete AFTER DELETE ON favorites BEGIN
+    UPDATE favorite_counts SET count = count - 1 WHERE post_id = OLD.post_id;
+END;
+CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+    email TEXT PRIMARY KEY,
+    subscribed_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# users tablosu kolonları <-> users.json alanları
+USER_COLUMNS = {
+    "id": "id",
+    "email": "email",
+    "firstName": "first_name",
+    "lastName": "last_name",
+    "hashed_password": "hashed_password",
+    "phone": "phone",
+    "avatar": "avatar",
+    "avatarVariants": "avatar_variants",
+    "joinDate": "join_date",
+    "isActive": "is_active",
+}
+_SELECT_USER = (
+    "SELECT id, email, first_name, last_name, hashed_password, phone, avatar, avatar_variants, join_date, is_active "
+    "FROM users WHERE email = ?"
+)
+_INSERT_USER = (
+    "INSERT INTO users (email, first_name, last_name, hashed_password, phone, avatar, avatar_variants, join_date, is_active) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_IMPORT_USER = (
+    "INSERT OR IGNORE INTO users "
+    "(id, email, first_name, last_name, hashed_password, phone, avatar, avatar_variants, join_date, is_active) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_COUNT_USERS = "SELECT COUNT(*) FROM users"
+_SELECT_AVATAR = "SELECT avatar FROM users WHERE email = ?"
+_UPDATE_AVATAR = "UPDATE users SET avatar = ?, avatar_variants = ? WHERE email = ?"
+_SELECT_FAVORITES = "SELECT post_id FROM favorites WHERE user_email = ? ORDER BY rowid"
+_CONTAINS_FAVORITE = "SELECT 1 FROM favorites WHERE user_email = ? AND post_id = ?"
+_INSERT_FAVORITE = "INSERT OR IGNORE INTO favorites (user_email, post_id) VALUES (?, ?)"
+_DELETE_FAVORITE = "DELETE FROM favorites WHERE user_email = ? AND post_id = ?"
+# Yeni email'de zaten olan favoriler önce silinir; UPDATE OR IGNORE onları eski email'de öksüz bırakırdı
+_DELETE_RENAME_CONFLICTS = (
+    "DELETE FROM favorites WHERE user_email = :old "
+    "AND post_id IN (SELECT post_id FROM favorites WHERE user_email = :new)"
+)
+_RENAME_FAVORITES = "UPDATE favorites SET user_email = :new WHERE user_email = :old"
+# id listesi JSON olarak bağlanır; SQL metni sabit kalır, prepared statement önbellekte tekrar kullanılır
+_SELECT_FAVORITE_STATUSES = (
+    "SELECT post_id FROM favorites WHERE user_email = ? AND post_id IN (SELECT value FROM json_each(?))"
+)
+_SELECT_FAVORITE_COUNTS = (
+    "SELECT post_id, count FROM favorite_counts WHERE post_id IN (SELECT value FROM json_each(?))"
+)
+_INSERT_SUBSCRIBER = "INSERT OR IGNORE INTO newsletter_subscribers (email, subscribed_at) VALUES (?, ?)"
+_COUNT_SUBSCRIBERS = "SELECT COUNT(*) FROM newsletter_subscribers"
+# Keyset sayfalama: birincil anahtar (email) sırasıyla, OFFSET taraması yok
+_SELECT_SUBSCRIBERS_AFTER = (
+    "SELECT email, subscribed_at FROM newsletter_subscribers WHERE email > ? ORDER BY email LIMIT ?"
+)
+
+
+def _row_to_user(row) -> dict:
+    user = dict(zip(USER_COLUMNS, row))
+    user["isActive"] = bool(user["isActive"])
+    user["avatarVariants"] = json.loads(user["avatarVariants"]) if user["avatarVariants"] else None
+    return user
+
+
+def _column_value(field: str, value):
+    # avatarVariants JSON metin olarak, isActive 0/1 olarak saklanır
+    if field == "isActive":
+        return int(value)
+    if field == "avatarVariants":
+        return json.dumps(value) if value else None
+    return value
+
+
+class SQLiteDatabase:
+    """Per-process connection pool for one SQLite file.
+
+    Queries run on ``pool_size`` threads, each with its own connection, so
+    the event loop never waits on disk.
+    """
+
+    def __init__(self, path: str = "blogx.db", pool_size: int = 4):
+        self.path = path
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def initialize(self):
+        """Create tables and indexes (idempotent)."""
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        # Eski veritabanlarına sonradan eklenen kolonlar
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        if "avatar_variants" not in columns:
+            try:
+                conn.execute("ALTER TABLE users ADD COLUMN avatar_variants TEXT")
+            except sqlite3.OperationalError:
+                # Başka bir worker aynı anda ekledi
+                pass
+
+    async def run(self, fn, *args):
+        """Run ``fn(connection, *args)`` on a pool thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix="sqlite")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, fn, args)
+
+    def _call(self, fn, args):
+        return fn(self.connection(), *args)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def migrate_json(conn: sqlite3.Connection, users_file: str, favorites_file: str) -> bool:
+    """One-shot import of ``users.json`` / ``favorites.json``.
+
+    Runs in a single IMMEDIATE transaction and records itself in the
+    ``migrations`` table, so when several workers start together only the
+    first one imports. Returns True if the import ran.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM migrations WHERE name = 'json_import'").fetchone():
+            conn.rollback()
+            return False
+        for user in load_records(users_file).values():
+            conn.execute(_IMPORT_USER, (
+                user["id"], user["email"], user["firstName"], user["lastName"], user["hashed_password"],
+                user.get("phone"), user.get("avatar"), _column_value("avatarVariants", user.get("avatarVariants")),
+                user["joinDate"], int(user.get("isActive", True)),
+            ))
+        for email, post_ids in load_records(favorites_file).items():
+            conn.executemany(_INSERT_FAVORITE, [(email, post_id) for post_id in post_ids])
+        conn.execute("INSERT INTO migrations (name, applied_at) VALUES ('json_import', ?)", (datetime.now().isoformat(),))
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def count_favorites(conn: sqlite3.Connection) -> bool:
+    """Backfill ``favorite_counts`` for databases created before it existed.
+
+    Triggers keep the table current afterwards. Recorded in ``migrations``
+    like :func:`migrate_json`; returns True if the backfill ran.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM migrations WHERE name = 'favorite_counts'").fetchone():
+            conn.rollback()
+            return False
+        conn.execute("DELETE FROM favorite_counts")
+        conn.execute("INSERT INTO favorite_counts (post_id, count) SELECT post_id, COUNT(*) FROM favorites GROUP BY post_id")
+        conn.execute("INSERT INTO migrations (name, applied_at) VALUES ('favorite_counts', ?)", (datetime.now().isoformat(),))
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def normalize_subscribers(conn: sqlite3.Connection) -> bool:
+    """Trim and lower-case subscriber emails stored before normalization.
+
+    Addresses that collapse onto an existing one are dropped. Recorded in
+    ``migrations``; returns True if it ran.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM migrations WHERE name = 'subscriber_emails'").fetchone():
+            conn.rollback()
+            return False
+        conn.execute("UPDATE OR IGNORE newsletter_subscribers SET email = lower(trim(email)) WHERE email != lower(trim(email))")
+        # Normalize hali zaten kayıtlı olanlar güncellenemedi; kopyaları sil
+        conn.execute("DELETE FROM newsletter_subscribers WHERE email != lower(trim(email))")
+        conn.execute("INSERT INTO migrations (name, applied_at) VALUES ('subscriber_emails', ?)", (datetime.now().isoformat(),))
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class SQLiteUserRepository(UserRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def get(self, email):
+        return await self.db.run(self._get, email)
+
+    @staticmethod
+    def _get(conn, email):
+        row = conn.execute(_SELECT_USER, (email,)).fetchone()
+        return _row_to_user(row) if row else None
+
+    async def add(self, user):
+        return await self.db.run(self._add, user)
+
+    @staticmethod
+    def _add(conn, user):
+        try:
+            with conn:
+                cursor = conn.execute(_INSERT_USER, (
+                    user["email"], user["firstName"], user["lastName"], user["hashed_password"],
+                    user.get("phone"), user.get("avatar"), _column_value("avatarVariants", user.get("avatarVariants")),
+                    user["joinDate"], int(user.get("isActive", True)),
+                ))
+        except sqlite3.IntegrityError:
+            # Başka bir worker aynı emaili az önce kaydetti
+            return None
+        return dict(user, id=cursor.lastrowid)
+
+    async def update(self, email, changes):
+        return await self.db.run(self._update, email, changes)
+
+    @classmethod
+    def _update(cls, conn, email, changes):
+        columns = [USER_COLUMNS[field] for field in changes if field != "id"]
+        if columns:
+            values = [_column_value(field, value) for field, value in changes.items() if field != "id"]
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            try:
+                with conn:
+                    conn.execute(f"UPDATE users SET {assignments} WHERE email = ?", (*values, email))
+            except sqlite3.IntegrityError:
+                # Başka bir worker yeni emaili az önce aldı
+                return None
+        return cls._get(conn, changes.get("email", email))
+
+    async def replace_avatar(self, email, avatar, variants):
+        return await self.db.run(self._replace_avatar, email, avatar, variants)
+
+    @staticmethod
+    def _replace_avatar(conn, email, avatar, variants):
+        # Eski değer yazma kilidi altında okunur; eşzamanlı iki yükleme aynı avatarı bırakamaz
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(_SELECT_AVATAR, (email,)).fetchone()
+            if row is not None:
+                conn.execute(_UPDATE_AVATAR, (avatar, _column_value("avatarVariants", variants), email))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return None if row is None else row[0] or ""
+
+    async def count(self):
+        return await self.db.run(lambda conn: conn.execute(_COUNT_USERS).fetchone()[0])
+
+
+class SQLiteFavoriteRepository(FavoriteRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def list(self, email):
+        return await self.db.run(lambda conn: [row[0] for row in conn.execute(_SELECT_FAVORITES, (email,))])
+
+    async def contains(self, email, post_id):
+        return await self.db.run(lambda conn: conn.execute(_CONTAINS_FAVORITE, (email, post_id)).fetchone() is not None)
+
+    async def add(self, email, post_id):
+        await self.db.run(self._write, _INSERT_FAVORITE, (email, post_id))
+
+    async def remove(self, email, post_id):
+        await self.db.run(self._write, _DELETE_FAVORITE, (email, post_id))
+
+    async def rename_user(self, old_email, new_email):
+        await self.db.run(self._rename, {"old": old_email, "new": new_email})
+
+    @staticmethod
+    def _rename(conn, params):
+        with conn:
+            conn.execute(_DELETE_RENAME_CONFLICTS, params)
+            conn.execute(_RENAME_FAVORITES, params)
+
+    @staticmethod
+    def _write(conn, sql, params):
+        with conn:
+            conn.execute(sql, params)
+
+    async def statuses(self, email, post_ids):
+        ids = json.dumps(list(post_ids))
+        return await self.db.run(lambda conn: {row[0] for row in conn.execute(_SELECT_FAVORITE_STATUSES, (email, ids))})
+
+    async def counts(self, post_ids):
+        ids = json.dumps(list(post_ids))
+        found = await self.db.run(lambda conn: dict(conn.execute(_SELECT_FAVORITE_COUNTS, (ids,)).fetchall()))
+        return {post_id: found.get(post_id, 0) for post_id in post_ids}
+
+
+class SQLiteSubscriberRepository(SubscriberRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def add(self, email):
+        return await self.db.run(self._add, email)
+
+    @staticmethod
+    def _add(conn, email):
+        with conn:
+            cursor = conn.execute(_INSERT_SUBSCRIBER, (email, datetime.now().isoformat()))
+        return cursor.rowcount == 1
+
+    async def add_many(self, emails):
+        return await self.db.run(self._add_many, list(emails))
+
+    @staticmethod
+    def _add_many(conn, emails):
+        subscribed_at = datetime.now().isoformat()
+        before = conn.total_changes
+        with conn:
+            conn.executemany(_INSERT_SUBSCRIBER, [(email, subscribed_at) for email in emails])
+        return conn.total_changes - before
+
+    async def count(self):
+        return await self.db.run(lambda conn: conn.execute(_COUNT_SUBSCRIBERS).fetchone()[0])
+
+    async def batches(self, size=1000):
+        after = ""
+        while True:
+            rows = await self.db.run(lambda conn: conn.execute(_SELECT_SUBSCRIBERS_AFTER, (after, size)).fetchall())
+            if not rows:
+                return
+            yield rows
+            if len(rows) < size:
+                return
+            after = rows[-1][0]
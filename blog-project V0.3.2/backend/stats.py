@@ -0,0 +1,153 @@
+"""Blog statistics kept as running counters.
+
+``BlogStats`` listens to ``PostRepository`` changes and remembers each
+post's last seen (category, views, comments). A change only adds the
+difference to the totals, so reading the stats never walks the posts.
+"""
+import time
+from collections import OrderedDict, deque
+from datetime import date
+from typing import Deque, Dict, Optional, Tuple
+
+COUNTERS = ("posts", "views", "comments", "subscribers")
+POST_COUNTERS = ("posts", "views", "comments")
+
+
+def _empty(counters=COUNTERS) -> Dict[str, int]:
+    return dict.fromkeys(counters, 0)
+
+
+class BlogStats:
+    """Totals plus per-category, per-day and optional time-bucketed counters.
+
+    Per-day and history counters record activity seen by this process:
+    views merged in by the view counter, comments, new posts and newsletter
+    subscriptions. Posts loaded at startup count towards the day they were
+    published.
+
+    ``history_buckets`` > 0 keeps that many buckets of ``bucket_seconds``
+    each; older buckets are dropped.
+    """
+
+    def __init__(self, max_days: int = 365, bucket_seconds: int = 3600, history_buckets: int = 0):
+        self.totals = _empty()
+        self.by_category: Dict[str, Dict[str, int]] = {}
+        self.by_day: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.max_days = max_days
+        self.bucket_seconds = bucket_seconds
+        self.history: Deque[Tuple[int, Dict[str, int]]] = deque(maxlen=history_buckets or None)
+        self.history_enabled = history_buckets > 0
+        # post_id -> (category, views, comments)
+        self._seen: Dict[int, Tuple[str, int, int]] = {}
+        self._repository = None
+        self.subscribers_synced_at: Optional[float] = None
+
+    def attach(self, repository):
+        """Count the repository's current posts and follow its changes."""
+        self._repository = repository
+        for post in repository:
+            category, views, comments = self._snapshot(post)
+            self._seen[post["id"]] = (category, views, comments)
+            self._add_category(category, posts=1, views=views, comments=comments)
+            self.totals["posts"] += 1
+            self.totals["views"] += views
+            self.totals["comments"] += comments
+            self._add_day(post["publishedAt"][:10], posts=1)
+        repository.on_change(self.post_changed)
+
+    @staticmethod
+    def _snapshot(post: dict) -> Tuple[str, int, int]:
+        return post["category"], post["views"], post.get("commentCount", 0)
+
+    def post_changed(self, post_id: int):
+        post = self._repository.get(post_id)
+        old = self._seen.pop(post_id, None)
+        new = self._snapshot(post) if post is not None else None
+        if new is not None:
+            self._seen[post_id] = new
+
+        if old is not None:
+            self._add_category(old[0], posts=-1, views=-old[1], comments=-old[2])
+        if new is not None:
+            self._add_category(new[0], posts=1, views=new[1], comments=new[2])
+
+        old_views, old_comments = (old[1], old[2]) if old else (0, 0)
+        new_views, new_comments = (new[1], new[2]) if new else (0, 0)
+        self.totals["posts"] += (new is not None) - (old is not None)
+        self.totals["views"] += new_views - old_views
+        self.totals["comments"] += new_comments - old_comments
+
+        # Günlük/geçmiş sayaçlar sadece artışları kaydeder (silme geçmişi geri almaz)
+        activity = {
+            "posts": 1 if old is None and new is not None else 0,
+            "views": max(new_views - old_views, 0) if new else 0,
+            "comments": max(new_comments - old_comments, 0) if new else 0,
+        }
+        if any(activity.values()):
+            self._record_activity(**activity)
+
+    def subscriber_added(self, count: int = 1):
+        self.totals["subscribers"] += count
+        self._record_activity(subscribers=count)
+
+    def set_subscribers(self, count: int):
+        """Resync the subscriber total with the shared store."""
+        self.totals["subscribers"] = count
+        self.subscribers_synced_at = time.monotonic()
+
+    def subscribers_stale(self, max_age: float) -> bool:
+        return self.subscribers_synced_at is None or time.monotonic() - self.subscribers_synced_at >= max_age
+
+    def _add_category(self, category: str, **deltas: int):
+        counters = self.by_category.setdefault(category, _empty(POST_COUNTERS))
+        for name, delta in deltas.items():
+            counters[name] += delta
+        if counters["posts"] == 0:
+            del self.by_category[category]
+
+    def _add_day(self, day: str, **deltas: int):
+        counters = self.by_day.get(day)
+        if counters is None:
+            out_of_order = bool(self.by_day) and day < next(reversed(self.by_day))
+            counters = self.by_day[day] = _empty()
+            # Günler genelde sırayla gelir; eski yazıların tarihleri araya girebilir
+            if out_of_order:
+                self.by_day = OrderedDict(sorted(self.by_day.items()))
+            while len(self.by_day) > self.max_days:
+                self.by_day.popitem(last=False)
+        for name, delta in deltas.items():
+            counters[name] += delta
+
+    def _record_activity(self, **deltas: int):
+        self._add_day(date.today().isoformat(), **deltas)
+        if self.history_enabled:
+            now = int(time.time())
+            start = now - now % self.bucket_seconds
+            if not self.history or self.history[-1][0] != start:
+                self.history.append((start, _empty()))
+            counters = self.history[-1][1]
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def summary(self) -> dict:
+        return {
+            "total_posts": self.totals["posts"],
+            "total_views": self.totals["views"],
+            "total_comments": self.totals["comments"],
+            "newsletter_subscribers": self.totals["subscribers"],
+        }
+
+    def breakdown(self, days: Optional[int] = None) -> dict:
+        day_items = list(self.by_day.items())
+        if days is not None:
+            day_items = day_items[-days:]
+        return {
+            "by_category": {category: dict(counters) for category, counters in self.by_category.items()},
+            "by_day": [{"date": day, **counters} for day, counters in day_items],
+        }
+
+    def history_buckets(self) -> list:
+        return [
+            {"start": start, "seconds": self.bucket_seconds, **counters}
+            for start, counters in self.history
+        ]
@@ -0,0 +1,309 @@
+"""Append-only journaled key/value store with background compaction.
+
+Records live in a binary snapshot (``snapshot.py``) that is memory-mapped
+on open and decoded one record at a time on first access, so opening a
+store costs the same for ten users as for a million. Each write appends
+one JSON line to ``<snapshot>.journal``; a background thread fsyncs the
+journal in groups and periodically folds it into a new snapshot. On open
+the journal(s) are replayed on top of the snapshot.
+"""
+import copy
+import json
+import logging
+import os
+import shutil
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from logging_config import LOGGER_NAME
+from snapshot import Snapshot, SnapshotRecords, encode_value, is_snapshot, write_snapshot
+
+logger = logging.getLogger(f"{LOGGER_NAME}.storage")
+
+# write_records içinde silinmiş kaydı işaretler
+DELETED = object()
+
+
+def replay_journal(path: str, data: MutableMapping, repair: bool = False) -> int:
+    """Apply the entries of one journal file to ``data``; returns the count.
+
+    A torn last line (crash mid-write) ends the replay. With ``repair`` the
+    file is truncated there, otherwise lines appended later would be lost
+    behind it on the next start.
+    """
+    try:
+        f = open(path, "rb+" if repair else "rb")
+    except FileNotFoundError:
+        return 0
+    count = 0
+    offset = 0
+    with f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete journal line")
+                entry = json.loads(line)
+            except ValueError:
+                if repair:
+                    f.truncate(offset)
+                break
+            if entry["op"] == "set":
+                data[entry["key"]] = entry["value"]
+            elif entry["op"] == "del":
+                data.pop(entry["key"], None)
+            offset += len(line)
+            count += 1
+    return count
+
+
+def load_records(snapshot_path: str) -> Dict[str, Any]:
+    """Read a store's current state (snapshot + journals) without opening it.
+
+    Reads binary snapshots as well as the JSON files older versions wrote.
+    """
+    if is_snapshot(snapshot_path):
+        snapshot = Snapshot(snapshot_path)
+        try:
+            data = {key.decode(): json.loads(value) for key, value in snapshot.raw_items()}
+        finally:
+            snapshot.close()
+    else:
+        try:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+    for suffix in (".journal.1", ".journal"):
+        replay_journal(snapshot_path + suffix, data)
+    return data
+
+
+class JournaledStore(MutableMapping):
+    """Dict-like store persisted as snapshot + append-only journal.
+
+    Values are mutated in place by the API handlers (``record["avatar"] = ...``),
+    so after such a change call :meth:`touch` to journal the new value.
+    Assigning or deleting a key journals automatically.
+
+    With a ``writer`` (see ``persistence.WriteBehindQueue``) changes are only
+    marked dirty and the writer calls :meth:`write_records` later.
+
+    Nothing is read until :meth:`open`. Without a snapshot the records of
+    ``legacy_path`` (a JSON snapshot of older versions, with its journals)
+    or else ``initial()`` are written to a new one.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        initial: Optional[Callable[[], Dict[str, Any]]] = None,
+        sync_interval: float = 0.05,
+        compact_threshold: int = 1000,
+        writer=None,
+        legacy_path: Optional[str] = None,
+    ):
+        self.snapshot_path = snapshot_path
+        self.legacy_path = legacy_path
+        self.initial = initial
+        self.journal_path = snapshot_path + ".journal"
+        # Sıkıştırma sırasında döndürülen eski journal
+        self.rotated_path = snapshot_path + ".journal.1"
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self.writer = writer
+
+        self._lock = threading.RLock()
+        self._data: Optional[SnapshotRecords] = None
+        self._journal = None
+        self._worker: Optional[threading.Thread] = None
+        self._journal_entries = 0
+        self._dirty = False
+        self._compacting = False
+        self._closed = False
+        self._wakeup = threading.Event()
+
+    def open(self):
+        """Map the snapshot, replay the journals and start the background thread."""
+        self._load()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._worker = threading.Thread(target=self._run, name=f"journal-{os.path.basename(self.snapshot_path)}", daemon=True)
+        self._worker.start()
+
+    # Başlangıç: snapshot + journal replay
+    def _load(self):
+        if not os.path.exists(self.snapshot_path):
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                # Eski sürümlerin JSON snapshot'ı bir kez binary'e çevrilir; dosyası yerinde kalır
+                records = load_records(self.legacy_path)
+            else:
+                records = self.initial() if self.initial else {}
+            write_snapshot(self.snapshot_path, ((key.encode(), encode_value(value)) for key, value in records.items()))
+        self._data = SnapshotRecords(Snapshot(self.snapshot_path))
+
+        for path in (self.rotated_path, self.journal_path):
+            self._journal_entries += self._replay(path)
+
+        if os.path.exists(self.rotated_path):
+            # Önceki sıkıştırma yarıda kalmış; her şeyi yeni snapshot'a yaz
+            self._write_snapshot(*self._freeze())
+            os.remove(self.rotated_path)
+            open(self.journal_path, "w").close()
+            self._journal_entries = 0
+
+    def _replay(self, path: str) -> int:
+        return replay_journal(path, self._data, repair=True)
+
+    # MutableMapping
+    def __getitem__(self, key):
+        try:
+            return self._data.loaded[key]
+        except KeyError:
+            pass
+        # İlk erişimde snapshot'tan çözülüp loaded'a eklenir; sıkıştırma onu kilit altında kopyalar
+        with self._lock:
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+        self._changed(key)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+        self._changed(key)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return f"JournaledStore({self.snapshot_path!r}, {len(self)} records)"
+
+    def touch(self, key):
+        """Journal the current value of ``key`` after an in-place change."""
+        self._changed(key)
+
+    def _changed(self, key):
+        if self.writer is not None:
+            self.writer.mark_dirty(self, key)
+        else:
+            self.write_records([(key, self._data.get(key, DELETED))])
+
+    def write_records(self, records: Iterable[Tuple[str, Any]]):
+        """Append one journal entry per ``(key, value)``; ``DELETED`` removes."""
+        lines = []
+        for key, value in records:
+            if value is DELETED:
+                entry = {"op": "del", "key": key}
+            else:
+                entry = {"op": "set", "key": key, "value": value}
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        with self._lock:
+            self._append(lines)
+
+    def _append(self, lines):
+        if self._closed:
+            raise RuntimeError("Store is closed")
+        self._journal.write("".join(lines))
+        # Süreç çökse bile satırlar işletim sisteminde kalır; fsync grup halinde yapılır
+        self._journal.flush()
+        self._journal_entries += len(lines)
+        self._dirty = True
+        if self._journal_entries >= self.compact_threshold and not self._compacting:
+            self._wakeup.set()
+
+    # Arka plan: grup fsync ve sıkıştırma
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+            if self._closed:
+                break
+            try:
+                self.sync()
+                if self._journal_entries >= self.compact_threshold:
+                    self.compact()
+            except Exception:
+                # Thread ölürse grup fsync bir daha çalışmaz; hata loglanır, sonraki turda tekrar denenir
+                logger.exception("Journal sync or compaction failed", extra={"store": self.snapshot_path})
+
+    def sync(self):
+        """fsync pending journal entries."""
+        with self._lock:
+            if not self._dirty or self._closed:
+                return
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._dirty = False
+
+    def compact(self):
+        """Fold the journal into a new snapshot.
+
+        The journal is rotated under the lock, so writers only wait for a
+        shallow copy of the records; the snapshot itself is written outside
+        the lock. If we crash before the rotated journal is removed, it is
+        simply replayed again on startup (entries are idempotent). If a
+        previous snapshot write failed, the rotated journal is still there;
+        the current journal is appended to it instead of replacing it.
+        """
+        with self._lock:
+            if self._compacting or self._closed:
+                return
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            if os.path.exists(self.rotated_path):
+                with open(self.journal_path, "rb") as src, open(self.rotated_path, "ab") as dst:
+                    size = dst.tell()
+                    try:
+                        shutil.copyfileobj(src, dst)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    except BaseException:
+                        # Yarım kopya bırakılmaz: yarım satır sonraki satırları replay'de gizler
+                        dst.truncate(size)
+                        raise
+                self._journal.close()
+                self._journal = open(self.journal_path, "w", encoding="utf-8")
+            else:
+                self._journal.close()
+                os.replace(self.journal_path, self.rotated_path)
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._compacting = True
+            self._journal_entries = 0
+            self._dirty = False
+            frozen = self._freeze()
+        try:
+            self._write_snapshot(*frozen)
+            os.remove(self.rotated_path)
+        finally:
+            self._compacting = False
+
+    def _freeze(self):
+        # Kayıtlar düz dict/list; bir seviyelik kopya yeterli. Snapshot'tan hiç
+        # okunmamış kayıtlar kopyalanmaz, yeni dosyaya ham baytlarıyla geçer.
+        loaded = {key: copy.copy(value) for key, value in self._data.loaded.items()}
+        return loaded, set(self._data.deleted)
+
+    def _write_snapshot(self, loaded: Dict[str, Any], deleted: set):
+        write_snapshot(self.snapshot_path, self._data.merged(loaded, deleted))
+        snapshot = Snapshot(self.snapshot_path)
+        with self._lock:
+            self._data.replace_snapshot(snapshot)
+
+    def close(self):
+        """Flush the journal and stop the background thread."""
+        if self._worker is None:
+            return
+        self.sync()
+        with self._lock:
+            self._closed = True
+            self._journal.close()
+        self._wakeup.set()
+        self._worker.join(timeout=5)
@@ -0,0 +1,106 @@
+"""Bounded LRU/TTL cache from bearer token to the resolved user."""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class TokenCache:
+    """Caches ``get_current_user`` results per token.
+
+    An entry lives until the earlier of the JWT ``exp`` and ``ttl`` seconds
+    after it was stored. Entries are also indexed by email so that profile,
+    password and avatar changes can drop every token of that user.
+
+    :meth:`invalidate_user` only reaches this process. Changes made by
+    other workers are caught by re-reading the user once an entry is
+    older than ``recheck_interval`` (see :meth:`needs_recheck`).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0, recheck_interval: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.recheck_interval = recheck_interval
+        # token -> (user, email, expires_at, checked_at); en son kullanılan sonda
+        self._entries: "OrderedDict[str, Tuple[Any, str, float, float]]" = OrderedDict()
+        self._tokens_by_email: Dict[str, Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.rechecks = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Any]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, email, expires_at, _ = entry
+        if expires_at <= time.time():
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def needs_recheck(self, token: str) -> bool:
+        """True once the entry's user was last read more than ``recheck_interval`` ago."""
+        entry = self._entries.get(token)
+        return entry is not None and entry[3] + self.recheck_interval <= time.time()
+
+    def revalidate(self, token: str, user: Any):
+        """Replace the entry's user with a fresh read; ``exp`` and the TTL are kept."""
+        entry = self._entries.get(token)
+        if entry is None:
+            return
+        self._entries[token] = (user, entry[1], entry[2], time.time())
+        self.rechecks += 1
+
+    def put(self, token: str, user: Any, email: str, exp: Optional[float] = None):
+        now = time.time()
+        expires_at = now + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if token in self._entries:
+            self._remove(token)
+        self._entries[token] = (user, email, expires_at, now)
+        self._tokens_by_email.setdefault(email, set()).add(token)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_user(self, email: str):
+        """Drop every cached token that resolves to ``email``."""
+        for token in self._tokens_by_email.pop(email, set()):
+            self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_email.clear()
+
+    def _remove(self, token: str):
+        _, email, _, _ = self._entries.pop(token)
+        tokens = self._tokens_by_email.get(email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[email]
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "rechecks": self.rechecks,
+        }
@@ -0,0 +1,231 @@
+"""Trending posts: view counts with exponential time decay, kept as a top K.
+
+A view at time ``t`` adds ``exp((t - epoch) / tau)`` to its post's score
+instead of 1, with ``tau = half_life / ln 2``. All scores decay at the same
+rate, so ordering by these growing weights is ordering by decayed view
+counts, and nothing is ever decayed in place. When the weights get too
+large the epoch moves forward and every score is rescaled once.
+
+Between rescales scores only grow, so a post outside the top K can only
+enter it by passing the smallest score inside; a min-heap over the K
+members (stale entries skipped lazily) gives that score. Reading the
+list sorts K entries.
+
+With a ``db_path`` the decayed scores are saved every ``save_interval``
+seconds and on stop, together with the time they were taken, and loaded
+again (decayed by the time in between) at the next start. Every worker
+sees the same merged view deltas, so whichever saves last stores the
+same list.
+"""
+import asyncio
+import heapq
+import math
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# exp(50) ~ 5e21: ağırlık bunu geçince epoch ileri alınır
+MAX_EXPONENT = 50.0
+# Yeniden ölçeklemeden sonra bundan küçük skorlar (top K dışında) unutulur
+MIN_SCORE = 1e-9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trending_scores (
+    post_id INTEGER PRIMARY KEY,
+    score REAL NOT NULL,
+    scored_at REAL NOT NULL
+)
+"""
+_SELECT_SCORES = "SELECT post_id, score, scored_at FROM trending_scores"
+_INSERT_SCORE = "INSERT INTO trending_scores (post_id, score, scored_at) VALUES (?, ?, ?)"
+
+
+class TrendingPosts:
+    """The ``size`` posts with the highest decayed view counts.
+
+    Fed by :meth:`record` (the view counter's merged deltas). All-time
+    view totals are not counted: after a restart the list continues from
+    the saved scores, or starts empty without them.
+    """
+
+    def __init__(
+        self,
+        size: int = 50,
+        half_life: float = 6 * 3600,
+        clock: Callable[[], float] = time.time,
+        db_path: Optional[str] = None,
+        save_interval: float = 60.0,
+    ):
+        self.size = size
+        self.half_life = half_life
+        self.db_path = db_path
+        self.save_interval = save_interval
+        self._tau = half_life / math.log(2)
+        self._clock = clock
+        self._epoch = clock()
+        self._scores: Dict[int, float] = {}
+        self._top: Dict[int, float] = {}
+        # (skor, post id); üyenin skoru değişince eski kayıt yığında kalır, _lowest atlar
+        self._heap: List[Tuple[float, int]] = []
+        self._repository = None
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self.views_total = 0
+        self.rescales_total = 0
+        self.saves_total = 0
+
+    def attach(self, repository):
+        """Load the saved scores of the repository's posts and follow deletions."""
+        self._repository = repository
+        if self._conn is not None:
+            with self._db_lock:
+                rows = self._conn.execute(_SELECT_SCORES).fetchall()
+            for post_id, score, scored_at in rows:
+                # Kaydedildiği andan bu yana geçen süre kadar sönmüş olarak eklenir
+                amount = score * math.exp((scored_at - self._epoch) / self._tau)
+                if amount >= MIN_SCORE and repository.get(post_id) is not None:
+                    self._add(post_id, amount)
+        repository.on_change(self.post_changed)
+
+    def open(self):
+        if self.db_path is not None and self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+
+    def start(self, repository):
+        """Open the database, load the saved scores and save them periodically."""
+        self.open()
+        self.attach(repository)
+        if self._conn is None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.save_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.save()
+            except sqlite3.Error:
+                pass
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+    def _decayed(self) -> List[Tuple[int, float, float]]:
+        now = self._clock()
+        decay = math.exp(-(now - self._epoch) / self._tau)
+        return [(post_id, score * decay, now) for post_id, score in self._scores.items() if score * decay >= MIN_SCORE]
+
+    def _write(self, rows: List[Tuple[int, float, float]]):
+        with self._db_lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM trending_scores")
+                self._conn.executemany(_INSERT_SCORE, rows)
+
+    async def save(self):
+        """Store every tracked post's decayed score as of now."""
+        if self._conn is None:
+            return
+        # Skorlar event loop'ta kopyalanır, yazma thread'de
+        rows = self._decayed()
+        await asyncio.get_running_loop().run_in_executor(None, self._write, rows)
+        self.saves_total += 1
+
+    def post_changed(self, post_id: int):
+        if self._repository.get(post_id) is None:
+            self.discard(post_id)
+
+    def _weight(self, now: float) -> float:
+        exponent = (now - self._epoch) / self._tau
+        if exponent > MAX_EXPONENT:
+            self._rescale(now)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _rescale(self, now: float):
+        factor = math.exp(-(now - self._epoch) / self._tau)
+        self._epoch = now
+        self._scores = {
+            post_id: score * factor
+            for post_id, score in self._scores.items()
+            if score * factor >= MIN_SCORE or post_id in self._top
+        }
+        self._top = {post_id: self._scores[post_id] for post_id in self._top}
+        self._rebuild_heap()
+        self.rescales_total += 1
+
+    def _rebuild_heap(self):
+        self._heap = [(score, post_id) for post_id, score in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def _lowest(self) -> Tuple[float, int]:
+        while True:
+            score, post_id = self._heap[0]
+            if self._top.get(post_id) == score:
+                return score, post_id
+            heapq.heappop(self._heap)
+
+    def record(self, post_id: int, count: int = 1, now: Optional[float] = None):
+        """Add ``count`` views of ``post_id`` seen at ``now`` (default: the clock)."""
+        if count <= 0:
+            return
+        self.views_total += count
+        self._add(post_id, count * self._weight(self._clock() if now is None else now))
+
+    def _add(self, post_id: int, amount: float):
+        score = self._scores[post_id] = self._scores.get(post_id, 0.0) + amount
+        if post_id not in self._top:
+            if len(self._top) >= self.size:
+                lowest_score, lowest_id = self._lowest()
+                if score <= lowest_score:
+                    return
+                del self._top[lowest_id]
+                heapq.heappop(self._heap)
+        self._top[post_id] = score
+        heapq.heappush(self._heap, (score, post_id))
+        if len(self._heap) > 4 * self.size:
+            # Üyelerin eski kayıtları birikmesin
+            self._rebuild_heap()
+
+    def discard(self, post_id: int):
+        """Forget a deleted post; the next best post takes its place."""
+        self._scores.pop(post_id, None)
+        if self._top.pop(post_id, None) is not None:
+            # Silme seyrek: top K bütün skorlardan yeniden seçilir
+            self._top = dict(heapq.nlargest(self.size, self._scores.items(), key=lambda item: item[1]))
+            self._rebuild_heap()
+
+    def top(self, limit: int) -> List[Tuple[int, float]]:
+        """Up to ``limit`` ``(post id, decayed view count)`` pairs, highest first."""
+        decay = math.exp(-(self._clock() - self._epoch) / self._tau)
+        ranked = sorted(self._top.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(post_id, score * decay) for post_id, score in ranked]
+
+    def metrics(self) -> dict:
+        return {
+            "tracked_posts": len(self._scores),
+            "views_total": self.views_total,
+            "rescales_total": self.rescales_total,
+            "saves_total": self.saves_total,
+        }
@@ -0,0 +1,154 @@
+"""Streaming multipart upload straight to a temp file with a size cap.
+
+Starlette's form parser spools the whole body before the handler runs,
+so the size check only happens after everything was received. Here the
+request body is parsed chunk by chunk; file data goes to disk through the
+thread pool and the upload is aborted as soon as it crosses ``max_size``.
+"""
+import hashlib
+import os
+import tempfile
+from typing import List, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from multipart.exceptions import MultipartParseError  # type: ignore
+from multipart.multipart import MultipartParser, parse_options_header  # type: ignore
+
+# Multipart sınırları ve part header'ları için Content-Length payı
+_ENVELOPE_BYTES = 16 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class UploadTooLarge(UploadError):
+    def __init__(self, detail: str):
+        super().__init__(detail, status_code=413)
+
+
+class ReceivedFile:
+    def __init__(self, path: str, size: int, filename: str, head: bytes, sha256: str):
+        self.path = path
+        self.size = size
+        self.filename = filename
+        # Dosyanın ilk baytları (magic byte kontrolü için)
+        self.head = head
+        self.sha256 = sha256
+
+
+class _FilePartCollector:
+    """MultipartParser callbacks that pick out the ``field_name`` file part."""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.pending: List[bytes] = []
+        self.in_target = False
+        self.found = False
+        self.finished = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self.in_target = False
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        # Aynı isimde ikinci bir dosya gelirse ilki kullanılır
+        if name == self.field_name and b"filename" in options and not self.found:
+            self.in_target = True
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+
+    def on_part_data(self, data, start, end):
+        if self.in_target:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self):
+        if self.in_target:
+            self.in_target = False
+            self.finished = True
+
+
+def _write_chunk(out, digest, data: bytes):
+    out.write(data)
+    digest.update(data)
+
+
+async def receive_file(request: Request, field_name: str, max_size: int, directory: str) -> ReceivedFile:
+    """Stream the ``field_name`` file of a multipart request into ``directory``.
+
+    Returns the temp file and its SHA-256, computed while writing; the
+    caller moves or deletes it. Raises
+    :class:`UploadTooLarge` once more than ``max_size`` bytes arrive, and
+    :class:`UploadError` for malformed requests.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UploadError("multipart/form-data bekleniyor")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + _ENVELOPE_BYTES:
+        raise UploadTooLarge("Dosya boyutu sınırı aşıldı")
+
+    collector = _FilePartCollector(field_name)
+    parser = MultipartParser(params[b"boundary"], collector.callbacks())
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".part")
+    size = 0
+    head = b""
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in request.stream():
+                try:
+                    parser.write(chunk)
+                except MultipartParseError:
+                    raise UploadError("Geçersiz multipart gövdesi")
+                if collector.pending:
+                    data = b"".join(collector.pending)
+                    collector.pending.clear()
+                    size += len(data)
+                    if size > max_size:
+                        raise UploadTooLarge("Dosya boyutu sınırı aşıldı")
+                    if len(head) < 16:
+                        head = (head + data)[:16]
+                    await run_in_threadpool(_write_chunk, out, digest, data)
+                if collector.finished:
+                    # Dosya parçası bitti; gövdenin kalanını beklemeye gerek yok
+                    break
+        if not collector.finished:
+            raise UploadError(f"'{field_name}' dosyası bulunamadı")
+    except BaseException:
+        os.remove(path)
+        raise
+    return ReceivedFile(path, size, collector.filename or "", head, digest.hexdigest())
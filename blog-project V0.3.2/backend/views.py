@@ -0,0 +1,175 @@
+"""Batched post view counting shared across worker processes.
+
+Each process counts views in memory. A background task periodically adds
+the local deltas to an SQLite aggregate table (WAL mode, so several uvicorn
+workers can write to it) and reads back the totals changed since its last
+read, by this or any other worker. The totals are
+then written onto the post dicts, so the read path itself never mutates
+shared state and counts survive restarts.
+"""
+import asyncio
+import sqlite3
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+# seq: satırı son değiştiren flush'ın sıra numarası; okuma sadece son görülenden yenileri çeker
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS post_views (
+    post_id INTEGER PRIMARY KEY,
+    views INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0
+)
+"""
+_ADD_SEQ = "ALTER TABLE post_views ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"
+_SEQ_INDEX = "CREATE INDEX IF NOT EXISTS post_views_seq ON post_views (seq)"
+# Yazmalar BEGIN IMMEDIATE ile sıralı, bu yüzden numaralar commit sırasıyla artar
+_NEXT_SEQ = "SELECT COALESCE(MAX(seq), 0) + 1 FROM post_views"
+_UPSERT = """
+INSERT INTO post_views (post_id, views, seq) VALUES (?, ?, ?)
+ON CONFLICT(post_id) DO UPDATE SET views = views + excluded.views, seq = excluded.seq
+"""
+_SELECT_CHANGED = "SELECT post_id, views, seq FROM post_views WHERE seq > ?"
+
+
+class ViewCounter:
+    """Counts views locally and merges them through ``post_views``.
+
+    ``post["views"]`` becomes the post's initial view count plus the merged
+    total, refreshed every ``flush_interval`` seconds, so it may lag a
+    little behind the true count.
+    """
+
+    def __init__(self, db_path: str = "views.db", flush_interval: float = 1.0):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._totals: Dict[int, int] = {}
+        # Okunan en yüksek seq; seq kolonundan önceki satırlar 0'dır ve ilk okumada gelir
+        self._seq = -1
+        self._base_views: Dict[int, int] = {}
+        self._repository = None
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+        self._db_lock = threading.Lock()
+        # Veritabanı start() ile açılır
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.flushed_views_total = 0
+
+    def record(self, post_id: int):
+        """Count one view; cheap and lock-free on the event loop."""
+        self._pending[post_id] += 1
+
+    def on_views(self, listener: Callable[[int, int], None]):
+        """Call ``listener(post_id, views)`` with the views merged in by each flush, from every worker."""
+        self._listeners.append(listener)
+
+    def attach(self, repository):
+        """Remember base counts for the repository's posts and apply stored totals."""
+        self._repository = repository
+        for post in repository:
+            self._base_views.setdefault(post["id"], post["views"])
+        # Açılışta okunan toplamlar yeni görüntülenme sayılmaz
+        self._apply(self._read_totals(), notify=False)
+
+    def _write_and_read(self, deltas: Counter) -> Dict[int, int]:
+        with self._db_lock:
+            if deltas:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    seq = self._conn.execute(_NEXT_SEQ).fetchone()[0]
+                    self._conn.executemany(_UPSERT, ((post_id, views, seq) for post_id, views in deltas.items()))
+                    self._conn.commit()
+                except BaseException:
+                    self._conn.rollback()
+                    raise
+            rows = self._conn.execute(_SELECT_CHANGED, (self._seq,)).fetchall()
+            if rows:
+                self._seq = max(seq for _, _, seq in rows)
+            return {post_id: views for post_id, views, _ in rows}
+
+    def _read_totals(self) -> Dict[int, int]:
+        return self._write_and_read(Counter())
+
+    def _apply(self, totals: Dict[int, int], notify: bool = True):
+        # Sadece değişen yazılar güncellenir
+        for post_id, total in totals.items():
+            previous = self._totals.get(post_id)
+            if previous == total:
+                continue
+            self._totals[post_id] = total
+            if notify:
+                for listener in self._listeners:
+                    listener(post_id, total - (previous or 0))
+            post = self._repository.get(post_id) if self._repository is not None else None
+            if post is not None:
+                base = self._base_views.setdefault(post_id, post["views"])
+                post["views"] = base + total
+                self._repository.touch(post_id, counters_only=True)
+
+    async def flush(self):
+        deltas, self._pending = self._pending, Counter()
+        loop = asyncio.get_running_loop()
+        try:
+            totals = await loop.run_in_executor(None, self._write_and_read, deltas)
+        except sqlite3.Error:
+            # Yazılamayan sayımlar kaybolmasın, bir sonraki turda tekrar denenir
+            self._pending.update(deltas)
+            raise
+        self.flushed_views_total += sum(deltas.values())
+        self._apply(totals)
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # Şema kilit altında kurulur; iki worker aynı anda seq kolonunu eklemeye çalışmasın
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(_SCHEMA)
+                columns = {row[1] for row in self._conn.execute("PRAGMA table_info(post_views)")}
+                if "seq" not in columns:
+                    self._conn.execute(_ADD_SEQ)
+                self._conn.execute(_SEQ_INDEX)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def start(self, repository):
+        self._connect()
+        self.attach(repository)
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except sqlite3.Error:
+                pass
+
+    async def stop(self):
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "pending_views": sum(self._pending.values()),
+            "flushed_views_total": self.flushed_views_total,
+            "tracked_posts": len(self._totals),
+        }
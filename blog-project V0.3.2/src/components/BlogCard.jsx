@@ -75,7 +75,7 @@ const BlogCard = ({ post, index }) => {
             </div>
             <div className="flex items-center space-x-1">
               <MessageCircle size={16} />
-              <span>{post.comments.length}</span>
+              <span>{post.commentCount ?? post.comments?.length ?? 0}</span>
             </div>
           </div>
         </div>
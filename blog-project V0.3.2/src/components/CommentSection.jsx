@@ -2,7 +2,7 @@ import React, { useState } from 'react';
 import { MessageCircle, Send } from 'lucide-react';
 import { motion } from 'framer-motion';
 
-const CommentSection = ({ comments, onAddComment }) => {
+const CommentSection = ({ comments, total, hasMore = false, onLoadMore, onAddComment }) => {
   const [newComment, setNewComment] = useState('');
   const [authorName, setAuthorName] = useState('');
 
@@ -24,7 +24,7 @@ const CommentSection = ({ comments, onAddComment }) => {
       <div className="flex items-center space-x-2 mb-6">
         <MessageCircle className="text-primary-500" size={24} />
         <h3 className="text-2xl font-bold text-gray-900 dark:text-gray-100">
-          Comments ({comments.length})
+          Comments ({total ?? comments.length})
         </h3>
       </div>
 
@@ -107,6 +107,14 @@ const CommentSection = ({ comments, onAddComment }) => {
           ))
         )}
       </div>
+
+      {hasMore && (
+        <div className="text-center mt-6">
+          <button type="button" onClick={onLoadMore} className="btn-secondary">
+            Load more comments
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -2,41 +2,46 @@ import React, { useState, useEffect } from 'react';
 import { Heart } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
 
-const FavoriteButton = ({ postId, size = 20, className = "" }) => {
-  const { user, isAuthenticated } = useAuth();
-  const [isFavorite, setIsFavorite] = useState(false);
-  const [isLoading, setIsLoading] = useState(false);
+// Aynı anda render edilen butonların durum kontrolleri tek bir
+// /api/favorites/status isteğinde toplanır (sayfa başına N yerine 1 istek)
+const MAX_STATUS_BATCH = 100;
+const pendingChecks = new Map(); // postId -> resolve listesi
+let flushTimer = null;
+
+const loadFavoriteStatus = (postId, token) => new Promise((resolve) => {
+  if (!pendingChecks.has(postId)) {
+    pendingChecks.set(postId, []);
+  }
+  pendingChecks.get(postId).push(resolve);
+  if (!flushTimer) {
+    flushTimer = setTimeout(() => flushStatusChecks(token), 0);
+  }
+});
 
-  // Favori durumunu kontrol et
-  useEffect(() => {
-    if (isAuthenticated && postId) {
-      console.log('Checking favorite status for post:', postId);
-      checkFavoriteStatus();
-    }
-  }, [isAuthenticated, postId]);
+const flushStatusChecks = async (token) => {
+  const batch = new Map(pendingChecks);
+  pendingChecks.clear();
+  flushTimer = null;
 
-  const checkFavoriteStatus = async () => {
+  const ids = [...batch.keys()];
+  for (let i = 0; i < ids.length; i += MAX_STATUS_BATCH) {
+    const chunk = ids.slice(i, i + MAX_STATUS_BATCH);
+    const statuses = {};
     try {
-      const token = localStorage.getItem('token');
-      if (!token) {
-        console.log('Token bulunamadı');
-        return;
-      }
-
-      console.log('Making request to check favorite status...');
-      const response = await fetch(`http://localhost:8000/api/favorites/check/${postId}`, {
+      const params = new URLSearchParams();
+      chunk.forEach((id) => params.append('ids', id));
+      const response = await fetch(`http://localhost:8000/api/favorites/status?${params}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
         }
       });
 
-      console.log('Response status:', response.status);
-      
       if (response.ok) {
         const data = await response.json();
-        console.log('Favorite status response:', data);
-        setIsFavorite(data.is_favorite);
+        data.statuses.forEach((item) => {
+          statuses[item.post_id] = item.is_favorite;
+        });
       } else {
         const errorText = await response.text();
         console.error('Favori kontrol hatası:', response.status, response.statusText, errorText);
@@ -44,6 +49,34 @@ const FavoriteButton = ({ postId, size = 20, className = "" }) => {
     } catch (error) {
       console.error('Favori durumu kontrol edilirken hata:', error);
     }
+    chunk.forEach((id) => batch.get(id).forEach((resolve) => resolve(statuses[id])));
+  }
+};
+
+const FavoriteButton = ({ postId, size = 20, className = "" }) => {
+  const { user, isAuthenticated } = useAuth();
+  const [isFavorite, setIsFavorite] = useState(false);
+  const [isLoading, setIsLoading] = useState(false);
+
+  // Favori durumunu kontrol et
+  useEffect(() => {
+    if (isAuthenticated && postId) {
+      console.log('Checking favorite status for post:', postId);
+      checkFavoriteStatus();
+    }
+  }, [isAuthenticated, postId]);
+
+  const checkFavoriteStatus = async () => {
+    const token = localStorage.getItem('token');
+    if (!token) {
+      console.log('Token bulunamadı');
+      return;
+    }
+
+    const status = await loadFavoriteStatus(postId, token);
+    if (status !== undefined) {
+      setIsFavorite(status);
+    }
   };
 
   const toggleFavorite = async (e) => {
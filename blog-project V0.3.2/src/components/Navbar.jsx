@@ -104,7 +104,7 @@ const Navbar = ({ darkMode, toggleDarkMode }) => {
                 >
                   {user?.avatar ? (
                     <img
-                      src={user.avatar}
+                      src={user.avatarVariants?.['64'] ?? user.avatar}
                       alt="Profil"
                       className="w-8 h-8 rounded-full object-cover border-2 border-gray-200 dark:border-gray-600"
                     />
@@ -220,7 +220,7 @@ const Navbar = ({ darkMode, toggleDarkMode }) => {
                   <div className="flex items-center space-x-3 mb-4">
                     {user?.avatar ? (
                       <img
-                        src={user.avatar}
+                        src={user.avatarVariants?.['128'] ?? user.avatar}
                         alt="Profil"
                         className="w-10 h-10 rounded-full object-cover border-2 border-gray-200 dark:border-gray-600"
                       />
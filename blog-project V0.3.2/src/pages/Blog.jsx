@@ -12,6 +12,7 @@ const Blog = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [posts, setPosts] = useState([]);
   const [categories, setCategories] = useState(['All']);
+  const [popularPosts, setPopularPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -20,12 +21,19 @@ const Blog = () => {
     const fetchData = async () => {
       try {
         setLoading(true);
-        const [postsData, categoriesData] = await Promise.all([
+        const [postsData, categoriesData, trendingData] = await Promise.all([
           ApiService.getPosts(),
-          ApiService.getCategories()
+          ApiService.getCategories(),
+          ApiService.getTrendingPosts(3)
         ]);
         setPosts(postsData);
         setCategories(categoriesData.categories);
+        // Fall back to the most viewed posts until the trending list has views
+        setPopularPosts(
+          trendingData.length
+            ? trendingData
+            : [...postsData].sort((a, b) => b.views - a.views).slice(0, 3)
+        );
       } catch (err) {
         setError(err.message);
       } finally {
@@ -120,21 +128,18 @@ const Blog = () => {
                   Popular Posts
                 </h3>
                 <div className="space-y-4">
-                  {posts
-                    .sort((a, b) => b.views - a.views)
-                    .slice(0, 3)
-                    .map((post) => (
-                      <div key={post.id} className="card p-4">
-                        <h4 className="font-medium text-gray-900 dark:text-gray-100 mb-2 line-clamp-2">
-                          {post.title}
-                        </h4>
-                        <div className="flex items-center text-sm text-gray-500 dark:text-gray-400">
-                          <span>{post.views} views</span>
-                          <span className="mx-2">•</span>
-                          <span>{post.readTime}</span>
-                        </div>
+                  {popularPosts.map((post) => (
+                    <div key={post.id} className="card p-4">
+                      <h4 className="font-medium text-gray-900 dark:text-gray-100 mb-2 line-clamp-2">
+                        {post.title}
+                      </h4>
+                      <div className="flex items-center text-sm text-gray-500 dark:text-gray-400">
+                        <span>{post.views} views</span>
+                        <span className="mx-2">•</span>
+                        <span>{post.readTime}</span>
                       </div>
-                    ))}
+                    </div>
+                  ))}
                 </div>
               </div>
             </div>
@@ -12,6 +12,9 @@ const BlogPost = () => {
   const { slug } = useParams();
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentCount, setCommentCount] = useState(0);
+  const [commentCursor, setCommentCursor] = useState(null);
+  const [relatedPosts, setRelatedPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -21,7 +24,12 @@ const BlogPost = () => {
         setLoading(true);
         const postData = await ApiService.getPost(slug);
         setPost(postData);
-        setComments(postData.comments || []);
+        setCommentCount(postData.commentCount || 0);
+        // Yorumlar yazıyla gelmez, ilk sayfa ayrıca istenir
+        const page = await ApiService.getComments(postData.id);
+        setComments(page.comments);
+        setCommentCursor(page.nextCursor);
+        setRelatedPosts(await ApiService.getRelatedPosts(postData.slug, 3));
       } catch (err) {
         setError(err.message);
       } finally {
@@ -32,15 +40,20 @@ const BlogPost = () => {
     fetchPost();
   }, [slug]);
 
+  const handleLoadMoreComments = async () => {
+    const page = await ApiService.getComments(post.id, commentCursor);
+    setComments([...comments, ...page.comments]);
+    setCommentCursor(page.nextCursor);
+  };
+
   const handleAddComment = async (newComment) => {
     try {
       const result = await ApiService.addComment(post.id, newComment);
-      const comment = {
-        id: comments.length + 1,
-        ...newComment,
-        publishedAt: new Date().toISOString().split('T')[0]
-      };
-      setComments([...comments, comment]);
+      setCommentCount(commentCount + 1);
+      // Yüklenmemiş sayfalar varsa yeni yorum son sayfayla birlikte gelir
+      if (!commentCursor) {
+        setComments([...comments, result.comment]);
+      }
     } catch (error) {
       console.error('Error adding comment:', error);
       // Fallback: just add to local state
@@ -100,6 +113,9 @@ const BlogPost = () => {
     );
   }
 
+  // İçindekiler: yazı başlığı (h1) hariç başlıklar
+  const tocEntries = (post.toc || []).filter((entry) => entry.level > 1);
+
   return (
     <div className="min-h-screen py-8">
       <SEOHead
@@ -204,6 +220,31 @@ const BlogPost = () => {
 
           {/* Article Content */}
           <div className="p-8">
+            {/* Table of Contents */}
+            {tocEntries.length > 2 && (
+              <nav className="mb-8 p-4 rounded-lg bg-gray-50 dark:bg-dark-800 border border-gray-200 dark:border-dark-700">
+                <h4 className="font-semibold text-gray-900 dark:text-gray-100 mb-2">
+                  Table of Contents
+                </h4>
+                <ul className="space-y-1">
+                  {tocEntries.map((entry) => (
+                    <li key={entry.id} style={{ paddingLeft: `${entry.level - 2}rem` }}>
+                      <a href={`#${entry.id}`} className="text-sm text-primary-600 dark:text-primary-400 hover:underline">
+                        {entry.text}
+                      </a>
+                    </li>
+                  ))}
+                </ul>
+              </nav>
+            )}
+
+            {post.contentHtml ? (
+              // Sunucuda markdown'dan üretilip temizlenmiş HTML
+              <div
+                className="post-content max-w-none"
+                dangerouslySetInnerHTML={{ __html: post.contentHtml }}
+              />
+            ) : (
             <div className="prose prose-lg dark:prose-invert max-w-none">
               {post.content.split('\n').map((paragraph, index) => {
                 if (paragraph.startsWith('# ')) {
@@ -246,6 +287,7 @@ const BlogPost = () => {
                 return null;
               })}
             </div>
+            )}
 
             {/* Tags */}
             <div className="mt-8 pt-8 border-t border-gray-200 dark:border-dark-700">
@@ -266,8 +308,37 @@ const BlogPost = () => {
           </div>
         </motion.article>
 
+        {/* Related Posts */}
+        {relatedPosts.length > 0 && (
+          <div className="mt-12">
+            <h3 className="text-2xl font-bold text-gray-900 dark:text-gray-100 mb-6">
+              Related Articles
+            </h3>
+            <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+              {relatedPosts.map((related) => (
+                <Link key={related.id} to={`/blog/${related.slug}`} className="card p-4 hover:shadow-lg transition-shadow duration-200">
+                  <h4 className="font-medium text-gray-900 dark:text-gray-100 mb-2 line-clamp-2">
+                    {related.title}
+                  </h4>
+                  <div className="flex items-center text-sm text-gray-500 dark:text-gray-400">
+                    <span>{related.category}</span>
+                    <span className="mx-2">•</span>
+                    <span>{related.readTime}</span>
+                  </div>
+                </Link>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Comments Section */}
-        <CommentSection comments={comments} onAddComment={handleAddComment} />
+        <CommentSection
+          comments={comments}
+          total={Math.max(commentCount, comments.length)}
+          hasMore={Boolean(commentCursor)}
+          onLoadMore={handleLoadMoreComments}
+          onAddComment={handleAddComment}
+        />
       </div>
     </div>
   );
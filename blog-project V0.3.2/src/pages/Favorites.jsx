@@ -26,7 +26,7 @@ const Favorites = () => {
         return;
       }
 
-      const response = await fetch('http://localhost:8000/api/favorites', {
+      const response = await fetch('http://localhost:8000/api/favorites?fields=summary', {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
@@ -157,8 +157,8 @@ const Profile = () => {
 
       if (response.ok) {
         // Kullanıcı bilgilerini güncelle
-        const updatedUser = { ...user, avatar: data.avatar_url };
-        updateProfile({ avatar: data.avatar_url });
+        // Küçük görünümler için WebP varyantları (64/128/256 px) da saklanır
+        updateProfile({ avatar: data.avatar_url, avatarVariants: data.avatar_variants });
         setSuccess('Profil fotoğrafı başarıyla güncellendi!');
       } else {
         setError(data.detail || 'Fotoğraf yüklenirken hata oluştu.');
@@ -204,7 +204,7 @@ const Profile = () => {
             <div className="relative">
               {user.avatar ? (
                 <img
-                  src={user.avatar}
+                  src={user.avatarVariants?.['256'] ?? user.avatar}
                   alt="Profil fotoğrafı"
                   className="w-24 h-24 rounded-full object-cover border-4 border-white shadow-lg"
                 />
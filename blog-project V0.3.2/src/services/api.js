@@ -20,7 +20,7 @@ const fallbackData = {
       tags: ["AI", "Development", "Future"],
       image: "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=800&h=400&fit=crop",
       views: 1250,
-      comments: []
+      commentCount: 0
     },
     {
       id: 2,
@@ -35,7 +35,7 @@ const fallbackData = {
       tags: ["Best Practices", "Performance", "Security"],
       image: "https://images.unsplash.com/photo-1461749280684-dccba630e2f6?w=800&h=400&fit=crop",
       views: 890,
-      comments: []
+      commentCount: 0
     }
   ],
   categories: ["All", "Technology", "Web Development", "3D Graphics", "Cybersecurity", "AI & Machine Learning"]
@@ -45,7 +45,8 @@ class ApiService {
   // Blog posts
   static async getPosts(category = null, search = null) {
     try {
-      const params = new URLSearchParams();
+      // Liste görünümü için content olmadan özet
+      const params = new URLSearchParams({ fields: 'summary' });
       if (category && category !== 'All') params.append('category', category);
       if (search) params.append('search', search);
       
@@ -85,6 +86,29 @@ class ApiService {
     }
   }
 
+  // İlgili ve trend yazılar sunucuda hazır tutulur; tüm yazıları indirip sıralamak gerekmez
+  static async getRelatedPosts(slug, limit = 3) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/posts/${slug}/related?limit=${limit}`);
+      if (!response.ok) throw new Error('Backend not available');
+      return response.json();
+    } catch (error) {
+      console.warn('Backend API unavailable, using fallback data:', error.message);
+      return [];
+    }
+  }
+
+  static async getTrendingPosts(limit = 3) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/posts/trending?limit=${limit}`);
+      if (!response.ok) throw new Error('Backend not available');
+      return response.json();
+    } catch (error) {
+      console.warn('Backend API unavailable, using fallback data:', error.message);
+      return [...fallbackData.posts].sort((a, b) => b.views - a.views).slice(0, limit);
+    }
+  }
+
   // Categories
   static async getCategories() {
     try {
@@ -97,7 +121,21 @@ class ApiService {
     }
   }
 
-  // Comments
+  // Comments: sayfa sayfa, eskiden yeniye; sonraki sayfanın cursor'ı X-Next-Cursor header'ında
+  static async getComments(postId, after = null) {
+    try {
+      const params = new URLSearchParams({ limit: '20' });
+      if (after) params.append('after', after);
+      
+      const response = await fetch(`${API_BASE_URL}/posts/${postId}/comments?${params}`);
+      if (!response.ok) throw new Error('Backend not available');
+      return { comments: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
+    } catch (error) {
+      console.warn('Backend API unavailable, using fallback data:', error.message);
+      return { comments: [], nextCursor: null };
+    }
+  }
+
   static async addComment(postId, comment) {
     const response = await fetch(`${API_BASE_URL}/posts/${postId}/comments`, {
       method: 'POST',